@@ -2,6 +2,8 @@
 ASGI config for cnotes project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+WebSocket connections (real-time note editing) are only served through this entry point, run by uvicorn in the
+realtime service of docker-compose.yml.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
@@ -13,4 +15,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cnotes.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from notebook.collaboration.websocket import websocket_application  # noqa: E402 (needs the apps to be loaded)
+
+
+async def application(scope, receive, send):
+    """Django for HTTP, WebSockets go to the note collaboration sessions"""
+    if scope['type'] == 'websocket':
+        return await websocket_application(scope, receive, send)
+    return await django_application(scope, receive, send)
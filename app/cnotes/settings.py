@@ -1,3 +1,4 @@
+import sys
 from pathlib import Path
 from environ import Env
 
@@ -97,7 +98,7 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'user.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
@@ -113,6 +114,21 @@ SWAGGER_SETTINGS = {
     }
 }
 
+# Cache
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    # Autosaved note drafts (notebook/drafts.py), must be shared and never evict entries, see notebook/checks.py
+    'drafts': env.cache('DRAFT_CACHE_URL', default='locmemcache://drafts'),
+}
+CACHES['drafts'].setdefault('OPTIONS', {}).setdefault('MAX_ENTRIES', sys.maxsize)  # Local memory only culls at this
+
+TOKEN_AUTH_CACHE_TIMEOUT = env.int('TOKEN_AUTH_CACHE_TIMEOUT', default=5 * 60)  # See user/authentication.py
+TICKET_MAX_AGE = env.int('TICKET_MAX_AGE', default=15 * 60)  # Seconds, `ticket` query parameter (EventSource)
+NOTEBOOK_ACCESS_CACHE_TIMEOUT = env.int('NOTEBOOK_ACCESS_CACHE_TIMEOUT', default=60 * 60)
+NOTEBOOK_GENERATION_CACHE_TIMEOUT = env.int('NOTEBOOK_GENERATION_CACHE_TIMEOUT', default=24 * 60 * 60)
+NOTEBOOK_RESPONSE_CACHE_TIMEOUT = env.int('NOTEBOOK_RESPONSE_CACHE_TIMEOUT', default=10 * 60)  # Folders, note groups
+
 # i18n
 
 LANGUAGE_CODE = 'pt-br'
@@ -154,6 +170,45 @@ else:
     DEFAULT_FILE_STORAGE = 'cnotes.storages.PublicMediaStorage'
 
 
+# Hash uploads while they stream in, attachments are stored by content (core.models.Blob)
+FILE_UPLOAD_HANDLERS = [
+    'cnotes.uploadhandlers.HashingMemoryFileUploadHandler',
+    'cnotes.uploadhandlers.HashingTemporaryFileUploadHandler',
+]
+
+# Resized images (avatars and attachment thumbnails) are rendered by a thread pool, see core/images.py
+IMAGE_PIPELINE_WORKERS = env.int('IMAGE_PIPELINE_WORKERS', default=2)
+IMAGE_PIPELINE_SYNC = env.bool('IMAGE_PIPELINE_SYNC', default=False)  # Render inside the request (tests)
+IMAGE_VARIANT_QUALITY = env.int('IMAGE_VARIANT_QUALITY', default=75)
+
+# Attachments are uploaded straight to the storage, see notebook/uploads.py
+ATTACHMENT_MAX_UPLOAD_SIZE = env.int('ATTACHMENT_MAX_UPLOAD_SIZE', default=50 * 1024 * 1024)  # Bytes
+ATTACHMENT_UPLOAD_EXPIRATION = env.int('ATTACHMENT_UPLOAD_EXPIRATION', default=3600)  # Seconds
+
+# Note revisions are stored as compressed deltas with a full snapshot every few revisions
+NOTE_REVISION_SNAPSHOT_INTERVAL = env.int('NOTE_REVISION_SNAPSHOT_INTERVAL', default=20)
+NOTE_REVISION_KEEP_DAYS = env.int('NOTE_REVISION_KEEP_DAYS', default=90)  # Used by `compact_note_revisions`
+NOTE_REVISION_KEEP_COUNT = env.int('NOTE_REVISION_KEEP_COUNT', default=100)
+
+# Note autosaves are buffered in the cache, see notebook/drafts.py
+NOTE_DRAFT_IDLE_TIMEOUT = env.int('NOTE_DRAFT_IDLE_TIMEOUT', default=10)  # Seconds without autosaves
+NOTE_DRAFT_MAX_AGE = env.int('NOTE_DRAFT_MAX_AGE', default=60)  # Seconds a draft may stay unsaved
+NOTE_DRAFT_CACHE_TIMEOUT = env.int('NOTE_DRAFT_CACHE_TIMEOUT', default=24 * 60 * 60)
+NOTE_DRAFT_FLUSH_INTERVAL = env.float('NOTE_DRAFT_FLUSH_INTERVAL', default=2)  # `flush_note_drafts --loop`
+
+# Real-time note editing over WebSockets (cnotes.asgi), see notebook/collaboration
+COLLABORATION_CHANNEL_LAYER = env('COLLABORATION_CHANNEL_LAYER',
+                                  default='notebook.collaboration.layers.InMemoryChannelLayer')
+COLLABORATION_HISTORY_SIZE = env.int('COLLABORATION_HISTORY_SIZE', default=1000)  # Operations kept to transform
+COLLABORATION_RELOAD_INTERVAL = env.float('COLLABORATION_RELOAD_INTERVAL', default=1)  # Seconds, see documents.py
+
+# New activities and invites are pushed to the users' event streams, see notebook/notifications.py
+NOTIFICATION_BACKEND = env('NOTIFICATION_BACKEND', default='notebook.notifications.InMemoryNotificationBackend')
+NOTIFICATION_POLL_TIMEOUT = env.float('NOTIFICATION_POLL_TIMEOUT', default=25)  # Seconds, long-polling
+NOTIFICATION_STREAM_DURATION = env.float('NOTIFICATION_STREAM_DURATION', default=300)  # Seconds, then reconnect
+NOTIFICATION_KEEPALIVE = env.float('NOTIFICATION_KEEPALIVE', default=15)  # Seconds between SSE comments
+NOTIFICATION_REPLAY_TIMEOUT = env.int('NOTIFICATION_REPLAY_TIMEOUT', default=10 * 60)  # Seconds events are kept
+
 # E-Mail settings
 
 EMAIL_SUBJECT_PREFIX = '[CNotes] '
@@ -165,3 +220,10 @@ EMAIL_SSL_CERTFILE = env('EMAIL_SSL_CERTFILE', default=None)
 # django-environ email_url, might override previous e-mail settings
 EMAIL_CONFIG = env.email_url('EMAIL_URL')
 vars().update(EMAIL_CONFIG)
+
+# Outgoing e-mails are queued and delivered by `manage.py send_queued_email`
+EMAIL_QUEUE_BATCH_SIZE = env.int('EMAIL_QUEUE_BATCH_SIZE', default=50)
+EMAIL_QUEUE_MAX_ATTEMPTS = env.int('EMAIL_QUEUE_MAX_ATTEMPTS', default=8)
+EMAIL_QUEUE_RETRY_DELAY = env.int('EMAIL_QUEUE_RETRY_DELAY', default=30)  # Seconds, doubled on each attempt
+EMAIL_QUEUE_MAX_RETRY_DELAY = env.int('EMAIL_QUEUE_MAX_RETRY_DELAY', default=3600)
+EMAIL_QUEUE_POLL_INTERVAL = env.float('EMAIL_QUEUE_POLL_INTERVAL', default=5)
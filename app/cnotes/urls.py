@@ -4,7 +4,9 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
-from rest_framework import permissions, authentication
+from rest_framework import permissions
+
+from user.authentication import CachedTokenAuthentication
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -21,7 +23,7 @@ if settings.DEBUG:
             default_version='v1',
             description="CNotes API docs"
         ),
-        authentication_classes=(authentication.TokenAuthentication,),
+        authentication_classes=(CachedTokenAuthentication,),
         public=True,
         permission_classes=(permissions.AllowAny,),
     )
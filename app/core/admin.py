@@ -73,3 +73,7 @@ admin.site.register(models.Invite)
 admin.site.register(models.Activity)
 admin.site.register(models.Comment)
 admin.site.register(models.Rating)
+admin.site.register(models.SearchTerm)
+admin.site.register(models.Blob)
+admin.site.register(models.OutgoingEmail)
+admin.site.register(models.NoteRevision)
@@ -0,0 +1,154 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from core.models import Blob, Note, User
+
+logger = logging.getLogger(__name__)
+
+VARIANT_SIZES = (48, 128, 512)
+VARIANT_FORMAT = 'WEBP'
+VARIANT_EXTENSION = 'webp'
+SOURCE_KEY = 'source'
+
+profile_picture_processed = Signal()  # sender=User, user_id, the variants are stored with a queryset update
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.IMAGE_PIPELINE_WORKERS,
+                                       thread_name_prefix='image-pipeline')
+    return _executor
+
+
+def _run(task, *args):
+    try:
+        task(*args)
+    except Exception:
+        logger.exception('Image pipeline task %s failed', task.__name__)
+    finally:
+        close_old_connections()  # Worker threads get their own connections
+
+
+def schedule(task, *args):
+    """Run a task on the worker pool once the current transaction commits"""
+    if settings.IMAGE_PIPELINE_SYNC:
+        task(*args)
+    else:
+        transaction.on_commit(lambda: get_executor().submit(_run, task, *args))
+
+
+def render_variants(file, crop=False):
+    """Resize an image to every variant size, returns {size: webp bytes} (None when it isn't an image)"""
+    try:
+        image = Image.open(file)
+        image.load()
+    except (OSError, Image.DecompressionBombError):
+        return None
+
+    image = ImageOps.exif_transpose(image)
+    image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    variants = {}
+    for size in VARIANT_SIZES:
+        if crop:
+            variant = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        else:
+            variant = image.copy()
+            variant.thumbnail((size, size), Image.LANCZOS)
+        output = BytesIO()
+        variant.save(output, VARIANT_FORMAT, quality=settings.IMAGE_VARIANT_QUALITY, method=4)
+        variants[size] = output.getvalue()
+    return variants
+
+
+def store_variants(source_name, storage=default_storage, crop=False):
+    """
+    Render and store the variants of an image, next to it
+
+    Returns the variants as `{'source': source_name, '48': name, ...}`, or None when the file isn't an image.
+    """
+    with storage.open(source_name) as file:
+        rendered = render_variants(file, crop=crop)
+    if rendered is None:
+        return None
+
+    stem = os.path.splitext(source_name)[0]
+    variants = {SOURCE_KEY: source_name}
+    for size, content in rendered.items():
+        name = f'{stem}-{size}.{VARIANT_EXTENSION}'
+        if storage.exists(name):
+            storage.delete(name)
+        variants[str(size)] = storage.save(name, ContentFile(content))
+    return variants
+
+
+def delete_variants(variants, storage=default_storage):
+    for key, name in (variants or {}).items():
+        if key != SOURCE_KEY:
+            storage.delete(name)
+
+
+def get_variant_name(variants, size):
+    return (variants or {}).get(str(size))
+
+
+def get_variant_urls(variants, request=None, storage=default_storage):
+    """Public URLs of the variants, absolute when there is a request (as DRF's FileField)"""
+    urls = {}
+    for key, name in (variants or {}).items():
+        if key == SOURCE_KEY:
+            continue
+        url = storage.url(name)
+        urls[key] = request.build_absolute_uri(url) if request is not None else url
+    return urls
+
+
+IMAGE_EXTENSIONS = {'.bmp', '.gif', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp'}
+
+
+def is_image_name(name):
+    return os.path.splitext(name or '')[1].lower() in IMAGE_EXTENSIONS
+
+
+def process_profile_picture(user_id, source_name):
+    """Square avatars of every size, skipped when the picture was replaced in the meantime"""
+    storage = User._meta.get_field('profile_picture').storage
+    previous = User.objects.filter(pk=user_id, profile_picture=source_name) \
+        .values_list('profile_picture_variants', flat=True).first()
+    if previous is None:
+        return
+
+    variants = store_variants(source_name, storage=storage, crop=True) or {SOURCE_KEY: source_name}
+    if User.objects.filter(pk=user_id, profile_picture=source_name).update(profile_picture_variants=variants):
+        if previous.get(SOURCE_KEY) != source_name:
+            delete_variants(previous, storage=storage)
+        profile_picture_processed.send(sender=User, user_id=user_id)
+    else:
+        delete_variants(variants, storage=storage)
+
+
+def process_blob(blob_id):
+    """Thumbnails of image attachments, shared by every attachment of the same content"""
+    blob = Blob.objects.filter(pk=blob_id).first()
+    if blob is None or blob.variants or not is_image_name(blob.file.name):
+        return
+
+    variants = store_variants(blob.file.name, storage=blob.file.storage)
+    if variants is None:
+        return
+    if not Blob.objects.filter(pk=blob_id).update(variants=variants):
+        delete_variants(variants, storage=blob.file.storage)
+        return
+    Note.objects.filter(attachment__blob_id=blob_id).touch()  # The thumbnails are shown with the notes
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import OutgoingEmail
+
+
+def get_retry_delay(attempts):
+    """Exponential backoff, capped so failing messages are still retried every once in a while"""
+    delay = settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, settings.EMAIL_QUEUE_MAX_RETRY_DELAY))
+
+
+def deliver_queued_email(batch_size=None):
+    """
+    Send a batch of due e-mails over a single connection, returns (sent, failed)
+
+    The batch is locked with SKIP LOCKED, so several workers can drain the queue at the same time.
+    """
+    batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+    sent = failed = 0
+
+    with transaction.atomic():
+        batch = list(OutgoingEmail.objects.due().select_for_update(skip_locked=True)[:batch_size])
+        if not batch:
+            return sent, failed
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as ex:  # The server is unreachable, the whole batch is retried later
+            for email in batch:
+                schedule_retry(email, ex)
+            return sent, len(batch)
+
+        try:
+            for email in batch:
+                try:
+                    email.to_message(connection=connection).send()
+                except Exception as ex:
+                    schedule_retry(email, ex)
+                    failed += 1
+                else:
+                    email.status = OutgoingEmail.Status.SENT
+                    email.attempts += 1
+                    email.sent_date = timezone.now()
+                    email.last_error = ''
+                    email.save(update_fields=('status', 'attempts', 'sent_date', 'last_error'))
+                    sent += 1
+        finally:
+            connection.close()
+
+    return sent, failed
+
+
+def schedule_retry(email: OutgoingEmail, error):
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.Status.FAILED
+    else:
+        email.next_attempt = timezone.now() + get_retry_delay(email.attempts)
+    email.save(update_fields=('status', 'attempts', 'last_error', 'next_attempt'))
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from core.models import NoteRevision
+
+
+class Command(BaseCommand):
+    help = 'Removes old note revisions, keeping the recent ones and the latest revisions of every note'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-days', type=int, default=settings.NOTE_REVISION_KEEP_DAYS,
+                            help='Revisions newer than this are always kept')
+        parser.add_argument('--keep-count', type=int, default=settings.NOTE_REVISION_KEEP_COUNT,
+                            help='Latest revisions of each note that are always kept')
+
+    def handle(self, *args, keep_days, keep_count, **options):
+        cutoff = timezone.now() - timedelta(days=keep_days)
+        notes = NoteRevision.objects.values('note_id').annotate(
+            first=Min('number'), latest=Max('number'), first_recent=Min('number', filter=Q(creation_date__gte=cutoff)))
+
+        compacted = deleted = 0
+        for note in notes.iterator():
+            keep_from = note['latest'] - keep_count + 1
+            if note['first_recent'] is not None:
+                keep_from = min(keep_from, note['first_recent'])
+            if keep_from <= note['first']:
+                continue
+
+            deleted += NoteRevision.objects.compact(note['note_id'], keep_from)
+            compacted += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{deleted} revisions removed from {compacted} notes'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Attachment, Blob
+
+
+class Command(BaseCommand):
+    help = 'Moves the attachments uploaded before content-addressed storage to shared blobs, removing duplicates'
+
+    def handle(self, *args, **options):
+        linked = missing = 0
+        for attachment in Attachment.objects.filter(blob=None).iterator():
+            uploaded_file = attachment.uploaded_file
+            if not uploaded_file or not uploaded_file.storage.exists(uploaded_file.name):
+                missing += 1
+                continue
+
+            with transaction.atomic(), uploaded_file.open('rb'):
+                blob = Blob.objects.store(uploaded_file, name=uploaded_file.name)
+                Attachment.objects.filter(pk=attachment.pk).update(blob=blob, uploaded_file=blob.file.name)
+            linked += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{linked} attachments linked to blobs, {missing} files missing'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core import images
+from core.models import Blob, User
+
+
+class Command(BaseCommand):
+    help = 'Renders the missing profile picture variants and image attachment thumbnails'
+
+    def handle(self, *args, **options):
+        users = 0
+        for user_id, name, variants in User.objects.exclude(profile_picture='').exclude(profile_picture=None) \
+                .values_list('id', 'profile_picture', 'profile_picture_variants').iterator():
+            if (variants or {}).get(images.SOURCE_KEY) != name:
+                images.process_profile_picture(user_id, name)
+                users += 1
+
+        blobs = 0
+        for blob_id, name in Blob.objects.filter(variants={}).values_list('id', 'file').iterator():
+            if images.is_image_name(name):
+                images.process_blob(blob_id)
+                blobs += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{users} profile pictures and {blobs} attachments processed'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from core.models import Note, Rating
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the denormalized rating aggregates (rating_sum and rating_count) of every note'
+
+    def handle(self, *args, **options):
+        ratings = Rating.objects.filter(note=OuterRef('pk')).order_by().values('note')
+        updated = Note.objects.update(
+            rating_sum=Coalesce(Subquery(ratings.annotate(total=Sum('rating')).values('total')),
+                                Value(0), output_field=IntegerField()),
+            rating_count=Coalesce(Subquery(ratings.annotate(total=Count('pk')).values('total')),
+                                  Value(0), output_field=IntegerField()),
+        )
+        self.stdout.write(self.style.SUCCESS(f'{updated} notes updated'))
@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.mail import deliver_queued_email
+
+
+class Command(BaseCommand):
+    help = 'Delivers the queued e-mails, retrying failed deliveries with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_QUEUE_BATCH_SIZE,
+                            help='Amount of e-mails sent over each SMTP connection')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue instead of exiting')
+        parser.add_argument('--interval', type=float, default=settings.EMAIL_QUEUE_POLL_INTERVAL,
+                            help='Seconds to wait between polls when the queue is empty (with --loop)')
+
+    def handle(self, *args, batch_size, loop, interval, **options):
+        while True:
+            sent, failed = deliver_queued_email(batch_size)
+            if sent or failed:
+                self.stdout.write(f'{sent} e-mails sent, {failed} failed')
+
+            if not loop:
+                break
+            if not sent and not failed:
+                time.sleep(interval)
@@ -0,0 +1,71 @@
+# Generated by Django 3.1.7 on 2026-10-18 13:51
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+import re
+from collections import Counter
+
+WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return [term for term in WORD_RE.findall((text or '').lower()) if len(term) <= 64]
+
+
+def build_search_index(apps, schema_editor):
+    Note = apps.get_model('core', 'Note')
+    SearchTerm = apps.get_model('core', 'SearchTerm')
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE INDEX core_note_search_vector_gin ON core_note USING gin (search_vector)')
+        schema_editor.execute(
+            "UPDATE core_note SET search_vector = "
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(content, '')), 'B')"
+        )
+        return
+
+    for note in Note.objects.all().iterator():
+        title_terms = Counter(tokenize(note.title))
+        content_terms = Counter(tokenize(note.content))
+        SearchTerm.objects.bulk_create([
+            SearchTerm(note=note, term=term, title_count=title_terms[term], content_count=content_terms[term])
+            for term in title_terms.keys() | content_terms.keys()
+        ])
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS core_note_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_activity_creation_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Vetor de busca do título e conteúdo (apenas PostgreSQL).', null=True, verbose_name='vetor de busca'),
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, help_text='Termo normalizado.', max_length=64, verbose_name='termo')),
+                ('title_count', models.PositiveIntegerField(default=0, help_text='Quantidade de ocorrências do termo no título.', verbose_name='ocorrências no título')),
+                ('content_count', models.PositiveIntegerField(default=0, help_text='Quantidade de ocorrências do termo no conteúdo.', verbose_name='ocorrências no conteúdo')),
+                ('note', models.ForeignKey(help_text='Anotação onde o termo ocorre.', on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', related_query_name='search_term', to='core.note', verbose_name='anotação')),
+            ],
+            options={
+                'verbose_name': 'termo de busca',
+                'verbose_name_plural': 'termos de busca',
+                'unique_together': {('note', 'term')},
+            },
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.1.7 on 2026-10-18 13:52
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Note = apps.get_model('core', 'Note')
+    Rating = apps.get_model('core', 'Rating')
+
+    ratings = Rating.objects.filter(note=OuterRef('pk')).order_by().values('note')
+    Note.objects.update(
+        rating_sum=Coalesce(Subquery(ratings.annotate(total=Sum('rating')).values('total')),
+                            Value(0), output_field=IntegerField()),
+        rating_count=Coalesce(Subquery(ratings.annotate(total=Count('pk')).values('total')),
+                              Value(0), output_field=IntegerField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Quantidade de avaliações da anotação.', verbose_name='quantidade de avaliações'),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='rating_sum',
+            field=models.IntegerField(default=0, editable=False, help_text='Soma dos valores das avaliações da anotação.', verbose_name='soma das avaliações'),
+        ),
+        migrations.RunPython(fill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 3.1.7 on 2026-10-18 13:59
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_notebook(apps, schema_editor):
+    Folder = apps.get_model('core', 'Folder')
+    NoteGroup = apps.get_model('core', 'NoteGroup')
+    Note = apps.get_model('core', 'Note')
+
+    NoteGroup.objects.update(
+        notebook=Subquery(Folder.objects.filter(pk=OuterRef('parent_folder')).values('notebook')[:1]))
+    Note.objects.update(
+        notebook=Subquery(NoteGroup.objects.filter(pk=OuterRef('note_group')).values('notebook')[:1]))
+
+    for model_name in ('Comment', 'Attachment', 'Rating'):
+        apps.get_model('core', model_name).objects.update(
+            notebook=Subquery(Note.objects.filter(pk=OuterRef('note')).values('notebook')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_note_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachment',
+            name='notebook',
+            field=models.ForeignKey(editable=False, help_text='Caderno do anexo (desnormalizado da anotação).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attachments', related_query_name='attachment', to='core.notebook', verbose_name='caderno'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='notebook',
+            field=models.ForeignKey(editable=False, help_text='Caderno do comentário (desnormalizado da anotação).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='comments', related_query_name='comment', to='core.notebook', verbose_name='caderno'),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='notebook',
+            field=models.ForeignKey(editable=False, help_text='Caderno onde a anotação se localiza (desnormalizado do conjunto).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notes', related_query_name='note', to='core.notebook', verbose_name='caderno'),
+        ),
+        migrations.AddField(
+            model_name='notegroup',
+            name='notebook',
+            field=models.ForeignKey(editable=False, help_text='Caderno onde o conjunto se localiza (desnormalizado da pasta pai).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='note_groups', related_query_name='note_group', to='core.notebook', verbose_name='caderno'),
+        ),
+        migrations.AddField(
+            model_name='rating',
+            name='notebook',
+            field=models.ForeignKey(editable=False, help_text='Caderno da avaliação (desnormalizado da anotação).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ratings', related_query_name='rating', to='core.notebook', verbose_name='caderno'),
+        ),
+        migrations.RunPython(fill_notebook, migrations.RunPython.noop),
+    ]
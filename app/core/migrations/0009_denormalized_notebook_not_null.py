@@ -0,0 +1,39 @@
+# Generated by Django 3.1.7 on 2026-10-18 13:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_denormalized_notebook'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attachment',
+            name='notebook',
+            field=models.ForeignKey(editable=False, help_text='Caderno do anexo (desnormalizado da anotação).', on_delete=django.db.models.deletion.CASCADE, related_name='attachments', related_query_name='attachment', to='core.notebook', verbose_name='caderno'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='notebook',
+            field=models.ForeignKey(editable=False, help_text='Caderno do comentário (desnormalizado da anotação).', on_delete=django.db.models.deletion.CASCADE, related_name='comments', related_query_name='comment', to='core.notebook', verbose_name='caderno'),
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='notebook',
+            field=models.ForeignKey(editable=False, help_text='Caderno onde a anotação se localiza (desnormalizado do conjunto).', on_delete=django.db.models.deletion.CASCADE, related_name='notes', related_query_name='note', to='core.notebook', verbose_name='caderno'),
+        ),
+        migrations.AlterField(
+            model_name='notegroup',
+            name='notebook',
+            field=models.ForeignKey(editable=False, help_text='Caderno onde o conjunto se localiza (desnormalizado da pasta pai).', on_delete=django.db.models.deletion.CASCADE, related_name='note_groups', related_query_name='note_group', to='core.notebook', verbose_name='caderno'),
+        ),
+        migrations.AlterField(
+            model_name='rating',
+            name='notebook',
+            field=models.ForeignKey(editable=False, help_text='Caderno da avaliação (desnormalizado da anotação).', on_delete=django.db.models.deletion.CASCADE, related_name='ratings', related_query_name='rating', to='core.notebook', verbose_name='caderno'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_denormalized_notebook_not_null'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['user', 'creation_date', 'id'], name='core_activity_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['note', 'creation_date', 'id'], name='core_comment_note_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invite',
+            index=models.Index(fields=['receiver', 'invite_date', 'id'], name='core_invite_receiver_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invite',
+            index=models.Index(fields=['sender', 'invite_date', 'id'], name='core_invite_sender_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['notebook', 'member_since', 'id'], name='core_member_notebook_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notebook',
+            index=models.Index(fields=['creation_date', 'id'], name='core_notebook_date_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(condition=models.Q(seen=False), fields=['user'], name='core_activity_unseen_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:07
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_activity_unseen_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='ID único seguindo o padrão UUID4.', primary_key=True, serialize=False)),
+                ('subject', models.CharField(help_text='Assunto do e-mail', max_length=255, verbose_name='assunto')),
+                ('body', models.TextField(help_text='Corpo em texto puro do e-mail', verbose_name='corpo')),
+                ('html_body', models.TextField(blank=True, help_text='Corpo em HTML do e-mail', verbose_name='corpo HTML')),
+                ('from_email', models.CharField(help_text='Remetente do e-mail', max_length=255, verbose_name='remetente')),
+                ('recipients', models.JSONField(help_text='Lista de destinatários do e-mail', verbose_name='destinatários')),
+                ('status', models.CharField(choices=[('pending', 'pendente'), ('sent', 'enviado'), ('failed', 'falhou')], default='pending', help_text='Situação do envio do e-mail', max_length=7, verbose_name='situação')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Quantidade de tentativas de envio', verbose_name='tentativas')),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now, help_text='Momento a partir do qual o e-mail pode ser enviado', verbose_name='próxima tentativa')),
+                ('last_error', models.TextField(blank=True, help_text='Erro da última tentativa de envio', verbose_name='último erro')),
+                ('creation_date', models.DateTimeField(auto_now_add=True, help_text='Data de entrada do e-mail na fila', verbose_name='data de criação')),
+                ('sent_date', models.DateTimeField(default=None, help_text='Data em que o e-mail foi enviado', null=True, verbose_name='data de envio')),
+            ],
+            options={
+                'verbose_name': 'e-mail de saída',
+                'verbose_name_plural': 'e-mails de saída',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(fields=['status', 'next_attempt'], name='core_outgoing_email_due_idx'),
+        ),
+    ]
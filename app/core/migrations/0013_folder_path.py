@@ -0,0 +1,48 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+PATH_SEPARATOR = '/'
+
+
+def fill_paths(apps, schema_editor):
+    """Walk every tree from its root, one level at a time"""
+    Folder = apps.get_model('core', 'Folder')
+
+    parent_paths = {None: ''}
+    level = list(Folder.objects.filter(parent_folder=None))
+    depth = 0
+    while level:
+        for folder in level:
+            folder.path = f'{parent_paths[folder.parent_folder_id]}{folder.id.hex}{PATH_SEPARATOR}'
+            folder.depth = depth
+        Folder.objects.bulk_update(level, ['path', 'depth'], batch_size=500)
+
+        parent_paths = {folder.id: folder.path for folder in level}
+        level = list(Folder.objects.filter(parent_folder__in=list(parent_paths)))
+        depth += 1
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='folder',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Profundidade da pasta, a pasta raiz tem profundidade 0.', verbose_name='profundidade'),
+        ),
+        migrations.AddField(
+            model_name='folder',
+            name='path',
+            field=models.CharField(default='', editable=False, help_text='IDs das pastas da raiz até esta pasta.', max_length=660, verbose_name='caminho'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='folder',
+            index=models.Index(fields=['path'], name='core_folder_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
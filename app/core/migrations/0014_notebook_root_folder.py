@@ -0,0 +1,29 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:12
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_root_folder(apps, schema_editor):
+    Notebook = apps.get_model('core', 'Notebook')
+    Folder = apps.get_model('core', 'Folder')
+
+    Notebook.objects.update(root_folder=Subquery(
+        Folder.objects.filter(notebook=OuterRef('pk'), parent_folder=None).values('pk')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_folder_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notebook',
+            name='root_folder',
+            field=models.ForeignKey(editable=False, help_text='Pasta raiz do caderno.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.folder', verbose_name='pasta raiz'),
+        ),
+        migrations.RunPython(fill_root_folder, migrations.RunPython.noop),
+    ]
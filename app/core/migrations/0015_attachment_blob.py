@@ -0,0 +1,36 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:18
+
+import core.models.blob
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_notebook_root_folder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='ID único seguindo o padrão UUID4.', primary_key=True, serialize=False)),
+                ('sha256', models.CharField(editable=False, help_text='Hash SHA-256 do conteúdo do arquivo.', max_length=64, unique=True, verbose_name='SHA-256')),
+                ('file', models.FileField(help_text='O arquivo armazenado.', max_length=255, upload_to=core.models.blob.blob_file_path, verbose_name='arquivo')),
+                ('size', models.BigIntegerField(help_text='Tamanho do arquivo em bytes.', verbose_name='tamanho')),
+                ('ref_count', models.PositiveIntegerField(default=0, help_text='Quantidade de anexos que apontam para o arquivo.', verbose_name='referências')),
+                ('creation_date', models.DateTimeField(auto_now_add=True, help_text='Data em que o conteúdo foi enviado pela primeira vez.', verbose_name='data de criação')),
+            ],
+            options={
+                'verbose_name': 'conteúdo de anexo',
+                'verbose_name_plural': 'conteúdos de anexos',
+            },
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='blob',
+            field=models.ForeignKey(editable=False, help_text='Conteúdo do anexo, compartilhado entre anexos de arquivos iguais.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attachments', related_query_name='attachment', to='core.blob', verbose_name='conteúdo'),
+        ),
+    ]
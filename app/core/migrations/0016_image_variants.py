@@ -0,0 +1,29 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:20
+
+import core.models.user
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_attachment_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blob',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Miniaturas de imagens por tamanho.', verbose_name='miniaturas'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Versões redimensionadas da foto de perfil por tamanho.', verbose_name='variantes da foto de perfil'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='profile_picture',
+            field=models.ImageField(blank=True, help_text='Imagem de perfil do usuário.', null=True, upload_to=core.models.user.profile_picture_path, verbose_name='foto de perfil'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteRevision',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='ID único seguindo o padrão UUID4.', primary_key=True, serialize=False)),
+                ('number', models.PositiveIntegerField(help_text='Número sequencial da revisão', verbose_name='número')),
+                ('creation_date', models.DateTimeField(auto_now_add=True, help_text='Momento da edição', verbose_name='data de criação')),
+                ('is_snapshot', models.BooleanField(help_text='Se os dados são o conteúdo completo ou uma diferença', verbose_name='cópia completa')),
+                ('snapshot_number', models.PositiveIntegerField(help_text='Revisão completa a partir da qual esta é reconstruída', verbose_name='número da cópia completa')),
+                ('data', models.BinaryField(help_text='Conteúdo ou diferença para a revisão anterior, comprimidos', verbose_name='dados')),
+                ('content_hash', models.CharField(help_text='SHA-256 do conteúdo da revisão', max_length=64, verbose_name='hash do conteúdo')),
+                ('length', models.PositiveIntegerField(help_text='Tamanho do conteúdo da revisão', verbose_name='tamanho')),
+                ('author', models.ForeignKey(default=None, help_text='Membro que fez a edição', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.member', verbose_name='autor')),
+                ('note', models.ForeignKey(help_text='Anotação da revisão', on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='core.note', verbose_name='anotação')),
+            ],
+            options={
+                'verbose_name': 'revisão de anotação',
+                'verbose_name_plural': 'revisões de anotações',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='noterevision',
+            constraint=models.UniqueConstraint(fields=('note', 'number'), name='core_noterevision_note_number_uniq'),
+        ),
+    ]
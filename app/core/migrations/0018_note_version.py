@@ -0,0 +1,18 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_note_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Incrementada a cada edição, detecta edições concorrentes.', verbose_name='versão'),
+        ),
+    ]
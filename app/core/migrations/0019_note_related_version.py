@@ -0,0 +1,18 @@
+# Generated by Django 3.1.7 on 2026-10-18 15:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_note_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='related_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Incrementada quando as avaliações ou os anexos mostrados com a anotação mudam.', verbose_name='versão dos relacionados'),
+        ),
+    ]
@@ -8,6 +8,10 @@ from .member import Member
 from .invite import Invite
 from .activity import Activity
 from .note import Note
+from .note_revision import NoteRevision
 from .rating import Rating
 from .comment import Comment
-from .attachment import Attachment
\ No newline at end of file
+from .blob import Blob
+from .attachment import Attachment
+from .search_term import SearchTerm
+from .outgoing_email import OutgoingEmail
@@ -29,6 +29,11 @@ class Activity(models.Model):
     class Meta:
         verbose_name = _('atividade')
         verbose_name_plural = _('atividades')
+        indexes = [
+            models.Index(fields=['user', 'creation_date', 'id'], name='core_activity_user_date_idx'),
+            # Keeps the unread counter cheap, only the unseen activities are indexed
+            models.Index(fields=['user'], name='core_activity_unseen_idx', condition=models.Q(seen=False)),
+        ]
 
     def __str__(self):
         return self.title
@@ -1,8 +1,11 @@
 import os
 import uuid
 
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
+from django_cleanup import cleanup
+
+from .blob import Blob
 
 
 def attachment_file_path(instance, filename):
@@ -11,6 +14,15 @@ def attachment_file_path(instance, filename):
     return os.path.join('attachments', new_filename)
 
 
+class AttachmentManager(models.Manager):
+    @transaction.atomic
+    def create_attachment(self, note, file=None, name=None, sha256=None, size=None, **kwargs):
+        """Attach a file to a note, sharing the stored content with every other attachment of the same file"""
+        blob = Blob.objects.store(file, name=name, sha256=sha256, size=size)
+        return self.create(note=note, blob=blob, uploaded_file=blob.file.name, **kwargs)
+
+
+@cleanup.ignore  # Files may be shared, they are removed with their Blob (see core.signals)
 class Attachment(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False,
                           help_text=_("ID único seguindo o padrão UUID4."))
@@ -18,11 +30,27 @@ class Attachment(models.Model):
                              help_text=_('Anotação onde o anexo se localiza.'),
                              related_name='attachments',
                              related_query_name='attachment')
+    notebook = models.ForeignKey('Notebook', on_delete=models.CASCADE, editable=False, verbose_name=_('caderno'),
+                                 help_text=_('Caderno do anexo (desnormalizado da anotação).'),
+                                 related_name='attachments',
+                                 related_query_name='attachment')
     uploaded_file = models.FileField(
         upload_to=attachment_file_path,
         verbose_name=_('arquivo anexado'),
         help_text=_('O arquivo anexado.')
     )
 
+    blob = models.ForeignKey('Blob', null=True, editable=False, on_delete=models.PROTECT, verbose_name=_('conteúdo'),
+                             help_text=_('Conteúdo do anexo, compartilhado entre anexos de arquivos iguais.'),
+                             related_name='attachments',
+                             related_query_name='attachment')
+
     uploaded_at = models.DateTimeField(auto_now=True, verbose_name=_("enviada em"),
                                        help_text=_('Momento da última modificação no anexo.'))
+
+    objects = AttachmentManager()
+
+    def save(self, *args, **kwargs):
+        if self.notebook_id is None or Attachment.note.is_cached(self):
+            self.notebook_id = self.note.notebook_id
+        super().save(*args, **kwargs)
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import uuid
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils.translation import gettext_lazy as _
+
+
+def blob_file_path(instance, filename):
+    ext = os.path.splitext(filename)[1].lower()
+    return os.path.join('blobs', instance.sha256[:2], f'{instance.sha256}{ext}')
+
+
+def hash_file(file):
+    """SHA-256 of a file, reusing the digest computed by the upload handlers when there is one"""
+    if getattr(file, 'sha256', None):
+        return file.sha256
+
+    hasher = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    file.seek(0)
+    return hasher.hexdigest()
+
+
+class BlobManager(models.Manager):
+    def store(self, file=None, name=None, sha256=None, size=None):
+        """
+        Get a reference to the blob holding the file's content, storing it only when the content is new
+
+        When `name` is given, the file is already on the storage under that name and is either adopted by the new
+        blob or deleted in favor of the existing one. Direct uploads pass the `sha256` and `size` verified by the
+        storage instead of the file, so it isn't read back.
+        """
+        if sha256 is None:
+            sha256, size = hash_file(file), file.size
+
+        for _attempt in range(2):  # A concurrent upload of the same content may win the unique constraint
+            if self.filter(sha256=sha256).update(ref_count=F('ref_count') + 1):
+                blob = self.get(sha256=sha256)
+                if name is not None and name != blob.file.name:
+                    storage = blob.file.storage
+                    transaction.on_commit(lambda: storage.delete(name))
+                return blob
+
+            blob = self.model(sha256=sha256, size=size, ref_count=1)
+            try:
+                with transaction.atomic():
+                    if name is not None:
+                        blob.file.name = name
+                        blob.save()
+                    else:
+                        blob.file.save(os.path.basename(file.name), file)
+                return blob
+            except IntegrityError:
+                if name is None and blob.file.name:
+                    blob.file.storage.delete(blob.file.name)
+
+        raise IntegrityError(f'Could not store blob {sha256}')
+
+    def release(self, blob_id):
+        """Drop a reference, deleting the blob (and its file, through django_cleanup) with the last one"""
+        with transaction.atomic():
+            self.filter(pk=blob_id).update(ref_count=F('ref_count') - 1)
+            for blob in self.filter(pk=blob_id, ref_count__lte=0):
+                blob.delete()
+
+
+class Blob(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False,
+                          help_text=_("ID único seguindo o padrão UUID4."))
+    sha256 = models.CharField(max_length=64, unique=True, editable=False, verbose_name=_('SHA-256'),
+                              help_text=_('Hash SHA-256 do conteúdo do arquivo.'))
+    file = models.FileField(upload_to=blob_file_path, max_length=255, verbose_name=_('arquivo'),
+                            help_text=_('O arquivo armazenado.'))
+    size = models.BigIntegerField(verbose_name=_('tamanho'), help_text=_('Tamanho do arquivo em bytes.'))
+    ref_count = models.PositiveIntegerField(default=0, verbose_name=_('referências'),
+                                            help_text=_('Quantidade de anexos que apontam para o arquivo.'))
+    creation_date = models.DateTimeField(auto_now_add=True, verbose_name=_("data de criação"),
+                                         help_text=_("Data em que o conteúdo foi enviado pela primeira vez."))
+    variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name=_('miniaturas'),
+                                help_text=_('Miniaturas de imagens por tamanho.'))
+
+    objects = BlobManager()
+
+    class Meta:
+        verbose_name = _('conteúdo de anexo')
+        verbose_name_plural = _('conteúdos de anexos')
+
+    def __str__(self):
+        return self.sha256
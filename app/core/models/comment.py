@@ -13,6 +13,11 @@ class Comment(models.Model):
                              related_name='comments', related_query_name='comment',
                              )
 
+    notebook = models.ForeignKey('Notebook', on_delete=models.CASCADE, editable=False, verbose_name=_('caderno'),
+                                 help_text=_('Caderno do comentário (desnormalizado da anotação).'),
+                                 related_name='comments', related_query_name='comment',
+                                 )
+
     commenter = models.ForeignKey('Member', on_delete=models.CASCADE, verbose_name=_('comentarista'),
                                   help_text=_('Autor do comentário.'),
                                   related_name='comments',
@@ -30,6 +35,12 @@ class Comment(models.Model):
     class Meta:
         verbose_name = _('comentário')
         verbose_name_plural = _('comentários')
+        indexes = [models.Index(fields=['note', 'creation_date', 'id'], name='core_comment_note_date_idx')]
+
+    def save(self, *args, **kwargs):
+        if self.notebook_id is None or Comment.note.is_cached(self):
+            self.notebook_id = self.note.notebook_id
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f'[{self.creation_date}] {{{self.note}}}/{{{self.commenter}}}'
@@ -1,11 +1,13 @@
 import uuid
 
-from django.db import models
-from django.db.models import Q, F
+from django.db import models, transaction
+from django.db.models import Q, F, Max, Value
+from django.db.models.functions import Concat, Substr
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
 MAX_DEPTH = 20
+PATH_SEPARATOR = '/'
 
 
 class Folder(models.Model):
@@ -27,6 +29,12 @@ class Folder(models.Model):
                                       related_name='sub_folders',
                                       related_query_name='sub_folder')
 
+    # Materialized path, the ids (hex) from the root folder down to this one, e.g. "<root>/<parent>/<self>/"
+    path = models.CharField(max_length=(32 + len(PATH_SEPARATOR)) * MAX_DEPTH, editable=False, default='',
+                            verbose_name=_('caminho'), help_text=_('IDs das pastas da raiz até esta pasta.'))
+    depth = models.PositiveSmallIntegerField(editable=False, default=0, verbose_name=_('profundidade'),
+                                             help_text=_('Profundidade da pasta, a pasta raiz tem profundidade 0.'))
+
     class Meta:
         verbose_name = _('pasta')
         verbose_name_plural = _('pastas')
@@ -36,18 +44,76 @@ class Folder(models.Model):
                                     name='unique_parent_folder'),
             models.CheckConstraint(check=~Q(id=F('parent_folder')), name='no_self_reference')
         ]
+        indexes = [
+            # varchar_pattern_ops lets PostgreSQL use the index on prefix (subtree) lookups
+            models.Index(fields=['path'], name='core_folder_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
 
     def clean(self, parent_folder=None):
         """Válida integridade da relação pasta/pasta pai"""
-        cur = parent_folder or self.parent_folder
-        depth = 1
-        while cur is not None:
-            depth += 1
-            if cur == self:
+        parent_folder = parent_folder or self.parent_folder
+        if parent_folder is None:
+            return
+
+        height = 0
+        if not self._state.adding:
+            if parent_folder.path.startswith(self.path):
                 raise ValidationError(_('Dependência circular entre pastas'))
-            if depth > MAX_DEPTH:
-                raise ValidationError(_('Profundidade máxima de pastas excedida'))
-            cur = cur.parent_folder
+            height = self.get_descendants().aggregate(max_depth=Max('depth'))['max_depth'] - self.depth
+
+        if parent_folder.depth + 2 + height > MAX_DEPTH:
+            raise ValidationError(_('Profundidade máxima de pastas excedida'))
+
+    def save(self, *args, **kwargs):
+        """Save the folder, keeping the materialized paths of the folder and of its subtree up to date"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent_folder' not in update_fields:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = Folder.objects.select_for_update().filter(pk=self.pk).values('path', 'depth').first()
+
+            if self.parent_folder_id is None:
+                self.path, self.depth = f'{self.id.hex}{PATH_SEPARATOR}', 0
+            else:
+                parent = Folder.objects.filter(pk=self.parent_folder_id).values('path', 'depth').get()
+                self.path, self.depth = f'{parent["path"]}{self.id.hex}{PATH_SEPARATOR}', parent['depth'] + 1
+
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'path', 'depth'}
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+
+            if adding and self.parent_folder_id is None:
+                Notebook = self._meta.get_field('notebook').related_model  # Avoids a circular import
+                Notebook.objects.filter(pk=self.notebook_id, root_folder=None).update(root_folder=self)
+
+            if previous and previous['path'] and previous['path'] != self.path:  # Moved, rewrite the subtree
+                Folder.objects.filter(path__startswith=previous['path']).exclude(pk=self.pk).update(
+                    path=Concat(Value(self.path), Substr('path', len(previous['path']) + 1)),
+                    depth=F('depth') + self.depth - previous['depth'],
+                )
+
+    def delete(self, *args, **kwargs):
+        """Delete the whole subtree at once, instead of letting the cascade walk it level by level"""
+        return self.get_descendants().delete()
+
+    def get_descendants(self, include_self=True):
+        descendants = Folder.objects.filter(path__startswith=self.path)
+        return descendants if include_self else descendants.exclude(pk=self.pk)
+
+    def get_ancestors(self, include_self=False):
+        """Folders from the root down to this one"""
+        ids = [uuid.UUID(folder_id) for folder_id in self.path.split(PATH_SEPARATOR) if folder_id]
+        if not include_self:
+            ids = ids[:-1]
+        return Folder.objects.filter(id__in=ids).order_by('depth')
+
+    def get_subtree_notes(self):
+        from .note import Note  # Avoids a circular import
+        return Note.objects.filter(notebook_id=self.notebook_id, note_group__parent_folder__path__startswith=self.path)
 
     @property
     def is_empty(self):
@@ -30,6 +30,8 @@ class Invite(models.Model):
     class Meta:
         verbose_name = _('convite')
         verbose_name_plural = _('convites')
+        indexes = [models.Index(fields=['receiver', 'invite_date', 'id'], name='core_invite_receiver_date_idx'),
+                   models.Index(fields=['sender', 'invite_date', 'id'], name='core_invite_sender_date_idx')]
 
     def accept(self):
         with transaction.atomic():
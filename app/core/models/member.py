@@ -44,6 +44,7 @@ class Member(models.Model):
         verbose_name = _('membro')
         verbose_name_plural = _('membros')
         unique_together = ('user', 'notebook')
+        indexes = [models.Index(fields=['notebook', 'member_since', 'id'], name='core_member_notebook_date_idx')]
 
     def __str__(self):
         return f'{self.notebook}: {self.user}'
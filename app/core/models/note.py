@@ -1,9 +1,32 @@
 import uuid
 
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import DatabaseError, models, transaction
+from django.db.models import F
 from django.utils.translation import gettext_lazy as _
 
 
+class NoteQuerySet(models.QuerySet):
+    def move_to_notebook(self, notebook_id):
+        """Update the denormalized notebook of the notes and of everything attached to them"""
+        from .attachment import Attachment
+        from .comment import Comment
+        from .rating import Rating
+
+        notes = self.values('pk')
+        for model in (Comment, Attachment, Rating):
+            model.objects.filter(note__in=notes).update(notebook_id=notebook_id)
+        return self.update(notebook_id=notebook_id)
+
+    def touch(self, **fields):
+        """Update the notes bumping their related version, for changes shown with them (ratings, attachments)"""
+        return self.update(related_version=F('related_version') + 1, **fields)
+
+
+class VersionConflict(DatabaseError):
+    """The note was saved by someone else after it was loaded"""
+
+
 class Note(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False,
                           help_text=_("ID único seguindo o padrão UUID4."))
@@ -17,6 +40,11 @@ class Note(models.Model):
                                    related_name='notes',
                                    related_query_name='note'
                                    )
+    notebook = models.ForeignKey('Notebook', on_delete=models.CASCADE, editable=False, verbose_name=_('caderno'),
+                                 help_text=_('Caderno onde a anotação se localiza (desnormalizado do conjunto).'),
+                                 related_name='notes',
+                                 related_query_name='note'
+                                 )
     title = models.CharField(max_length=255, blank=False, verbose_name=_("título"), help_text=_('Título da anotação.'))
 
     creation_date = models.DateTimeField(auto_now_add=True, verbose_name=_("data de criação"),
@@ -31,17 +59,66 @@ class Note(models.Model):
                                        verbose_name=_('última edição por'),
                                        help_text=_("Indica quem realizou a última edição."))
 
+    rating_sum = models.IntegerField(default=0, editable=False, verbose_name=_('soma das avaliações'),
+                                     help_text=_('Soma dos valores das avaliações da anotação.'))
+
+    rating_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('quantidade de avaliações'),
+                                               help_text=_('Quantidade de avaliações da anotação.'))
+
+    search_vector = SearchVectorField(null=True, editable=False, verbose_name=_('vetor de busca'),
+                                      help_text=_('Vetor de busca do título e conteúdo (apenas PostgreSQL).'))
+
+    version = models.PositiveIntegerField(default=1, editable=False, verbose_name=_('versão'),
+                                          help_text=_('Incrementada a cada edição, detecta edições concorrentes.'))
+
+    related_version = models.PositiveIntegerField(default=0, editable=False,
+                                                  verbose_name=_('versão dos relacionados'),
+                                                  help_text=_('Incrementada quando as avaliações ou os anexos '
+                                                              'mostrados com a anotação mudam.'))
+
+    objects = NoteQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('anotação')
         verbose_name_plural = _('anotações')
 
-    @property
-    def notebook(self):
-        return self.note_group.notebook
+    def save(self, *args, **kwargs):
+        """
+        Keep the denormalized notebook in sync with the note group and bump the version
+
+        Updates only apply to the version that was loaded, `VersionConflict` is raised when it changed since.
+        """
+        previous_notebook_id = self.notebook_id
+        if previous_notebook_id is None or Note.note_group.is_cached(self):
+            self.notebook_id = self.note_group.notebook_id
+
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        if not self._state.adding:
+            self.version += 1
+
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                if previous_notebook_id not in (None, self.notebook_id):
+                    Note.objects.filter(pk=self.pk).move_to_notebook(self.notebook_id)
+        except VersionConflict:
+            self.version -= 1
+            raise
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # UPDATE ... WHERE version = <loaded version>
+        updated = super()._do_update(base_qs.filter(version=self.version - 1), using, pk_val, values, update_fields,
+                                     forced_update)
+        if not updated:
+            raise VersionConflict(f'Note {pk_val} was modified after version {self.version - 1}')
+        return updated
 
     @property
     def avg_rating(self):
-        return self.ratings.aggregate(models.Avg('rating'))['rating__avg']
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
 
     def __str__(self):
         return self.title
@@ -1,6 +1,6 @@
 import uuid
 
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
 
@@ -15,14 +15,27 @@ class NoteGroup(models.Model):
                                       help_text=_('Pasta em que este conjunto se localiza'),
                                       related_name='note_groups',
                                       related_query_name='note_group')
+    notebook = models.ForeignKey('Notebook', on_delete=models.CASCADE, editable=False, verbose_name=_('caderno'),
+                                 help_text=_('Caderno onde o conjunto se localiza (desnormalizado da pasta pai).'),
+                                 related_name='note_groups',
+                                 related_query_name='note_group')
 
     class Meta:
         verbose_name = _('conjunto de anotação')
         verbose_name_plural = _('conjunto de anotações')
 
-    @property
-    def notebook(self):
-        return self.parent_folder.notebook
+    def save(self, *args, **kwargs):
+        """Keep the denormalized notebook in sync with the parent folder"""
+        from .note import Note
+
+        previous_notebook_id = self.notebook_id
+        if previous_notebook_id is None or NoteGroup.parent_folder.is_cached(self):
+            self.notebook_id = self.parent_folder.notebook_id
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if previous_notebook_id not in (None, self.notebook_id):
+                Note.objects.filter(note_group=self).move_to_notebook(self.notebook_id)
 
     @property
     def is_empty(self):
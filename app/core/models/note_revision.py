@@ -0,0 +1,141 @@
+import difflib
+import hashlib
+import json
+import uuid
+import zlib
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils.translation import gettext_lazy as _
+
+
+def encode_delta(previous: str, content: str) -> list:
+    """Line based delta, `[start, end]` copies lines from the previous content and strings are inserted"""
+    previous_lines = previous.splitlines(keepends=True)
+    lines = content.splitlines(keepends=True)
+    delta = []
+    matcher = difflib.SequenceMatcher(None, previous_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2])
+        elif j1 != j2:
+            delta.append(''.join(lines[j1:j2]))
+    return delta
+
+
+def apply_delta(previous: str, delta: list) -> str:
+    previous_lines = previous.splitlines(keepends=True)
+    return ''.join(''.join(previous_lines[op[0]:op[1]]) if isinstance(op, list) else op for op in delta)
+
+
+def compress(data) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(',', ':')).encode())
+
+
+def decompress(data) -> object:
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+class NoteRevisionManager(models.Manager):
+    def record(self, note, previous_content=None, author_id=None):
+        """
+        Store the note's current content as its next revision
+
+        A delta against `previous_content` is stored when it matches the latest revision, otherwise (first revision,
+        every `NOTE_REVISION_SNAPSHOT_INTERVAL` revisions or when the delta isn't smaller) a full snapshot is stored.
+        Called with the note's save, in the same transaction.
+        """
+        with transaction.atomic():
+            # Concurrent saves of the note wait for each other here, so they never pick the same number
+            list(type(note)._base_manager.select_for_update().filter(pk=note.pk).values_list('pk', flat=True))
+            content = note.content or ''
+            content_hash = hashlib.sha256(content.encode()).hexdigest()
+            latest = self.filter(note_id=note.pk).order_by('-number') \
+                .only('number', 'content_hash', 'snapshot_number').first()
+
+            revision = self.model(note_id=note.pk, author_id=author_id, content_hash=content_hash, length=len(content))
+            revision.number = latest.number + 1 if latest else 1
+
+            snapshot = compress(content)
+            revision.data, revision.is_snapshot = snapshot, True
+            if latest and previous_content is not None \
+                    and revision.number - latest.snapshot_number < settings.NOTE_REVISION_SNAPSHOT_INTERVAL \
+                    and hashlib.sha256(previous_content.encode()).hexdigest() == latest.content_hash:
+                delta = compress(encode_delta(previous_content, content))
+                if len(delta) < len(snapshot):
+                    revision.data, revision.is_snapshot = delta, False
+
+            revision.snapshot_number = revision.number if revision.is_snapshot else latest.snapshot_number
+            revision.save()
+            return revision
+
+    def rebuild(self, note_id, *numbers):
+        """Content of the given revisions, replayed from the closest snapshot in a single query"""
+        numbers = set(numbers)
+        start = self.filter(note_id=note_id, number=min(numbers)).values_list('snapshot_number', flat=True).first()
+        if start is None:
+            raise self.model.DoesNotExist()
+
+        contents = {}
+        content = ''
+        revisions = self.filter(note_id=note_id, number__gte=start, number__lte=max(numbers)) \
+            .order_by('number').values_list('number', 'is_snapshot', 'data')
+        for number, is_snapshot, data in revisions.iterator():
+            content = decompress(data) if is_snapshot else apply_delta(content, decompress(data))
+            if number in numbers:
+                contents[number] = content
+
+        if len(contents) != len(numbers):
+            raise self.model.DoesNotExist()
+        return contents
+
+    def compact(self, note_id, keep_from):
+        """Delete the revisions before `keep_from`, turning it into a snapshot so the later ones can be rebuilt"""
+        with transaction.atomic():
+            first = self.select_for_update().filter(note_id=note_id, number=keep_from).first()
+            if first is None:
+                return 0
+
+            if not first.is_snapshot:
+                content = self.rebuild(note_id, keep_from)[keep_from]
+                self.filter(note_id=note_id, snapshot_number=first.snapshot_number, number__gte=keep_from) \
+                    .update(snapshot_number=keep_from)
+                self.filter(pk=first.pk).update(data=compress(content), is_snapshot=True)
+
+            deleted, _rows = self.filter(note_id=note_id, number__lt=keep_from).delete()
+            return deleted
+
+
+class NoteRevision(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False,
+                          help_text=_("ID único seguindo o padrão UUID4."))
+
+    note = models.ForeignKey('Note', on_delete=models.CASCADE, related_name='revisions',
+                             verbose_name=_('anotação'), help_text=_('Anotação da revisão'))
+    number = models.PositiveIntegerField(verbose_name=_('número'), help_text=_('Número sequencial da revisão'))
+    author = models.ForeignKey('Member', on_delete=models.SET_NULL, null=True, default=None, related_name='+',
+                               verbose_name=_('autor'), help_text=_('Membro que fez a edição'))
+    creation_date = models.DateTimeField(auto_now_add=True, verbose_name=_('data de criação'),
+                                         help_text=_('Momento da edição'))
+
+    is_snapshot = models.BooleanField(verbose_name=_('cópia completa'),
+                                      help_text=_('Se os dados são o conteúdo completo ou uma diferença'))
+    snapshot_number = models.PositiveIntegerField(verbose_name=_('número da cópia completa'),
+                                                  help_text=_('Revisão completa a partir da qual esta é reconstruída'))
+    data = models.BinaryField(verbose_name=_('dados'),
+                              help_text=_('Conteúdo ou diferença para a revisão anterior, comprimidos'))
+    content_hash = models.CharField(max_length=64, verbose_name=_('hash do conteúdo'),
+                                    help_text=_('SHA-256 do conteúdo da revisão'))
+    length = models.PositiveIntegerField(verbose_name=_('tamanho'), help_text=_('Tamanho do conteúdo da revisão'))
+
+    objects = NoteRevisionManager()
+
+    class Meta:
+        verbose_name = _('revisão de anotação')
+        verbose_name_plural = _('revisões de anotações')
+        constraints = [
+            models.UniqueConstraint(fields=('note', 'number'), name='core_noterevision_note_number_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.note_id} #{self.number}'
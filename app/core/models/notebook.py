@@ -12,7 +12,8 @@ class NotebookManager(models.Manager):
     def create_notebook(self, owner=None, **kwargs):
         notebook = self.create(owner=owner, **kwargs)
         Member.objects.create(user=owner, notebook=notebook, role=Member.Roles.ADMIN)  # Create owner as member
-        Folder.objects.create(notebook=notebook, parent_folder=None, title='root')  # Create root folder
+        # Create root folder, Folder.save stores it on the notebook row
+        notebook.root_folder = Folder.objects.create(notebook=notebook, parent_folder=None, title='root')
         return notebook
 
 
@@ -30,16 +31,16 @@ class Notebook(models.Model):
                               related_name='notebooks',
                               related_query_name='notebook'
                               )
+    root_folder = models.ForeignKey('Folder', null=True, on_delete=models.SET_NULL, editable=False,
+                                    verbose_name=_('pasta raiz'), help_text=_('Pasta raiz do caderno.'),
+                                    related_name='+')
 
     objects = NotebookManager()
 
     class Meta:
         verbose_name = _('caderno')
         verbose_name_plural = _('cadernos')
-
-    @property
-    def root_folder(self):
-        return self.folders.get(parent_folder=None)
+        indexes = [models.Index(fields=['creation_date', 'id'], name='core_notebook_date_idx')]
 
     @property
     def owner_as_member(self):
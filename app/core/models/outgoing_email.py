@@ -0,0 +1,66 @@
+import uuid
+
+from django.core.mail import EmailMultiAlternatives
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutgoingEmailManager(models.Manager):
+    def enqueue(self, message: EmailMultiAlternatives):
+        """Store a message to be delivered by the `send_queued_email` worker"""
+        html_body = next((content for content, mimetype in getattr(message, 'alternatives', [])
+                          if mimetype == 'text/html'), '')
+        return self.create(subject=message.subject, body=message.body, html_body=html_body,
+                           from_email=message.from_email, recipients=list(message.recipients()))
+
+    def due(self):
+        return self.filter(status=OutgoingEmail.Status.PENDING, next_attempt__lte=timezone.now()) \
+            .order_by('next_attempt')
+
+
+class OutgoingEmail(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False,
+                          help_text=_("ID único seguindo o padrão UUID4."))
+
+    subject = models.CharField(max_length=255, verbose_name=_('assunto'), help_text=_('Assunto do e-mail'))
+    body = models.TextField(verbose_name=_('corpo'), help_text=_('Corpo em texto puro do e-mail'))
+    html_body = models.TextField(blank=True, verbose_name=_('corpo HTML'), help_text=_('Corpo em HTML do e-mail'))
+    from_email = models.CharField(max_length=255, verbose_name=_('remetente'), help_text=_('Remetente do e-mail'))
+    recipients = models.JSONField(verbose_name=_('destinatários'), help_text=_('Lista de destinatários do e-mail'))
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('pendente')
+        SENT = 'sent', _('enviado')
+        FAILED = 'failed', _('falhou')
+
+    status = models.CharField(max_length=7, choices=Status.choices, default=Status.PENDING,
+                              verbose_name=_('situação'), help_text=_('Situação do envio do e-mail'))
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name=_('tentativas'),
+                                                help_text=_('Quantidade de tentativas de envio'))
+    next_attempt = models.DateTimeField(default=timezone.now, verbose_name=_('próxima tentativa'),
+                                        help_text=_('Momento a partir do qual o e-mail pode ser enviado'))
+    last_error = models.TextField(blank=True, verbose_name=_('último erro'),
+                                  help_text=_('Erro da última tentativa de envio'))
+
+    creation_date = models.DateTimeField(auto_now_add=True, verbose_name=_("data de criação"),
+                                         help_text=_("Data de entrada do e-mail na fila"))
+    sent_date = models.DateTimeField(null=True, default=None, verbose_name=_('data de envio'),
+                                     help_text=_('Data em que o e-mail foi enviado'))
+
+    objects = OutgoingEmailManager()
+
+    class Meta:
+        verbose_name = _('e-mail de saída')
+        verbose_name_plural = _('e-mails de saída')
+        indexes = [models.Index(fields=['status', 'next_attempt'], name='core_outgoing_email_due_idx')]
+
+    def to_message(self, connection=None):
+        message = EmailMultiAlternatives(self.subject, self.body, self.from_email, self.recipients,
+                                         connection=connection)
+        if self.html_body:
+            message.attach_alternative(self.html_body, 'text/html')
+        return message
+
+    def __str__(self):
+        return f'{self.subject} => {", ".join(self.recipients)}'
@@ -1,8 +1,11 @@
 import uuid
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.utils.translation import gettext_lazy as _
 
+from .note import Note
+
 
 class Rating(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False,
@@ -13,6 +16,11 @@ class Rating(models.Model):
                              related_name='ratings', related_query_name='rating'
                              )
 
+    notebook = models.ForeignKey('Notebook', on_delete=models.CASCADE, editable=False, verbose_name=_('caderno'),
+                                 help_text=_('Caderno da avaliação (desnormalizado da anotação).'),
+                                 related_name='ratings', related_query_name='rating'
+                                 )
+
     rating = models.IntegerField(verbose_name=_('avaliação'),
                                  help_text=_('Valor da avaliação dada.'), )  # Adicionar validators
 
@@ -30,5 +38,33 @@ class Rating(models.Model):
         verbose_name_plural = _('avaliações')
         unique_together = ('note', 'rater')
 
+    def save(self, *args, **kwargs):
+        """Save the rating and keep the note's rating aggregates in sync, also when it's moved to another note"""
+        with transaction.atomic():
+            previous_note_id, previous = None, None
+            if not self._state.adding:
+                previous_note_id, previous = Rating.objects.select_for_update().filter(pk=self.pk) \
+                    .values_list('note_id', 'rating').first() or (None, None)
+
+            if previous_note_id is not None and previous_note_id != self.note_id:
+                Note.objects.filter(pk=previous_note_id).touch(
+                    rating_sum=F('rating_sum') - previous,
+                    rating_count=F('rating_count') - 1,
+                )
+                previous = None  # Counted on the new note as a new rating
+
+            if self.notebook_id is None or previous_note_id != self.note_id or Rating.note.is_cached(self):
+                self.notebook_id = self.note.notebook_id
+
+            super().save(*args, **kwargs)
+
+            Note.objects.filter(pk=self.note_id).touch(
+                rating_sum=F('rating_sum') + self.rating - (previous or 0),
+                rating_count=F('rating_count') + (1 if previous is None else 0),
+            )
+
+        if Rating.note.is_cached(self):
+            self.note.refresh_from_db(fields=('rating_sum', 'rating_count', 'related_version'))
+
     def __str__(self):
         return f'{{{self.note}}}/{{{self.rater}}}: {self.rating}'
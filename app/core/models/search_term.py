@@ -0,0 +1,24 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SearchTerm(models.Model):
+    """Posting of the inverted index used by the search engine when PostgreSQL isn't available"""
+    note = models.ForeignKey('Note', on_delete=models.CASCADE, verbose_name=_('anotação'),
+                             help_text=_('Anotação onde o termo ocorre.'),
+                             related_name='search_terms',
+                             related_query_name='search_term')
+    term = models.CharField(max_length=64, db_index=True, verbose_name=_('termo'),
+                            help_text=_('Termo normalizado.'))
+    title_count = models.PositiveIntegerField(default=0, verbose_name=_('ocorrências no título'),
+                                              help_text=_('Quantidade de ocorrências do termo no título.'))
+    content_count = models.PositiveIntegerField(default=0, verbose_name=_('ocorrências no conteúdo'),
+                                                help_text=_('Quantidade de ocorrências do termo no conteúdo.'))
+
+    class Meta:
+        verbose_name = _('termo de busca')
+        verbose_name_plural = _('termos de busca')
+        unique_together = ('note', 'term')
+
+    def __str__(self):
+        return f'{self.term}: {{{self.note}}}'
@@ -4,7 +4,6 @@ import uuid
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from django_resized import ResizedImageField
 
 
 def profile_picture_path(instance, filename):
@@ -50,16 +49,17 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255, blank=False, verbose_name=_("nome"))  # Required
     bio = models.CharField(max_length=360, blank=True, default="", verbose_name=_("bio"),
                            help_text=_("Pequena descrição pública do usuário."))
-    profile_picture = ResizedImageField(
+    profile_picture = models.ImageField(
         upload_to=profile_picture_path,
-        size=[512, 512],
-        quality=75,
-        crop=['middle', 'center'],
         blank=True,
         null=True,
         verbose_name=_("foto de perfil"),
         help_text=_("Imagem de perfil do usuário.")
     )
+    # Resized copies, generated off the request by core.images.process_profile_picture
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False,
+                                                verbose_name=_("variantes da foto de perfil"),
+                                                help_text=_("Versões redimensionadas da foto de perfil por tamanho."))
 
     is_active = models.BooleanField(default=True, verbose_name=_(
         "ativo"), help_text=_("Indica se a conta do usuário está ativa."))
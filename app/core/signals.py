@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import images
+from core.models import Attachment, Blob, Note, Rating, User
+
+
+@receiver(post_delete, sender=Rating)
+def remove_rating_from_aggregates(sender, instance: Rating, **kwargs):
+    """Keep the note's rating aggregates in sync when a rating is deleted (also on cascades)"""
+    Note.objects.filter(pk=instance.note_id).touch(
+        rating_sum=F('rating_sum') - instance.rating,
+        rating_count=F('rating_count') - 1,
+    )
+
+
+@receiver(post_save, sender=Attachment)
+@receiver(post_delete, sender=Attachment)
+def touch_attachment_note(sender, instance: Attachment, raw=False, **kwargs):
+    """Attachments are shown with the note, its related version tells clients their copy is outdated"""
+    if not raw:
+        Note.objects.filter(pk=instance.note_id).touch()
+
+
+@receiver(post_delete, sender=Attachment)
+def release_attachment_file(sender, instance: Attachment, **kwargs):
+    """Drop the attachment's reference to its blob, attachments older than blobs own their file"""
+    if instance.blob_id is not None:
+        Blob.objects.release(instance.blob_id)
+    elif instance.uploaded_file:
+        storage, name = instance.uploaded_file.storage, instance.uploaded_file.name
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+@receiver(post_save, sender=User)
+def process_profile_picture(sender, instance: User, raw=False, **kwargs):
+    """Generate the avatar variants off the request whenever the picture changes"""
+    if raw:
+        return
+
+    name = instance.profile_picture.name if instance.profile_picture else ''
+    variants = instance.profile_picture_variants or {}
+    if name and variants.get(images.SOURCE_KEY) != name:
+        images.schedule(images.process_profile_picture, instance.pk, name)
+    elif not name and variants:
+        User.objects.filter(pk=instance.pk).update(profile_picture_variants={})
+        instance.profile_picture_variants = {}
+        storage = instance.profile_picture.storage
+        transaction.on_commit(lambda: images.delete_variants(variants, storage=storage))
+
+
+@receiver(post_save, sender=Blob)
+def process_blob_thumbnails(sender, instance: Blob, created, raw=False, **kwargs):
+    if created and not raw and images.is_image_name(instance.file.name):
+        images.schedule(images.process_blob, instance.pk)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Blob)
+def delete_image_variants(sender, instance, **kwargs):
+    """django_cleanup only knows about the original files"""
+    if isinstance(instance, User):
+        variants, storage = instance.profile_picture_variants, instance.profile_picture.storage
+    else:
+        variants, storage = instance.variants, instance.file.storage
+    if variants:
+        transaction.on_commit(lambda: images.delete_variants(variants, storage=storage))
@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.models import Attachment, Blob, Member, Note, NoteGroup, Notebook, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(DEFAULT_FILE_STORAGE='django.core.files.storage.FileSystemStorage', MEDIA_ROOT=MEDIA_ROOT)
+class BlobTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        user = User.objects.create_user(email='blob@test.io', name='Blob', password='blob_pw')
+        notebook = Notebook.objects.create_notebook(owner=user, title='Blobs')
+        membership = Member.objects.get(user=user, notebook=notebook)
+        note_group = NoteGroup.objects.create(parent_folder=notebook.root_folder, title='Group')
+        self.notes = [Note.objects.create(note_group=note_group, author=membership, title=f'Note {i}')
+                      for i in range(3)]
+
+    def test_deduplication(self):
+        attachments = [Attachment.objects.create_attachment(note, SimpleUploadedFile('paper.pdf', b'same content'))
+                       for note in self.notes]
+        other = Attachment.objects.create_attachment(self.notes[0], SimpleUploadedFile('other.pdf', b'other'))
+
+        self.assertEqual(Blob.objects.count(), 2)
+        blob = Blob.objects.get(pk=attachments[0].blob_id)
+        self.assertEqual(blob.ref_count, 3)
+        self.assertEqual({attachment.uploaded_file.name for attachment in attachments}, {blob.file.name})
+        self.assertTrue(blob.file.name.startswith(f'blobs/{blob.sha256[:2]}/{blob.sha256}'))
+        self.assertTrue(default_storage.exists(blob.file.name))
+
+        # The blob is only removed with the last reference
+        attachments[0].delete()
+        attachments[1].delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+
+        attachments[2].delete()
+        self.assertFalse(Blob.objects.filter(pk=blob.pk).exists())
+        self.assertEqual(Blob.objects.get().pk, other.blob_id)
+
+    def test_deduplicate_legacy_attachments(self):
+        legacy = [Attachment.objects.create(note=note, uploaded_file=SimpleUploadedFile('old.txt', b'legacy'))
+                  for note in self.notes[:2]]
+
+        call_command('deduplicate_attachments', stdout=StringIO())
+
+        blob = Blob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        for attachment in legacy:
+            attachment.refresh_from_db()
+            self.assertEqual(attachment.blob, blob)
+            self.assertEqual(attachment.uploaded_file.name, blob.file.name)
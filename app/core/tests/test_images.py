@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from core.images import VARIANT_SIZES
+from core.models import Attachment, Blob, Member, Note, NoteGroup, Notebook, User
+from notebook.serializers.member import AUTHOR_AVATAR_SIZE, AuthorSerializer
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def create_image(name='picture.png', size=(800, 600)):
+    output = BytesIO()
+    Image.new('RGB', size, color='purple').save(output, 'PNG')
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/png')
+
+
+@override_settings(DEFAULT_FILE_STORAGE='django.core.files.storage.FileSystemStorage', MEDIA_ROOT=MEDIA_ROOT,
+                   IMAGE_PIPELINE_SYNC=True)
+class ImagePipelineTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='images@test.io', name='Images', password='images_pw')
+
+    def test_profile_picture_variants(self):
+        self.user.profile_picture = create_image()
+        self.user.save()
+        self.user.refresh_from_db()
+
+        variants = self.user.profile_picture_variants
+        self.assertEqual(variants['source'], self.user.profile_picture.name)
+        for size in VARIANT_SIZES:
+            with default_storage.open(variants[str(size)]) as file:
+                image = Image.open(file)
+                self.assertEqual(image.format, 'WEBP')
+                self.assertEqual(image.size, (size, size))
+
+        notebook = Notebook.objects.create_notebook(owner=self.user, title='Avatars')
+        author = AuthorSerializer(Member.objects.get(user=self.user, notebook=notebook)).data
+        self.assertTrue(author['profile_picture'].endswith(f'-{AUTHOR_AVATAR_SIZE}.webp'))
+
+        # Replacing the picture replaces the variants
+        old_variants = variants
+        self.user.profile_picture = create_image('other.png')
+        self.user.save()
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.profile_picture_variants['48'], old_variants['48'])
+        self.assertFalse(default_storage.exists(old_variants['48']))
+
+        # Removing the picture
+        self.user.profile_picture = None
+        self.user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_picture_variants, {})
+
+    def test_attachment_thumbnails(self):
+        notebook = Notebook.objects.create_notebook(owner=self.user, title='Thumbnails')
+        membership = Member.objects.get(user=self.user, notebook=notebook)
+        note_group = NoteGroup.objects.create(parent_folder=notebook.root_folder, title='Group')
+        note = Note.objects.create(note_group=note_group, author=membership, title='Note')
+
+        attachment = Attachment.objects.create_attachment(note, create_image(size=(1024, 256)))
+        blob = Blob.objects.get(pk=attachment.blob_id)
+        with default_storage.open(blob.variants['128']) as file:
+            self.assertEqual(Image.open(file).size, (128, 32))  # Aspect ratio is kept
+
+        document = Attachment.objects.create_attachment(note, SimpleUploadedFile('notes.txt', b'not an image'))
+        self.assertEqual(Blob.objects.get(pk=document.blob_id).variants, {})
@@ -0,0 +1,67 @@
+from smtplib import SMTPException
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.mail import deliver_queued_email
+from core.models import OutgoingEmail
+
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+def enqueue(index=0):
+    message = EmailMultiAlternatives(f'Subject {index}', 'Text', 'noreply@cnotes.io', [f'user{index}@cnotes.io'])
+    message.attach_alternative('<p>Text</p>', 'text/html')
+    return OutgoingEmail.objects.enqueue(message)
+
+
+@override_settings(EMAIL_QUEUE_BATCH_SIZE=10, EMAIL_QUEUE_MAX_ATTEMPTS=3, EMAIL_QUEUE_RETRY_DELAY=30,
+                   EMAIL_QUEUE_MAX_RETRY_DELAY=3600)
+class OutgoingEmailQueueTests(TestCase):
+
+    def test_batch_over_single_connection(self):
+        for i in range(12):
+            enqueue(i)
+
+        with mock.patch(f'{LOCMEM_BACKEND}.open') as open_connection:
+            self.assertEqual(deliver_queued_email(), (10, 0))
+        open_connection.assert_called_once()
+
+        self.assertEqual(len(mail.outbox), 10)
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Text</p>', 'text/html')])
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.Status.SENT).count(), 10)
+
+        self.assertEqual(deliver_queued_email(), (2, 0))
+        self.assertEqual(deliver_queued_email(), (0, 0))
+
+    def test_retry_with_backoff(self):
+        email = enqueue()
+
+        with mock.patch(f'{LOCMEM_BACKEND}.send_messages', side_effect=SMTPException('boom')):
+            self.assertEqual(deliver_queued_email(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutgoingEmail.Status.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertIn('boom', email.last_error)
+            self.assertGreater(email.next_attempt, timezone.now())
+
+            # Not due yet
+            self.assertEqual(deliver_queued_email(), (0, 0))
+
+            first_delay = email.next_attempt - timezone.now()
+            OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt=timezone.now())
+            deliver_queued_email()
+            email.refresh_from_db()
+            self.assertGreater(email.next_attempt - timezone.now(), first_delay)
+
+            OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt=timezone.now())
+            deliver_queued_email()
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutgoingEmail.Status.FAILED)
+            self.assertEqual(email.attempts, 3)
+
+        self.assertEqual(deliver_queued_email(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
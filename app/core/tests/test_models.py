@@ -1,5 +1,10 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 from core.models import User, Notebook, Folder, NoteGroup, Member, Invite, Activity, Note, Rating, Comment
+from core.models.folder import MAX_DEPTH
+from django.core.exceptions import ValidationError
 from django.db.utils import IntegrityError
 
 from datetime import datetime
@@ -133,6 +138,51 @@ class ModelTests(TestCase):
         sub_folders = root_folder.sub_folders.all()
         self.assertIn(sub_folder, sub_folders)
 
+    def test_folder_path(self):
+        """Test the materialized path of folders"""
+        test_user = create_test_user()
+        test_notebook = create_test_notebook(test_user)
+        test_member = create_test_member(test_user, test_notebook)
+        root_folder = create_test_folder(test_notebook)
+        folder_a = create_test_folder(test_notebook, root_folder)
+        folder_b = create_test_folder(test_notebook, folder_a)
+        folder_c = create_test_folder(test_notebook, folder_b)
+        create_test_note(test_member, create_test_note_group(folder_c))
+
+        self.assertEqual(folder_c.path, f'{root_folder.id.hex}/{folder_a.id.hex}/{folder_b.id.hex}/{folder_c.id.hex}/')
+        self.assertEqual(folder_c.depth, 3)
+        self.assertEqual(list(folder_c.get_ancestors()), [root_folder, folder_a, folder_b])
+        self.assertEqual(set(folder_a.get_descendants()), {folder_a, folder_b, folder_c})
+        self.assertEqual(folder_a.get_subtree_notes().count(), 1)
+
+        # Cycles
+        with self.assertRaises(ValidationError):
+            folder_a.clean(parent_folder=folder_c)
+
+        # Moving rewrites the whole subtree
+        folder_b.parent_folder = root_folder
+        folder_b.save()
+        folder_c.refresh_from_db()
+        self.assertEqual(folder_c.path, f'{root_folder.id.hex}/{folder_b.id.hex}/{folder_c.id.hex}/')
+        self.assertEqual(folder_c.depth, 2)
+        self.assertEqual(folder_a.get_subtree_notes().count(), 0)
+        self.assertEqual(root_folder.get_subtree_notes().count(), 1)
+
+        # Depth limit, counting the subtree being moved
+        deepest = folder_a
+        for _ in range(MAX_DEPTH - 2):
+            deepest = create_test_folder(test_notebook, deepest)
+        self.assertEqual(deepest.depth, MAX_DEPTH - 1)
+        deepest.clean(parent_folder=deepest.parent_folder)
+        with self.assertRaises(ValidationError):
+            folder_c.clean(parent_folder=deepest)
+        with self.assertRaises(ValidationError):
+            folder_b.clean(parent_folder=deepest.parent_folder)
+
+        # Deleting removes the subtree
+        folder_a.delete()
+        self.assertEqual(set(Folder.objects.filter(notebook=test_notebook)), {root_folder, folder_b, folder_c})
+
     def test_note_group_creation(self):
         """Test the creation of a NoteGroup"""
         test_user = create_test_user()
@@ -233,6 +283,99 @@ class ModelTests(TestCase):
         with self.assertRaises(IntegrityError):
             Rating.objects.create(note=test_note, rating=8, rater=test_member)
 
+    def test_rating_aggregates(self):
+        """Test the denormalized rating aggregates of a note"""
+        test_user = create_test_user()
+        other_user = create_test_user(mail='other@celebridades.net')
+        test_notebook = create_test_notebook(test_user)
+        test_member = create_test_member(test_user, test_notebook)
+        other_member = create_test_member(other_user, test_notebook)
+        test_note = create_test_note(test_member, create_test_note_group(create_test_folder(test_notebook)))
+
+        self.assertIsNone(test_note.avg_rating)
+
+        test_rating = Rating.objects.create(note=test_note, rating=5, rater=test_member)
+        Rating.objects.create(note=test_note, rating=2, rater=other_member)
+        test_note.refresh_from_db()
+        self.assertEqual((test_note.rating_sum, test_note.rating_count), (7, 2))
+        self.assertEqual(test_note.avg_rating, 3.5)
+
+        # Changing a rating doesn't count it twice
+        test_rating.rating = 1
+        test_rating.save()
+        test_note.refresh_from_db()
+        self.assertEqual((test_note.rating_sum, test_note.rating_count), (3, 2))
+
+        # Moving a rating takes it out of the previous note
+        other_note = create_test_note(test_member, test_note.note_group, title='Other Note')
+        test_rating.note = other_note
+        test_rating.save()
+        test_note.refresh_from_db()
+        other_note.refresh_from_db()
+        self.assertEqual((test_note.rating_sum, test_note.rating_count), (2, 1))
+        self.assertEqual((other_note.rating_sum, other_note.rating_count), (1, 1))
+
+        test_rating.note = test_note
+        test_rating.save()
+        test_note.refresh_from_db()
+        self.assertEqual((test_note.rating_sum, test_note.rating_count), (3, 2))
+
+        test_rating.delete()
+        test_note.refresh_from_db()
+        self.assertEqual((test_note.rating_sum, test_note.rating_count), (2, 1))
+
+        # Cascade deletes
+        other_member.delete()
+        test_note.refresh_from_db()
+        self.assertEqual((test_note.rating_sum, test_note.rating_count), (0, 0))
+        self.assertIsNone(test_note.avg_rating)
+
+    def test_rebuild_rating_aggregates(self):
+        """Test the rebuild_rating_aggregates command"""
+        test_user = create_test_user()
+        test_notebook = create_test_notebook(test_user)
+        test_member = create_test_member(test_user, test_notebook)
+        test_note = create_test_note(test_member, create_test_note_group(create_test_folder(test_notebook)))
+        Rating.objects.create(note=test_note, rating=4, rater=test_member)
+
+        Note.objects.update(rating_sum=0, rating_count=0)
+        call_command('rebuild_rating_aggregates', stdout=StringIO())
+
+        test_note.refresh_from_db()
+        self.assertEqual((test_note.rating_sum, test_note.rating_count), (4, 1))
+
+    def test_denormalized_notebook(self):
+        """Test that the notebook is stored on note groups, notes and their dependents"""
+        test_user = create_test_user()
+        test_notebook = create_test_notebook(test_user)
+        other_notebook = create_test_notebook(test_user)
+        test_member = create_test_member(test_user, test_notebook)
+        test_folder = create_test_folder(test_notebook)
+        test_note_group = create_test_note_group(test_folder)
+        test_note = create_test_note(test_member, test_note_group)
+        test_comment = Comment.objects.create(note=test_note, commenter=test_member, message='Test')
+        test_rating = Rating.objects.create(note=test_note, rater=test_member, rating=3)
+
+        for instance in (test_note_group, test_note, test_comment, test_rating):
+            instance.refresh_from_db()
+            self.assertEqual(instance.notebook_id, test_notebook.id)
+
+        # Moving the note group moves everything under it
+        test_note_group.parent_folder = create_test_folder(other_notebook)
+        test_note_group.save()
+
+        for instance in (test_note_group, test_note, test_comment, test_rating):
+            instance.refresh_from_db()
+            self.assertEqual(instance.notebook_id, other_notebook.id)
+
+        # Moving a note
+        test_note.note_group = create_test_note_group(test_folder)
+        test_note.save()
+
+        for instance in (test_note, test_comment, test_rating):
+            instance.refresh_from_db()
+            self.assertEqual(instance.notebook_id, test_notebook.id)
+
     def test_comment_creation(self):
         """Test comment creation"""
         test_user = create_test_user()
@@ -265,3 +408,8 @@ class ModelTests(TestCase):
         self.assertEqual(membership.role, Member.Roles.ADMIN)  # Assert right role assignment
 
         Folder.objects.get(notebook=test_notebook, parent_folder=None)  # If root folder not found, raises exception
+
+        root_folder = Folder.objects.get(notebook=test_notebook, parent_folder=None)
+        self.assertEqual(test_notebook.root_folder, root_folder)
+        test_notebook.refresh_from_db()
+        self.assertEqual(test_notebook.root_folder_id, root_folder.id)  # Stored on the notebook row
@@ -0,0 +1,89 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+
+from core.models import Folder, Member, Note, Notebook, NoteGroup, NoteRevision, User
+
+
+class NoteRevisionTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(email='history@keep.er', name='History Keeper', password='hist0ryK33p')
+        notebook = Notebook.objects.create_notebook(owner=user, title='History')
+        self.member = Member.objects.get(notebook=notebook, user=user)
+        folder = Folder.objects.get(notebook=notebook, parent_folder=None)
+        note_group = NoteGroup.objects.create(parent_folder=folder, title='Group')
+        self.note = Note.objects.create(note_group=note_group, author=self.member, title='Note',
+                                        content='first line\nsecond line\n')
+
+    def edit(self, content):
+        self.note.content = content
+        self.note.save()
+
+    @override_settings(NOTE_REVISION_SNAPSHOT_INTERVAL=3)
+    def test_revisions(self):
+        contents = ['first line\nsecond line\n']
+        for i in range(7):
+            contents.append(contents[-1] + ''.join(f'line {i}.{j}\n' for j in range(50)))
+            self.edit(contents[-1])
+
+        # Title changes don't create revisions
+        self.note.title = 'Renamed'
+        self.note.save()
+
+        revisions = list(NoteRevision.objects.filter(note=self.note).order_by('number'))
+        self.assertEqual([revision.number for revision in revisions], list(range(1, 9)))
+        self.assertEqual([revision.is_snapshot for revision in revisions],
+                         [True, False, False, True, False, False, True, False])
+        self.assertEqual(revisions[-1].author, self.member)
+
+        for number, content in enumerate(contents, start=1):
+            self.assertEqual(NoteRevision.objects.rebuild(self.note.id, number)[number], content)
+
+        with self.assertNumQueries(2):
+            rebuilt = NoteRevision.objects.rebuild(self.note.id, 2, 6)
+        self.assertEqual(rebuilt, {2: contents[1], 6: contents[5]})
+
+        with self.assertRaises(NoteRevision.DoesNotExist):
+            NoteRevision.objects.rebuild(self.note.id, 42)
+
+    def test_revision_saved_with_the_note(self):
+        """A revision that can't be stored rolls the content back, the note never has an unrecorded change"""
+        with mock.patch.object(NoteRevision, 'save', side_effect=IntegrityError()), self.assertRaises(IntegrityError):
+            self.edit('lost')
+
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.content, 'first line\nsecond line\n')
+        self.assertEqual(NoteRevision.objects.filter(note=self.note).count(), 1)
+
+    def test_diverged_content(self):
+        # Content written without the model's save has no delta base, the next revision is a snapshot
+        Note.objects.filter(pk=self.note.pk).update(content='changed behind our back\n')
+        self.note.refresh_from_db()
+        self.edit('changed behind our back\nand then edited\n')
+
+        revision = NoteRevision.objects.get(note=self.note, number=2)
+        self.assertTrue(revision.is_snapshot)
+        self.assertEqual(NoteRevision.objects.rebuild(self.note.id, 2)[2], self.note.content)
+
+    @override_settings(NOTE_REVISION_SNAPSHOT_INTERVAL=100)
+    def test_compaction(self):
+        contents = ['first line\nsecond line\n']
+        for i in range(9):
+            contents.append(contents[-1] + ''.join(f'line {i}.{j}\n' for j in range(50)))
+            self.edit(contents[-1])
+
+        call_command('compact_note_revisions', keep_days=0, keep_count=4, stdout=StringIO())
+
+        numbers = list(NoteRevision.objects.filter(note=self.note).order_by('number').values_list('number', flat=True))
+        self.assertEqual(numbers, [7, 8, 9, 10])
+        self.assertTrue(NoteRevision.objects.get(note=self.note, number=7).is_snapshot)
+        for number in numbers:
+            self.assertEqual(NoteRevision.objects.rebuild(self.note.id, number)[number], contents[number - 1])
+
+        # New edits still use deltas against the compacted history
+        self.edit(contents[-1] + 'last\n')
+        self.assertFalse(NoteRevision.objects.get(note=self.note, number=11).is_snapshot)
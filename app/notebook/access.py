@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.models import Member
+
+ACCESS_CACHE_PREFIX = 'notebook-access'
+
+
+def access_cache_key(user_id):
+    return f'{ACCESS_CACHE_PREFIX}:{user_id}'
+
+
+def get_notebook_access(user) -> dict:
+    """
+    Role of the user in the notebooks where they are an active member (None when banned)
+
+    Cached until the user's memberships change.
+    """
+    key = access_cache_key(user.pk)
+    access = cache.get(key)
+
+    if access is None:
+        memberships = Member.objects.filter(user=user, is_active=True).values_list('notebook_id', 'role', 'is_banned')
+        access = {notebook_id: None if is_banned else role for notebook_id, role, is_banned in memberships}
+        cache.set(key, access, settings.NOTEBOOK_ACCESS_CACHE_TIMEOUT)
+
+    return access
+
+
+def get_accessible_notebook_ids(user):
+    """IDs of the notebooks where the user is an active member"""
+    return list(get_notebook_access(user))
+
+
+def invalidate_notebook_access(user_id):
+    """
+    Drop the cached access, again after the transaction commits
+
+    A request that reads the memberships before the commit can't keep the old access cached.
+    """
+    key = access_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,101 @@
+from django.utils.text import Truncator
+from django.utils.translation import gettext as _
+
+from core.models import Activity, Member
+from notebook import notifications
+
+MAX_TEXT_LENGTH = 255
+BULK_BATCH_SIZE = 500
+
+
+def get_recipient_ids(notebook_id, exclude_user_ids=()):
+    """Ids of the active members of a notebook, without the users who caused the event"""
+    return Member.objects.filter(notebook_id=notebook_id, is_active=True) \
+        .exclude(user_id__in=[user_id for user_id in exclude_user_ids if user_id is not None]) \
+        .values_list('user_id', flat=True)
+
+
+def fan_out(user_ids, title, description):
+    """Write the same activity to every recipient with batched INSERTs"""
+    title = Truncator(title).chars(MAX_TEXT_LENGTH)
+    description = Truncator(description).chars(MAX_TEXT_LENGTH)
+    activities = Activity.objects.bulk_create(
+        [Activity(user_id=user_id, title=title, description=description) for user_id in set(user_ids)],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    notifications.activities_created(activities)
+    return activities
+
+
+def notify_notebook(notebook_id, title, description, actor_id=None):
+    """Send an activity to everyone in a notebook but the actor"""
+    return fan_out(get_recipient_ids(notebook_id, exclude_user_ids=(actor_id,)), title, description)
+
+
+def notify_user(user_id, title, description, actor_id=None):
+    if user_id is None or user_id == actor_id:
+        return []
+    return fan_out((user_id,), title, description)
+
+
+def note_created(note):
+    author = note.author
+    notify_notebook(note.notebook_id, _('Nova anotação'),
+                    _('%(user)s criou a anotação "%(note)s" em %(notebook)s') % {
+                        'user': author.user.name, 'note': note.title, 'notebook': note.notebook.title},
+                    actor_id=author.user_id)
+
+
+def comment_created(comment):
+    commenter = comment.commenter
+    notify_notebook(comment.notebook_id, _('Novo comentário'),
+                    _('%(user)s comentou na anotação "%(note)s"') % {
+                        'user': commenter.user.name, 'note': comment.note.title},
+                    actor_id=commenter.user_id)
+
+
+def rating_created(rating):
+    note = rating.note
+    notify_user(note.author.user_id, _('Nova avaliação'),
+                _('%(user)s avaliou a sua anotação "%(note)s" com nota %(rating)s') % {
+                    'user': rating.rater.user.name, 'note': note.title, 'rating': rating.rating},
+                actor_id=rating.rater.user_id)
+
+
+def invite_created(invite):
+    sender = invite.sender
+    notify_user(invite.receiver_id, _('Novo convite'),
+                _('%(user)s convidou você para o caderno %(notebook)s') % {
+                    'user': sender.user.name, 'notebook': sender.notebook.title},
+                actor_id=sender.user_id)
+
+
+def member_changed(member, previous=None):
+    """Tell the notebook about joins and departures, and the member about bans and role changes"""
+    name, notebook = member.user.name, member.notebook.title
+    was_active = previous is not None and previous['is_active']
+
+    if member.is_active and not was_active:
+        notify_notebook(member.notebook_id, _('Novo membro'),
+                        _('%(user)s entrou no caderno %(notebook)s') % {'user': name, 'notebook': notebook},
+                        actor_id=member.user_id)
+        return
+
+    if previous is None:
+        return
+
+    if was_active and not member.is_active:
+        notify_notebook(member.notebook_id, _('Membro saiu'),
+                        _('%(user)s não faz mais parte do caderno %(notebook)s') % {
+                            'user': name, 'notebook': notebook},
+                        actor_id=member.user_id)
+        return
+
+    if member.is_banned != previous['is_banned']:
+        title = _('Você foi banido') if member.is_banned else _('Você foi desbanido')
+        notify_user(member.user_id, title, _('Caderno %(notebook)s') % {'notebook': notebook})
+
+    if member.role != previous['role']:
+        notify_user(member.user_id, _('Papel alterado'),
+                    _('Seu papel no caderno %(notebook)s agora é %(role)s') % {
+                        'notebook': notebook, 'role': member.get_role_display()})
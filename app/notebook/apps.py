@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class NotebookConfig(AppConfig):
     name = 'notebook'
+
+    def ready(self):
+        from notebook import checks, signals  # noqa: F401
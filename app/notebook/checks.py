@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core import checks
+
+from notebook.drafts import DRAFT_CACHE_ALIAS
+
+UNSHARED_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',  # One per process
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.memcached.MemcachedCache',  # Evicts the least recently used entries
+    'django.core.cache.backends.memcached.PyLibMCCache',
+)
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_draft_cache(app_configs, **kwargs):
+    """Autosaves are acknowledged before they are written, their cache must be shared and must not lose entries"""
+    if settings.CACHES[DRAFT_CACHE_ALIAS]['BACKEND'] in UNSHARED_CACHE_BACKENDS:
+        return [checks.Error(
+            'The note drafts cache is not shared between processes or evicts entries.',
+            hint="Set DRAFT_CACHE_URL to a Redis cache with the 'noeviction' policy.",
+            id='notebook.E001',
+        )]
+    return []
@@ -0,0 +1,8 @@
+"""
+Real-time collaborative editing of notes over WebSockets
+
+Each note being edited has a document (`documents.NoteDocument`) that orders the operations sent by the clients,
+transforming them against the concurrent ones (`operations`). Its state is kept in the shared drafts cache. Clients of
+a note share a group on the channel layer (`layers`), which broadcasts operations, presence and cursors. The
+connections are served by `websocket`, routed from `cnotes.asgi`.
+"""
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.models import Note
+from notebook.collaboration import operations
+from notebook.collaboration.layers import get_channel_layer
+from notebook.drafts import draft_cache
+
+DOCUMENT_CACHE_PREFIX = 'note-document'
+RELOAD_CACHE_PREFIX = 'note-document-reload'
+LOCK_TIMEOUT = 5  # Seconds
+
+_watchers = {}  # Note ID: [reload watcher, connections of this process]
+
+
+def group_name(note_id):
+    return f'note-{note_id}'
+
+
+def document_cache_key(note_id):
+    return f'{DOCUMENT_CACHE_PREFIX}:{note_id}'
+
+
+def reload_cache_key(note_id):
+    return f'{RELOAD_CACHE_PREFIX}:{note_id}'
+
+
+def apply_operation(state, revision, operation):
+    """Apply an operation sent against `revision` to the state, returns it transformed against the concurrent ones"""
+    history = state['history']
+    concurrent = state['revision'] - revision
+    if concurrent < 0 or concurrent > len(history):
+        raise operations.OperationError('unknown revision')
+
+    history = history[len(history) - concurrent:]
+    length = history[0][0] if history else len(state['content'])
+    operation = operations.normalize(operation, length)
+    for _length, applied in history:
+        operation, _applied = operations.transform(operation, applied)
+
+    previous_length = len(state['content'])
+    state['content'] = operations.apply(state['content'], operation)
+    state['history'] = [*state['history'], (previous_length, operation)][-settings.COLLABORATION_HISTORY_SIZE:]
+    state['revision'] += 1
+    return operation
+
+
+class NoteDocument:
+    """
+    Content of a note being edited, the revision is bumped by every operation
+
+    Operations are sent against the revision the client had seen and are transformed against the operations applied
+    since, only the last `COLLABORATION_HISTORY_SIZE` are kept for that. `version` is the version of the saved note
+    the content is based on, the base of the drafts saved by the session.
+
+    The state lives in the drafts cache and is only changed under a cache lock, so the connections of a note can be
+    served by any number of processes: they apply the operations in the same order and broadcast them in that order
+    through the channel layer.
+
+    Writes made outside the session change the note's reload stamp in the cache, each process serving the note checks
+    it every `COLLABORATION_RELOAD_INTERVAL` seconds and the document is reset to the saved note when it changed.
+    """
+
+    def __init__(self, note_id):
+        self.note_id = note_id
+        self.key = document_cache_key(note_id)
+
+    async def get_state(self):
+        """Snapshot of the state, without locking"""
+        return await sync_to_async(draft_cache().get)(self.key) or {}
+
+    @asynccontextmanager
+    async def locked(self):
+        """The state under the lock (empty when no one is editing the note), saved when the block exits"""
+        lock_key = f'{self.key}:lock'
+        for _attempt in range(LOCK_TIMEOUT * 100):
+            if await sync_to_async(draft_cache().add)(lock_key, True, timeout=LOCK_TIMEOUT):
+                break
+            await asyncio.sleep(0.01)
+        else:
+            raise TimeoutError(f'Could not lock the document of note {self.note_id}')
+
+        try:
+            state = await self.get_state()
+            yield state
+            if state:
+                await sync_to_async(draft_cache().set)(self.key, state, settings.NOTE_DRAFT_CACHE_TIMEOUT)
+            else:
+                await sync_to_async(draft_cache().delete)(self.key)
+        finally:
+            await sync_to_async(draft_cache().delete)(lock_key)
+
+    async def join(self, note, channel, participant):
+        """Add a participant, the document is created from `note` when it's not being edited yet"""
+        async with self.locked() as state:
+            if not state:
+                stamp = await sync_to_async(cache.get)(reload_cache_key(self.note_id))
+                state.update(content=note.content, revision=0, history=[], version=note.version, stamp=stamp,
+                             participants={})
+            state['participants'][channel] = participant
+            snapshot = dict(state)
+
+        watcher = _watchers.setdefault(self.note_id, [None, 0])
+        if watcher[0] is None:
+            watcher[0] = asyncio.ensure_future(self.watch())
+        watcher[1] += 1
+        return snapshot
+
+    async def leave(self, channel):
+        """Remove a participant, True when it was the last one and the document was dropped"""
+        watcher = _watchers.get(self.note_id)
+        if watcher is not None:
+            watcher[1] -= 1
+            if not watcher[1]:
+                watcher[0].cancel()
+                del _watchers[self.note_id]
+
+        async with self.locked() as state:
+            state.get('participants', {}).pop(channel, None)
+            if state.get('participants'):
+                return False
+            state.clear()
+        return True
+
+    async def reset(self, note, stamp):
+        """Replace the content after a change made outside the collaboration session, clients start over"""
+        async with self.locked() as state:
+            if not state or state['stamp'] == stamp:
+                return  # Already reset by another process
+            state.update(stamp=stamp, version=note.version)
+            if note.content == state['content']:
+                return
+            state.update(content=note.content, revision=state['revision'] + 1, history=[])
+            await get_channel_layer().group_send(group_name(self.note_id), {
+                'type': 'reset', 'revision': state['revision'], 'content': state['content']})
+
+    async def watch(self):
+        stamp = (await self.get_state()).get('stamp')
+        while True:
+            await asyncio.sleep(settings.COLLABORATION_RELOAD_INTERVAL)
+            current = await sync_to_async(cache.get)(reload_cache_key(self.note_id))
+            if current == stamp:
+                continue
+            stamp = current
+            note = await sync_to_async(Note.objects.filter(pk=self.note_id).first)()
+            if note is not None:
+                await self.reset(note, stamp)
+
+
+def reload_document(note):
+    """
+    Called when the content of a note is written outside the collaboration session, changes the reload stamp
+
+    The stamp is changed again after the transaction commits, so a session reading the note before the commit reloads
+    it once more.
+    """
+    def stamp():
+        cache.set(reload_cache_key(note.pk), time.time_ns(), settings.NOTE_DRAFT_CACHE_TIMEOUT)
+
+    stamp()
+    transaction.on_commit(stamp)
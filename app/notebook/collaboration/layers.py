@@ -0,0 +1,64 @@
+import asyncio
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseChannelLayer:
+    """
+    Delivers messages between the connections of the collaboration groups
+
+    Layers spanning several nodes must deliver the messages of a group in the order they were sent.
+    """
+
+    def new_channel(self):
+        return uuid.uuid4().hex
+
+    async def group_add(self, group, channel):
+        raise NotImplementedError()
+
+    async def group_discard(self, group, channel):
+        raise NotImplementedError()
+
+    async def group_send(self, group, message):
+        raise NotImplementedError()
+
+    async def receive(self, channel):
+        """Next message sent to a channel, waiting for it"""
+        raise NotImplementedError()
+
+
+class InMemoryChannelLayer(BaseChannelLayer):
+    """Channel layer of a single process, the messages are queued per channel"""
+
+    def __init__(self):
+        self.groups = defaultdict(set)
+        self.queues = defaultdict(asyncio.Queue)
+
+    async def group_add(self, group, channel):
+        self.groups[group].add(channel)
+
+    async def group_discard(self, group, channel):
+        self.groups[group].discard(channel)
+        if not self.groups[group]:
+            del self.groups[group]
+        self.queues.pop(channel, None)
+
+    async def group_send(self, group, message):
+        for channel in self.groups.get(group, ()):
+            self.queues[channel].put_nowait(message)
+
+    async def receive(self, channel):
+        return await self.queues[channel].get()
+
+
+_channel_layer = None
+
+
+def get_channel_layer() -> BaseChannelLayer:
+    global _channel_layer
+    if _channel_layer is None:
+        _channel_layer = import_string(settings.COLLABORATION_CHANNEL_LAYER)()
+    return _channel_layer
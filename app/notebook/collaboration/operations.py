@@ -0,0 +1,145 @@
+"""
+Operational transformation of plain text, compatible with ot.js
+
+An operation is a list of components: a positive integer retains characters, a negative one deletes characters and
+a string is inserted. Normalized operations span the whole document they are applied to.
+"""
+
+
+class OperationError(ValueError):
+    pass
+
+
+class OperationBuilder:
+    """Builds normalized operations, merging adjacent components of the same kind"""
+
+    def __init__(self):
+        self.components = []
+
+    def retain(self, count):
+        if count > 0:
+            if self.components and is_retain(self.components[-1]):
+                self.components[-1] += count
+            else:
+                self.components.append(count)
+        return self
+
+    def insert(self, text):
+        if text:
+            if self.components and is_insert(self.components[-1]):
+                self.components[-1] += text
+            elif self.components and is_delete(self.components[-1]):
+                # Inserts go before deletes, so equivalent operations have the same components
+                if len(self.components) > 1 and is_insert(self.components[-2]):
+                    self.components[-2] += text
+                else:
+                    self.components.insert(len(self.components) - 1, text)
+            else:
+                self.components.append(text)
+        return self
+
+    def delete(self, count):
+        if count > 0:
+            if self.components and is_delete(self.components[-1]):
+                self.components[-1] -= count
+            else:
+                self.components.append(-count)
+        return self
+
+
+def is_retain(component):
+    return isinstance(component, int) and component > 0
+
+
+def is_delete(component):
+    return isinstance(component, int) and component < 0
+
+
+def is_insert(component):
+    return isinstance(component, str)
+
+
+def normalize(components, length):
+    """Validate an operation for a document of `length` characters, retaining the rest of the document"""
+    builder = OperationBuilder()
+    position = 0
+    for component in components:
+        if isinstance(component, bool) or not isinstance(component, (int, str)) or component == 0:
+            raise OperationError('invalid component')
+        if is_insert(component):
+            builder.insert(component)
+            continue
+        position += abs(component)
+        if position > length:
+            raise OperationError('operation is longer than the document')
+        if is_retain(component):
+            builder.retain(component)
+        else:
+            builder.delete(-component)
+    builder.retain(length - position)
+    return builder.components
+
+
+def apply(text, operation):
+    result = []
+    position = 0
+    for component in operation:
+        if is_retain(component):
+            if position + component > len(text):
+                raise OperationError('operation is longer than the document')
+            result.append(text[position:position + component])
+            position += component
+        elif is_insert(component):
+            result.append(component)
+        else:
+            position -= component
+    if position != len(text):
+        raise OperationError('operation does not span the document')
+    return ''.join(result)
+
+
+def transform(a, b):
+    """
+    Transform concurrent operations, returns `(a', b')` so that applying `a` then `b'` equals `b` then `a'`
+
+    Inserts of `a` go first when both operations insert at the same position.
+    """
+    a_prime, b_prime = OperationBuilder(), OperationBuilder()
+    a_components, b_components = iter(a), iter(b)
+    op1, op2 = next(a_components, None), next(b_components, None)
+
+    while op1 is not None or op2 is not None:
+        if op1 is not None and is_insert(op1):
+            a_prime.insert(op1)
+            b_prime.retain(len(op1))
+            op1 = next(a_components, None)
+            continue
+        if op2 is not None and is_insert(op2):
+            a_prime.retain(len(op2))
+            b_prime.insert(op2)
+            op2 = next(b_components, None)
+            continue
+        if op1 is None or op2 is None:
+            raise OperationError('operations apply to documents of different lengths')
+
+        length1, length2 = abs(op1), abs(op2)
+        length = min(length1, length2)
+        if is_retain(op1) and is_retain(op2):
+            a_prime.retain(length)
+            b_prime.retain(length)
+        elif is_delete(op1) and is_retain(op2):
+            a_prime.delete(length)
+        elif is_retain(op1) and is_delete(op2):
+            b_prime.delete(length)
+        # Both deleting the same characters leaves nothing to do
+
+        if length1 > length:
+            op1 = op1 - length if op1 > 0 else op1 + length
+        else:
+            op1 = next(a_components, None)
+        if length2 > length:
+            op2 = op2 - length if op2 > 0 else op2 + length
+        else:
+            op2 = next(b_components, None)
+
+    return a_prime.components, b_prime.components
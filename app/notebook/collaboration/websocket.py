@@ -0,0 +1,185 @@
+import asyncio
+import json
+import re
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from rest_framework.authtoken.models import Token
+
+from core.models import Member, Note, User
+from notebook.access import get_accessible_notebook_ids, get_notebook_access
+from notebook.collaboration.documents import NoteDocument, apply_operation, group_name
+from notebook.collaboration.layers import get_channel_layer
+from notebook.drafts import DraftConflict, apply_draft, flush_draft, save_draft
+
+NOTE_PATH_RE = re.compile(r'^/ws/notes/(?P<note_id>[0-9a-f-]{36})/$')
+
+CLOSE_NOT_FOUND = 4404
+CLOSE_FORBIDDEN = 4403
+
+# Browsers can't set WebSocket headers, they offer the subprotocols `token, <token>` (kept out of the URL and logs)
+TOKEN_SUBPROTOCOL = 'token'
+
+
+@dataclass
+class Participant:
+    user: User
+    note: Note
+    membership: Member
+    can_edit: bool
+
+    def check_access(self):
+        """Update `can_edit` from the cached access of the user, False when they can't take part anymore"""
+        access = get_notebook_access(self.user)
+        role = access.get(self.note.notebook_id)
+        if role is None:  # Not a member anymore or banned
+            return False
+        self.can_edit = self.note.author_id == self.membership.id or role != Member.Roles.MEMBER
+        return True
+
+
+def get_token(scope):
+    """Token from the subprotocols offered by browsers or from the Authorization header"""
+    subprotocols = scope.get('subprotocols', [])
+    if len(subprotocols) == 2 and subprotocols[0] == TOKEN_SUBPROTOCOL:
+        return subprotocols[1]
+    for name, value in scope.get('headers', ()):
+        if name == b'authorization' and value.startswith(b'Token '):
+            return value[6:].decode()
+    return None
+
+
+@sync_to_async
+def get_participant(scope, note_id):
+    key = get_token(scope)
+    token = Token.objects.select_related('user').filter(key=key).first() if key else None
+    if token is None or not token.user.is_active:
+        return None
+
+    note = Note.objects.filter(pk=note_id, notebook_id__in=get_accessible_notebook_ids(token.user)).first()
+    membership = note and Member.objects.filter(notebook_id=note.notebook_id, user=token.user, is_active=True).first()
+    if membership is None or membership.is_banned:
+        return None
+
+    apply_draft(note)
+    can_edit = note.author_id == membership.id or membership.role != Member.Roles.MEMBER
+    return Participant(token.user, note, membership, can_edit)
+
+
+class NoteConnection:
+    """A client editing a note"""
+
+    def __init__(self, participant: Participant, send):
+        self.participant = participant
+        self.send = send
+        self.layer = get_channel_layer()
+        self.channel = self.layer.new_channel()
+        self.group = group_name(participant.note.pk)
+        self.document = NoteDocument(participant.note.pk)
+
+    @property
+    def info(self):
+        return {'client_id': self.channel, 'member_id': str(self.participant.membership.id),
+                'name': self.participant.user.name, 'can_edit': self.participant.can_edit}
+
+    async def send_json(self, data):
+        await self.send({'type': 'websocket.send', 'text': json.dumps(data)})
+
+    async def run(self, receive):
+        await self.layer.group_add(self.group, self.channel)
+        state = await self.document.join(self.participant.note, self.channel, self.info)
+        await self.send_json({'type': 'init', 'client_id': self.channel, 'revision': state['revision'],
+                              'content': state['content'], 'participants': list(state['participants'].values())})
+        await self.layer.group_send(self.group, {'type': 'join', 'participant': self.info, 'sender': self.channel})
+
+        forward = asyncio.ensure_future(self.forward())
+        try:
+            while True:
+                event = await receive()
+                if event['type'] == 'websocket.disconnect':
+                    break
+                if event['type'] == 'websocket.receive':
+                    if not await sync_to_async(self.participant.check_access)():
+                        await self.send({'type': 'websocket.close', 'code': CLOSE_FORBIDDEN})
+                        break
+                    await self.handle(event.get('text'))
+        finally:
+            forward.cancel()
+            await self.leave()
+
+    async def leave(self):
+        await self.layer.group_discard(self.group, self.channel)
+        last = await self.document.leave(self.channel)
+        await self.layer.group_send(self.group, {'type': 'leave', 'participant': self.info, 'sender': self.channel})
+        if last:
+            try:
+                await sync_to_async(flush_draft)(self.participant.note.pk)
+            except DraftConflict:
+                pass  # The note was saved outside the session, that content is kept
+
+    async def forward(self):
+        """Relay the messages of the group, the author of an operation only gets its acknowledgement"""
+        while True:
+            message = dict(await self.layer.receive(self.channel))
+            sender = message.pop('sender', None)
+            if sender == self.channel:
+                if message['type'] == 'operation':
+                    await self.send_json({'type': 'ack', 'revision': message['revision']})
+                continue
+            await self.send_json(message)
+
+    async def handle(self, text):
+        try:
+            message = json.loads(text or '')
+            handler = {'operation': self.handle_operation, 'cursor': self.handle_cursor}[message['type']]
+            await handler(message)
+        except (ValueError, KeyError, TypeError) as e:  # OperationError is a ValueError
+            state = await self.document.get_state()
+            await self.send_json({'type': 'error', 'detail': str(e), 'revision': state.get('revision')})
+
+    async def handle_operation(self, message):
+        if not self.participant.can_edit:
+            raise ValueError('read only')
+
+        async with self.document.locked() as state:
+            operation = apply_operation(state, int(message['revision']), message['operation'])
+            await self.layer.group_send(self.group, {
+                'type': 'operation', 'revision': state['revision'], 'operation': operation,
+                'client_id': self.channel, 'sender': self.channel})
+
+            # Persisted like an autosave, flushed when the editing goes idle. The draft's base moves forward along
+            # the flushes, so does the document's.
+            note = self.participant.note
+            note.version = state['version']
+            try:
+                draft = await sync_to_async(save_draft)(note, state['content'], self.participant.membership.id,
+                                                        state['version'])
+                state['version'] = draft['version']
+            except DraftConflict as e:
+                await self.send_json({'type': 'error', 'detail': str(e), 'revision': state['revision']})
+
+    async def handle_cursor(self, message):
+        position = int(message['position'])
+        await self.layer.group_send(self.group, {
+            'type': 'cursor', 'client_id': self.channel, 'revision': int(message['revision']), 'position': position,
+            'selection_end': int(message.get('selection_end', position)), 'sender': self.channel})
+
+
+async def websocket_application(scope, receive, send):
+    """Routes `/ws/notes/<id>/` to the note's collaboration session"""
+    await receive()  # websocket.connect
+    match = NOTE_PATH_RE.match(scope['path'])
+    if match is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+
+    participant = await get_participant(scope, match.group('note_id'))
+    if participant is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_FORBIDDEN})
+        return
+
+    if TOKEN_SUBPROTOCOL in scope.get('subprotocols', ()):
+        await send({'type': 'websocket.accept', 'subprotocol': TOKEN_SUBPROTOCOL})
+    else:
+        await send({'type': 'websocket.accept'})
+    await NoteConnection(participant, send).run(receive)
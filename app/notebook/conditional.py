@@ -0,0 +1,100 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, status
+
+GENERATION_CACHE_PREFIX = 'notebook-generation'
+
+
+class PreconditionFailed(exceptions.APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = _('O recurso foi modificado desde a versão informada')
+    default_code = 'precondition_failed'
+
+    def __init__(self, version):
+        super().__init__()
+        self.detail = {'detail': self.detail, 'version': version}  # Keeps the version as a number
+
+
+def format_etag(*parts) -> str:
+    """Strong entity tag made of the parts, a versioned resource puts its version first"""
+    return '"' + '.'.join(str(part) for part in parts) + '"'
+
+
+def etag_version(etag: str):
+    """The version at the start of an entity tag, None when it doesn't start with one"""
+    version = etag[2:] if etag.startswith('W/') else etag
+    version = version.strip('"').split('.')[0]
+    return int(version) if version.isdigit() else None
+
+
+def parse_etags(header: str) -> list:
+    """Entity tags of an If-Match/If-None-Match header, weak tags are kept with their `W/` prefix"""
+    return [etag.strip() for etag in header.split(',') if etag.strip()]
+
+
+def check_if_match(request, version):
+    """
+    Reject the request with 412 when If-Match doesn't list the current version
+
+    Only the version the tags start with is compared, the rest covers what is shown with the resource.
+    """
+    header = request.headers.get('If-Match')
+    if header is None:
+        return
+    etags = parse_etags(header)
+    if '*' not in etags and version not in (etag_version(etag) for etag in etags):
+        raise PreconditionFailed(version)
+
+
+def if_match_version(request, version):
+    """
+    Version sent in If-Match, None when the header is missing or `*`
+
+    The request is rejected with 412 (with the current `version`) when the header doesn't hold a single version.
+    """
+    header = request.headers.get('If-Match')
+    if header is None:
+        return None
+    etags = parse_etags(header)
+    if etags == ['*']:
+        return None
+    if len(etags) == 1 and etag_version(etags[0]) is not None:
+        return etag_version(etags[0])
+    raise PreconditionFailed(version)
+
+
+def generation_cache_key(notebook_id):
+    return f'{GENERATION_CACHE_PREFIX}:{notebook_id}'
+
+
+def get_notebook_generation(notebook_id) -> int:
+    """
+    Change stamp of everything shown in the notebook's folders and note groups, in nanoseconds since the epoch
+
+    Stamps are only compared for equality or to the last modification sent to a client, so a stamp lost from the
+    cache is just replaced by the current time.
+    """
+    key = generation_cache_key(notebook_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = time.time_ns()
+        if not cache.add(key, generation, settings.NOTEBOOK_GENERATION_CACHE_TIMEOUT):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def bump_notebook_generation(notebook_id):
+    """
+    Change the notebook's stamp, again after the transaction commits
+
+    A request that reads the old data before the commit can't keep the new stamp, so it is never served stale.
+    """
+    def bump():
+        cache.set(generation_cache_key(notebook_id), time.time_ns(), settings.NOTEBOOK_GENERATION_CACHE_TIMEOUT)
+
+    bump()
+    transaction.on_commit(bump)
@@ -0,0 +1,204 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from core.models import Note
+
+DRAFT_CACHE_ALIAS = 'drafts'  # Shared by every process and never evicting, see notebook.checks
+DRAFT_CACHE_PREFIX = 'note-draft'
+INDEX_KEY = f'{DRAFT_CACHE_PREFIX}s'  # IDs of the notes with pending drafts
+INDEX_LOCK_KEY = f'{INDEX_KEY}:lock'
+LINEAGE_PREFIX = f'{DRAFT_CACHE_PREFIX}-lineage'
+MAX_LINEAGE = 100
+
+
+class DraftConflict(Exception):
+    """The note's content was saved by someone else after the version the draft is based on"""
+
+    def __init__(self, version):
+        super().__init__(f'The note was saved after the draft was started, it is at version {version}')
+        self.version = version
+
+
+def draft_cache():
+    return caches[DRAFT_CACHE_ALIAS]
+
+
+def draft_cache_key(note_id):
+    return f'{DRAFT_CACHE_PREFIX}:{note_id}'
+
+
+def lineage_cache_key(note_id):
+    return f'{LINEAGE_PREFIX}:{note_id}'
+
+
+def extend_lineage(note_id, previous_version, version):
+    """
+    Record that the note went from `previous_version` to `version` without anyone else changing its content
+
+    That's the case for flushed drafts and saves of other fields, drafts based on an earlier version of the lineage
+    are still current.
+    """
+    lineage = draft_cache().get(lineage_cache_key(note_id))
+    versions = lineage['versions'] if lineage is not None and lineage['version'] == previous_version else []
+    versions = [*versions, previous_version][-MAX_LINEAGE:]
+    lineage = {'version': version, 'versions': versions}
+    draft_cache().set(lineage_cache_key(note_id), lineage, settings.NOTE_DRAFT_CACHE_TIMEOUT)
+
+
+def rebase(note_id, base, version):
+    """`version` when a draft based on `base` still applies to the note at `version`, None otherwise"""
+    if base == version:
+        return version
+    lineage = draft_cache().get(lineage_cache_key(note_id))
+    if lineage is not None and lineage['version'] == version and base in lineage['versions']:
+        return version
+    return None
+
+
+def lineage_head(note_id, base):
+    """The latest version of the lineage `base` belongs to, drafts based on it are moved forward to it"""
+    lineage = draft_cache().get(lineage_cache_key(note_id))
+    if lineage is not None and base in lineage['versions']:
+        return lineage['version']
+    return base
+
+
+def update_index(function):
+    """Read-modify-write the index of pending drafts under a cache lock"""
+    for _attempt in range(100):
+        if draft_cache().add(INDEX_LOCK_KEY, True, timeout=5):
+            try:
+                note_ids = draft_cache().get(INDEX_KEY, set())
+                function(note_ids)
+                draft_cache().set(INDEX_KEY, note_ids, None)
+            finally:
+                draft_cache().delete(INDEX_LOCK_KEY)
+            return
+        time.sleep(0.01)
+    raise TimeoutError('Could not lock the note drafts index')
+
+
+def get_draft(note_id):
+    return draft_cache().get(draft_cache_key(note_id))
+
+
+def get_current_draft(note: Note):
+    """The pending draft when it applies to the note's version, drafts left behind by a conflict are ignored"""
+    draft = get_draft(note.pk)
+    if draft is None or draft.get('conflict') or rebase(note.pk, draft['version'], note.version) is None:
+        return None
+    return draft
+
+
+def apply_draft(note: Note):
+    """Show the pending autosave of a note on the (unsaved) instance"""
+    draft = get_current_draft(note)
+    if draft is not None:
+        note.content = draft['content']
+        note.last_edited_by_id = draft['member_id']
+    return draft
+
+
+def save_draft(note: Note, content, member_id, version=None):
+    """
+    Buffer the latest autosave of a note, the database is only written when the draft is flushed
+
+    `version` is the note's version the content is based on, by default the pending draft's (or the note's when there
+    is none), moved forward along the flushes since. DraftConflict is raised when the note's content was saved by
+    someone else since.
+    """
+    now = time.time()
+    key = draft_cache_key(note.pk)
+    draft = draft_cache().get(key)
+    if version is None:
+        version = note.version if draft is None else draft['version']
+    if rebase(note.pk, version, note.version) is None:
+        raise DraftConflict(note.version)
+    version = lineage_head(note.pk, version)
+
+    if draft is None or draft.get('conflict'):
+        draft = {'started': now}
+    draft.update(content=content, member_id=member_id, version=version, updated=now)
+    draft_cache().set(key, draft, settings.NOTE_DRAFT_CACHE_TIMEOUT)
+
+    # Checked on every save, so the draft is flushed even if the index was lost
+    if note.pk not in draft_cache().get(INDEX_KEY, set()):
+        update_index(lambda note_ids: note_ids.add(note.pk))
+    return draft
+
+
+def discard_draft(note_id):
+    draft_cache().delete(draft_cache_key(note_id))
+    update_index(lambda note_ids: note_ids.discard(note_id))
+
+
+def flush_draft(note_id):
+    """
+    Write the pending draft of a note to the database, returns the saved note (None when there was no draft)
+
+    The draft is only written over the version it is based on. Otherwise it's kept aside, autosaves based on it are
+    rejected, and DraftConflict is raised.
+    """
+    draft = get_draft(note_id)
+    note = previous_version = None
+    if draft is not None and not draft.get('conflict'):
+        with transaction.atomic():
+            note = Note.objects.select_for_update().filter(pk=note_id).first()
+            if note is not None and rebase(note_id, draft['version'], note.version) is None:
+                if get_draft(note_id) == draft:
+                    draft_cache().set(draft_cache_key(note_id), {**draft, 'conflict': True},
+                                      settings.NOTE_DRAFT_CACHE_TIMEOUT)
+                    update_index(lambda note_ids: note_ids.discard(note_id))
+                raise DraftConflict(note.version)
+
+            if note is not None and note.content != draft['content']:
+                previous_version = note.version
+                note.content = draft['content']
+                note.last_edited_by_id = draft['member_id']
+                note.save(update_fields=('content', 'last_edited', 'last_edited_by'))
+        if previous_version is not None:
+            extend_lineage(note_id, previous_version, note.version)
+
+        # An autosave may have arrived while flushing, it stays pending
+        current = get_draft(note_id)
+        if current is not None and current['updated'] != draft['updated']:
+            current['started'] = draft['updated']
+            draft_cache().set(draft_cache_key(note_id), current, settings.NOTE_DRAFT_CACHE_TIMEOUT)
+            return note
+
+    discard_draft(note_id)
+    return note
+
+
+def autosave(note: Note, content, member_id, version=None, flush=False):
+    """Buffer an autosave, flushing it when asked to or when the draft is pending for too long"""
+    draft = save_draft(note, content, member_id, version)
+    flushed = flush or time.time() - draft['started'] >= settings.NOTE_DRAFT_MAX_AGE
+    if flushed:
+        note = flush_draft(note.pk) or note
+    return note, flushed
+
+
+def flush_idle_drafts():
+    """Flush the drafts that stopped receiving autosaves or that are pending for too long, see `flush_note_drafts`"""
+    note_ids = draft_cache().get(INDEX_KEY, set())
+    if not note_ids:
+        return 0
+
+    now = time.time()
+    drafts = draft_cache().get_many([draft_cache_key(note_id) for note_id in note_ids])
+    flushed = 0
+    for note_id in note_ids:
+        draft = drafts.get(draft_cache_key(note_id))
+        if draft is None or now - draft['updated'] >= settings.NOTE_DRAFT_IDLE_TIMEOUT \
+                or now - draft['started'] >= settings.NOTE_DRAFT_MAX_AGE:
+            try:
+                flush_draft(note_id)
+            except DraftConflict:
+                continue
+            if draft is not None:
+                flushed += 1
+    return flushed
@@ -0,0 +1,39 @@
+from django.db.models import Prefetch, QuerySet
+from rest_framework import serializers
+
+
+def plan_relations(serializer_class, prefix=''):
+    """
+    Collect the select_related and prefetch_related lookups needed by a serializer.
+
+    Serializers declare the relations they read in `Meta.select_related` and `Meta.prefetch_related`, nested
+    serializers are followed automatically: single nested serializers are joined and many=True nested serializers
+    are prefetched with a queryset planned from their own serializer.
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    select = [prefix + lookup for lookup in getattr(meta, 'select_related', ())]
+    prefetch = [prefix + lookup for lookup in getattr(meta, 'prefetch_related', ())]
+
+    for field_name, field in getattr(serializer_class, '_declared_fields', {}).items():
+        lookup = prefix + (field.source or field_name).replace('.', '__')
+
+        if isinstance(field, serializers.ListSerializer):
+            child_class = field.child.__class__
+            child_queryset = eager_load(child_class.Meta.model._default_manager.all(), child_class)
+            prefetch.append(Prefetch(lookup, queryset=child_queryset))
+        elif isinstance(field, serializers.BaseSerializer):
+            nested_select, nested_prefetch = plan_relations(field.__class__, prefix=f'{lookup}__')
+            select += [lookup, *nested_select]
+            prefetch += nested_prefetch
+
+    return select, prefetch
+
+
+def eager_load(queryset: QuerySet, serializer_class) -> QuerySet:
+    """Apply the relations needed by the serializer to the queryset, avoiding N+1 queries"""
+    select, prefetch = plan_relations(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notebook.drafts import flush_idle_drafts
+
+
+class Command(BaseCommand):
+    help = 'Writes the autosaved note drafts that are idle or pending for too long to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep flushing instead of exiting')
+        parser.add_argument('--interval', type=float, default=settings.NOTE_DRAFT_FLUSH_INTERVAL,
+                            help='Seconds to wait between flushes (with --loop)')
+
+    def handle(self, *args, loop, interval, **options):
+        while True:
+            flushed = flush_idle_drafts()
+            if flushed:
+                self.stdout.write(f'{flushed} drafts flushed')
+
+            if not loop:
+                break
+            time.sleep(interval)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Note
+from notebook.search import index_note
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the search index of every note'
+
+    def handle(self, *args, **options):
+        count = 0
+        for note in Note.objects.all().iterator():
+            index_note(note)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'{count} notes indexed'))
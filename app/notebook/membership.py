@@ -0,0 +1,36 @@
+from core.models import Member
+
+RESOLVER_ATTRIBUTE = '_membership_resolver'
+
+
+class MembershipResolver:
+    """Loads the memberships of an user at most once per notebook"""
+
+    def __init__(self, user):
+        self.user = user
+        self._memberships = {}
+
+    def get(self, notebook_id, active=True) -> Member:
+        """Get the user's membership on a notebook, inactive memberships are only returned if `active` is False"""
+        if notebook_id not in self._memberships:
+            self._memberships[notebook_id] = Member.objects.select_related('user') \
+                .filter(user=self.user, notebook_id=notebook_id).first()
+
+        membership = self._memberships[notebook_id]
+        if membership is None or (active and not membership.is_active):
+            raise Member.DoesNotExist()
+        return membership
+
+
+def get_membership_resolver(request) -> MembershipResolver:
+    """Get the membership resolver of the request, it lives as long as the request"""
+    resolver = getattr(request, RESOLVER_ATTRIBUTE, None)
+    if resolver is None or resolver.user != request.user:
+        resolver = MembershipResolver(request.user)
+        setattr(request, RESOLVER_ATTRIBUTE, resolver)
+    return resolver
+
+
+def get_membership(request, notebook_id, active=True) -> Member:
+    """Shortcut for the request's user membership on a notebook, raises Member.DoesNotExist"""
+    return get_membership_resolver(request).get(notebook_id, active=active)
@@ -0,0 +1,224 @@
+"""
+Pushes the new activities and invites of an user to its open event streams (see notebook.views.events)
+
+Events are published when the transaction that created them commits, to the backend chosen by `NOTIFICATION_BACKEND`:
+`InMemoryNotificationBackend` reaches the streams of the same process, `PostgresNotificationBackend` uses
+LISTEN/NOTIFY to reach every process connected to the database.
+
+Events are numbered per user and the last ones are kept in the cache for `NOTIFICATION_REPLAY_TIMEOUT` seconds, a
+client passing the ID of the last event it got (`Last-Event-ID`, or `since` when long-polling) gets the ones it
+missed while it wasn't connected. Subscriptions also use them to fill the gaps left by events delivered out of order
+or dropped by the backend.
+"""
+import json
+import queue
+import select
+import threading
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from notebook.serializers.activity import ActivitySerializer
+from notebook.serializers.invite import InviteSerializer
+
+MAX_QUEUED_EVENTS = 100  # Per stream, older events are dropped when a client stops reading
+MAX_REPLAYED_EVENTS = 100  # Per user
+EVENT_CACHE_PREFIX = 'notification-events'
+
+
+def sequence_cache_key(user_id):
+    return f'{EVENT_CACHE_PREFIX}:{user_id}'
+
+
+def event_cache_key(user_id, event_id):
+    return f'{EVENT_CACHE_PREFIX}:{user_id}:{event_id}'
+
+
+def last_event_id(user_id):
+    return cache.get(sequence_cache_key(user_id), 0)
+
+
+def record_event(user_id, event_type, data):
+    """Number a new event of the user and keep it for replays"""
+    key = sequence_cache_key(user_id)
+    cache.add(key, 0, timeout=None)
+    event = {'id': cache.incr(key), 'type': event_type, 'data': data}
+    cache.set(event_cache_key(user_id, event['id']), event, settings.NOTIFICATION_REPLAY_TIMEOUT)
+    return event
+
+
+def replay_events(user_id, since):
+    """The events of the user still kept after the event `since`, oldest first"""
+    last_id = last_event_id(user_id)
+    if since > last_id:
+        since = 0  # The numbering started over (the cache was cleared)
+    keys = [event_cache_key(user_id, event_id)
+            for event_id in range(max(since, last_id - MAX_REPLAYED_EVENTS) + 1, last_id + 1)]
+    events = cache.get_many(keys)
+    return [events[key] for key in keys if key in events]
+
+
+class Subscription:
+    """
+    Events of an user, in order and without duplicates
+
+    `cursor` is the ID of the last event returned, the kept events after it are returned first when it was given.
+    """
+
+    def __init__(self, backend, user_id):
+        self.backend = backend
+        self.user_id = str(user_id)
+        self.queue = queue.Queue(maxsize=MAX_QUEUED_EVENTS)
+        self.replayed = deque()
+        self.cursor = None
+
+    def start(self, since=None):
+        """Called once delivering to the subscription, so no event is missed in between"""
+        if since is None:
+            self.cursor = last_event_id(self.user_id)
+        else:
+            self.cursor = since if since <= last_event_id(self.user_id) else 0
+            self.replayed.extend(replay_events(self.user_id, self.cursor))
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            pass
+
+    def get(self, timeout=None):
+        """Next event, None when there was none before the timeout"""
+        while True:
+            if self.replayed:
+                event = self.replayed.popleft()
+            else:
+                try:
+                    event = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    return None
+                if event['id'] > self.cursor + 1:
+                    # Some events didn't arrive (yet), take them from the kept ones
+                    self.replayed.extend(missed for missed in replay_events(self.user_id, self.cursor)
+                                         if missed['id'] < event['id'])
+                    self.replayed.append(event)
+                    continue
+            if event['id'] > self.cursor:
+                self.cursor = event['id']
+                return event
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class InMemoryNotificationBackend:
+    """Delivers the events to the subscriptions of this process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    def subscribe(self, user_id, since=None) -> Subscription:
+        """Deliver the events of the user, and the kept ones after the event `since` when given"""
+        subscription = Subscription(self, user_id)
+        with self.lock:
+            self.subscriptions[subscription.user_id].add(subscription)
+        subscription.start(since)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            self.subscriptions[subscription.user_id].discard(subscription)
+            if not self.subscriptions[subscription.user_id]:
+                del self.subscriptions[subscription.user_id]
+
+    def publish(self, user_id, event):
+        self.deliver(str(user_id), event)
+
+    def deliver(self, user_id, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+
+class PostgresNotificationBackend(InMemoryNotificationBackend):
+    """
+    Publishes with NOTIFY so every process gets the events, each process LISTENs on its own connection
+
+    Payloads are limited to 8000 bytes by PostgreSQL, larger events are only delivered from the kept ones, once a
+    later event arrives or the client reconnects.
+    """
+    channel = 'cnotes_notifications'
+    max_payload_size = 8000
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+
+    def subscribe(self, user_id, since=None) -> Subscription:
+        with self.lock:
+            if self.listener is None or not self.listener.is_alive():
+                self.listener = threading.Thread(target=self.listen, daemon=True)
+                self.listener.start()
+        return super().subscribe(user_id, since)
+
+    def publish(self, user_id, event):
+        payload = json.dumps({'user_id': str(user_id), 'event': event})
+        if len(payload.encode()) >= self.max_payload_size:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def listen(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        listen_connection = psycopg2.connect(**connection.get_connection_params())
+        listen_connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with listen_connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.channel}')
+
+        try:
+            while True:
+                if select.select([listen_connection], [], [], 5) == ([], [], []):
+                    continue
+                listen_connection.poll()
+                while listen_connection.notifies:
+                    payload = json.loads(listen_connection.notifies.pop(0).payload)
+                    self.deliver(payload['user_id'], payload['event'])
+        finally:
+            listen_connection.close()
+
+
+_backend = None
+
+
+def get_notification_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.NOTIFICATION_BACKEND)()
+    return _backend
+
+
+def publish(user_id, event_type, data):
+    """Send an event to the user's streams once the current transaction commits"""
+    transaction.on_commit(
+        lambda: get_notification_backend().publish(user_id, record_event(user_id, event_type, data)))
+
+
+def activities_created(activities):
+    for activity in activities:
+        publish(activity.user_id, 'activity', ActivitySerializer(activity).data)
+
+
+def invite_created(invite):
+    publish(invite.receiver_id, 'invite', InviteSerializer(invite).data)
@@ -0,0 +1,35 @@
+from rest_framework.pagination import CursorPagination
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class BaseCursorPagination(CursorPagination):
+    """Keyset pagination, the `id` tiebreaker keeps the order stable between rows created at the same time"""
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+
+class ActivityPagination(BaseCursorPagination):
+    ordering = ('-creation_date', '-id')
+
+
+class NotebookPagination(BaseCursorPagination):
+    ordering = ('-creation_date', '-id')
+
+
+class InvitePagination(BaseCursorPagination):
+    ordering = ('-invite_date', '-id')
+
+
+class MemberPagination(BaseCursorPagination):
+    ordering = ('member_since', 'id')
+
+
+class CommentPagination(BaseCursorPagination):
+    ordering = ('creation_date', 'id')
+
+
+class RevisionPagination(BaseCursorPagination):
+    ordering = ('-number',)
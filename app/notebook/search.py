@@ -0,0 +1,168 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.html import escape
+
+from core.models import Note, SearchTerm
+
+# 'simple' only lowercases, so the PostgreSQL and the fallback engines find the same notes
+SEARCH_CONFIG = 'simple'
+
+TITLE_WEIGHT = 1.0  # Same as PostgreSQL's default weight for 'A'
+CONTENT_WEIGHT = 0.4  # Same as PostgreSQL's default weight for 'B'
+
+MAX_TERM_LENGTH = 64
+SNIPPET_WORDS = 35
+# Marks ts_headline puts around the matches, control characters that aren't typed in notes
+HEADLINE_START = '\x02'
+HEADLINE_STOP = '\x03'
+
+WORD_RE = re.compile(r'\w+')
+HEADLINE_RE = re.compile(f'{HEADLINE_START}(.*?){HEADLINE_STOP}', re.DOTALL)
+
+
+def tokenize(text):
+    """Split a text into normalized search terms"""
+    return [term for term in WORD_RE.findall((text or '').lower()) if len(term) <= MAX_TERM_LENGTH]
+
+
+def make_snippet(content, terms):
+    """The first region of the content where the terms appear, and the (start, end) offsets of the matches in it"""
+    words = (content or '').split()
+    if not words:
+        return '', []
+
+    def matches(word):
+        return any(token in terms for token in tokenize(word))
+
+    start = next((i for i, word in enumerate(words) if matches(word)), 0)
+    start = max(0, start - SNIPPET_WORDS // 4)
+
+    text, highlights = '', []
+    for word in words[start:start + SNIPPET_WORDS]:
+        text += ' ' if text else ''
+        if matches(word):
+            highlights.append((len(text), len(text) + len(word)))
+        text += word
+    return text, highlights
+
+
+def parse_headline(headline):
+    """Take the marks out of a ts_headline, returns the text and the offsets of the matches as make_snippet"""
+    def clean(part):
+        return part.replace(HEADLINE_START, '').replace(HEADLINE_STOP, '')
+
+    text, highlights, position = '', [], 0
+    for match in HEADLINE_RE.finditer(headline or ''):
+        text += clean(headline[position:match.start()])
+        highlights.append((len(text), len(text) + len(clean(match.group(1)))))
+        text += clean(match.group(1))
+        position = match.end()
+    return text + clean((headline or '')[position:]), highlights
+
+
+def highlight_html(text, highlights):
+    """The snippet as HTML with the matches in <b>, the content itself is escaped"""
+    parts, position = [], 0
+    for start, end in highlights:
+        parts += [escape(text[position:start]), '<b>', escape(text[start:end]), '</b>']
+        position = end
+    parts.append(escape(text[position:]))
+    return ''.join(parts)
+
+
+def set_snippet(note: Note, text, highlights):
+    note.snippet = text
+    note.highlights = highlights
+    note.snippet_html = highlight_html(text, highlights)
+
+
+class PostgresSearchBackend:
+    """Full-text search backed by an indexed tsvector column"""
+
+    def update(self, note: Note):
+        vector = SearchVector('title', weight='A', config=SEARCH_CONFIG) + \
+            SearchVector('content', weight='B', config=SEARCH_CONFIG)
+        Note.objects.filter(pk=note.pk).update(search_vector=vector)
+
+    def search(self, notes, query, offset, limit):
+        if not tokenize(query):
+            return 0, []
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG)
+        results = notes.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query),
+            headline=SearchHeadline('content', search_query, config=SEARCH_CONFIG, max_words=SNIPPET_WORDS,
+                                    start_sel=HEADLINE_START, stop_sel=HEADLINE_STOP),
+        ).order_by('-rank', 'title', 'id')
+
+        page = list(results[offset:offset + limit])
+        for note in page:
+            set_snippet(note, *parse_headline(note.headline))
+        return results.count(), page
+
+
+class InvertedIndexSearchBackend:
+    """Pure-Python inverted index, used when PostgreSQL isn't available (e.g. SQLite on tests)"""
+
+    @transaction.atomic
+    def update(self, note: Note):
+        title_terms = Counter(tokenize(note.title))
+        content_terms = Counter(tokenize(note.content))
+
+        SearchTerm.objects.filter(note=note).delete()
+        SearchTerm.objects.bulk_create([
+            SearchTerm(note=note, term=term, title_count=title_terms[term], content_count=content_terms[term])
+            for term in title_terms.keys() | content_terms.keys()
+        ])
+
+    def search(self, notes, query, offset, limit):
+        terms = set(tokenize(query))
+        if not terms:
+            return 0, []
+
+        postings = SearchTerm.objects.filter(term__in=terms, note__in=notes) \
+            .values_list('note_id', 'note__title', 'term', 'title_count', 'content_count')
+
+        titles = {}
+        matched_terms = defaultdict(set)
+        scores = defaultdict(float)
+        for note_id, title, term, title_count, content_count in postings:
+            titles[note_id] = title
+            matched_terms[note_id].add(term)
+            scores[note_id] += math.log1p(title_count * TITLE_WEIGHT + content_count * CONTENT_WEIGHT)
+
+        # Every term must be present, as in plainto_tsquery
+        note_ids = [note_id for note_id, found in matched_terms.items() if found == terms]
+        note_ids.sort(key=lambda note_id: (-scores[note_id], titles[note_id], str(note_id)))
+        page_ids = note_ids[offset:offset + limit]
+
+        results = notes.filter(id__in=page_ids).in_bulk()
+        page = []
+        for note_id in page_ids:
+            note = results[note_id]
+            note.rank = scores[note_id]
+            set_snippet(note, *make_snippet(note.content, terms))
+            page.append(note)
+
+        return len(note_ids), page
+
+
+def get_search_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return InvertedIndexSearchBackend()
+
+
+def index_note(note: Note):
+    """Keep the search index of a note up to date"""
+    get_search_backend().update(note)
+
+
+def search_notes(notes, query, offset=0, limit=20):
+    """Rank the notes matching the query, returns the total of matches and the requested page"""
+    return get_search_backend().search(notes, query, offset, limit)
@@ -1,3 +1,4 @@
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
 from core.models import Activity
@@ -8,3 +9,28 @@ class ActivitySerializer(serializers.ModelSerializer):
         model = Activity
         fields = ('id', 'title', 'description', 'seen', 'creation_date')
         read_only_fields = ('title', 'description')
+
+
+class SeeActivitiesSerializer(serializers.Serializer):
+    all = serializers.BooleanField(required=False, default=False,
+                                   help_text=_('Marca todas as atividades como vistas'))
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False,
+                                help_text=_('IDs das atividades a serem marcadas como vistas'))
+    before = serializers.DateTimeField(required=False,
+                                       help_text=_('Marca como vistas as atividades criadas até esse momento'))
+
+    def validate(self, attrs):
+        if not attrs['all'] and 'ids' not in attrs and 'before' not in attrs:
+            raise serializers.ValidationError(_('Informe `all`, `ids` ou `before`'))
+        return attrs
+
+    def filter_queryset(self, queryset):
+        if 'ids' in self.validated_data:
+            queryset = queryset.filter(id__in=self.validated_data['ids'])
+        if 'before' in self.validated_data:
+            queryset = queryset.filter(creation_date__lte=self.validated_data['before'])
+        return queryset
+
+
+class ActivityCountSerializer(serializers.Serializer):
+    count = serializers.IntegerField(read_only=True)
@@ -1,13 +1,44 @@
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
 from django.utils.translation import gettext_lazy as _
+from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers, exceptions
 
-from core.models import Attachment, Member
+from core.images import get_variant_urls
+from core.models import Attachment, Blob, Member, Note
+from notebook.membership import get_membership
+from notebook.uploads import PendingUpload, get_upload_backend, get_uploaded_size
+
+
+def check_attachment_permission(request, note: Note):
+    """Only members who can edit the note may attach files to it"""
+    try:
+        current_user_membership = get_membership(request, note.notebook_id)
+    except Member.DoesNotExist:
+        raise exceptions.ValidationError(_("Usuário não encontrado"))
+
+    if current_user_membership.is_banned:
+        raise exceptions.PermissionDenied(_("O usuário está banido do caderno"))
+
+    if current_user_membership.role == Member.Roles.MEMBER and note.author != current_user_membership:
+        raise exceptions.PermissionDenied()
 
 
 class AttachmentSerializer(serializers.ModelSerializer):
+    thumbnails = serializers.SerializerMethodField(help_text=_('URLs das miniaturas de imagens, por tamanho'))
+
     class Meta:
         model = Attachment
-        fields = ('id', 'note', 'uploaded_file', 'uploaded_at')
+        fields = ('id', 'note', 'uploaded_file', 'uploaded_at', 'thumbnails')
+        select_related = ('blob',)
+
+    @swagger_serializer_method(serializer_or_field=serializers.DictField(child=serializers.URLField()))
+    def get_thumbnails(self, obj: Attachment):
+        if obj.blob is None:
+            return {}
+        return get_variant_urls(obj.blob.variants, self.context.get('request', None), storage=obj.blob.file.storage)
 
     def validate_uploaded_file(self, value):
         print(value)
@@ -21,17 +52,91 @@ class AttachmentSerializer(serializers.ModelSerializer):
         else:
             note = attrs['note']
 
-        current_user = self.context['request'].user
+        check_attachment_permission(self.context['request'], note)
+
+        return attrs
+
+    def create(self, validated_data):
+        return Attachment.objects.create_attachment(validated_data['note'], validated_data['uploaded_file'])
+
+
+class AttachmentUploadSerializer(serializers.Serializer):
+    """Starts a direct upload, answering with where and how the file must be sent"""
+    note = serializers.PrimaryKeyRelatedField(queryset=Note.objects.all(), write_only=True)
+    filename = serializers.CharField(max_length=255, write_only=True)
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', write_only=True,
+                                    help_text=_('SHA-256 do arquivo em hexadecimal, conferido pelo armazenamento'))
+
+    id = serializers.UUIDField(read_only=True, help_text=_('ID do anexo a ser criado'))
+    url = serializers.URLField(read_only=True, help_text=_('Endereço para onde o arquivo deve ser enviado (POST)'))
+    fields = serializers.DictField(child=serializers.CharField(), read_only=True,
+                                   help_text=_('Campos a serem enviados no formulário junto do arquivo (`file`)'))
+    token = serializers.CharField(read_only=True, help_text=_('Token para a confirmação do envio'))
+    expires_in = serializers.IntegerField(read_only=True, help_text=_('Validade do envio em segundos'))
+    max_size = serializers.IntegerField(read_only=True, help_text=_('Tamanho máximo do arquivo em bytes'))
+
+    def validate_filename(self, value):
+        return get_valid_filename(value.replace('\\', '/').split('/')[-1])
 
+    def validate(self, attrs):
+        check_attachment_permission(self.context['request'], attrs['note'])
+        return attrs
+
+    def create(self, validated_data):
+        upload = PendingUpload.start(validated_data['note'].id, validated_data['filename'],
+                                     validated_data['sha256'].lower())
+        url, fields = get_upload_backend().get_target(upload, self.context['request'])
+        return {
+            'id': upload.id,
+            'url': url,
+            'fields': fields,
+            'token': upload.token,
+            'expires_in': settings.ATTACHMENT_UPLOAD_EXPIRATION,
+            'max_size': settings.ATTACHMENT_MAX_UPLOAD_SIZE,
+        }
+
+
+class AttachmentCompleteSerializer(serializers.Serializer):
+    """Creates the attachment once its file is in the storage"""
+    token = serializers.CharField(write_only=True)
+
+    def validate_token(self, value):
         try:
-            current_user_membership = note.notebook.members.get(user=current_user, is_active=True)
-        except Member.DoesNotExist:
-            raise exceptions.ValidationError(_("Usuário não encontrado"))
+            return PendingUpload.from_token(value)
+        except signing.SignatureExpired:
+            raise serializers.ValidationError(_('O envio expirou'))
+        except signing.BadSignature:
+            raise serializers.ValidationError(_('Token inválido'))
 
-        if current_user_membership.is_banned:
-            raise exceptions.PermissionDenied(_("O usuário está banido do caderno"))
+    def validate(self, attrs):
+        upload: PendingUpload = attrs['token']
+
+        try:
+            note = Note.objects.get(id=upload.note_id)
+        except Note.DoesNotExist:
+            raise serializers.ValidationError(_('Anotação não encontrada'))
+        check_attachment_permission(self.context['request'], note)
 
-        if current_user_membership.role == Member.Roles.MEMBER and note.author != current_user_membership:
-            raise exceptions.PermissionDenied()
+        if Attachment.objects.filter(id=upload.id).exists():
+            raise serializers.ValidationError(_('O envio já foi confirmado'))
 
+        size = get_uploaded_size(upload)
+        if size is None:
+            raise serializers.ValidationError(_('O arquivo não foi enviado'))
+        if size > settings.ATTACHMENT_MAX_UPLOAD_SIZE:
+            if not Blob.objects.filter(file=upload.name).exists():  # Stored where its blob would be
+                default_storage.delete(upload.name)
+            raise serializers.ValidationError(_('O arquivo excede o tamanho máximo'))
+
+        attrs['note'] = note
+        attrs['size'] = size
         return attrs
+
+    def create(self, validated_data):
+        # The storage checked the content against the SHA-256, the file isn't read back
+        upload: PendingUpload = validated_data['token']
+        return Attachment.objects.create_attachment(validated_data['note'], name=upload.name, sha256=upload.sha256,
+                                                    size=validated_data['size'], id=upload.id)
+
+    def to_representation(self, instance):
+        return AttachmentSerializer(instance, context=self.context).data
@@ -1,7 +1,8 @@
 from rest_framework import serializers, exceptions
 from django.utils.translation import gettext_lazy as _
 
-from core.models import Comment, Member, User
+from core.models import Comment, Member
+from notebook.membership import get_membership
 from notebook.serializers.member import AuthorSerializer
 
 
@@ -14,12 +15,11 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'creation_date')
 
     def validate(self, attrs):
-        current_user: User = self.context['request'].user
         note = self.instance.note if self.instance else attrs[
             'note']  # If there's neither, this code point shouldn't be reached
 
         try:
-            current_user_membership = current_user.memberships.get(notebook=note.notebook, is_active=True)
+            current_user_membership = get_membership(self.context['request'], note.notebook_id)
         except Member.DoesNotExist:
             raise serializers.ValidationError(_('O usuário não é membro do caderno'))
 
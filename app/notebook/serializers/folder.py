@@ -1,8 +1,10 @@
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils.translation import gettext_lazy as _
+from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
 
 from core.models import Folder, Member
+from notebook.membership import get_membership
 from .note_group import RelatedNoteGroupSerializer
 
 
@@ -16,10 +18,13 @@ class RelatedFolderSerializer(serializers.ModelSerializer):
 class FolderSerializer(serializers.ModelSerializer):
     sub_folders = RelatedFolderSerializer(many=True, read_only=True)
     note_groups = RelatedNoteGroupSerializer(many=True, read_only=True)
+    breadcrumbs = serializers.SerializerMethodField(help_text=_('Pastas da raiz até a pasta pai'))
+    note_count = serializers.SerializerMethodField(help_text=_('Quantidade de anotações dentro da pasta e subpastas'))
 
     class Meta:
         model = Folder
-        fields = ('id', 'title', 'notebook', 'parent_folder', 'sub_folders', 'note_groups')
+        fields = ('id', 'title', 'notebook', 'parent_folder', 'sub_folders', 'note_groups', 'breadcrumbs',
+                  'note_count')
         read_only_fields = ('id',)
         extra_kwargs = {'notebook': {'required': False}}
 
@@ -30,8 +35,6 @@ class FolderSerializer(serializers.ModelSerializer):
         return value
 
     def validate(self, attrs):
-        current_user = self.context['request'].user
-
         # Field auto-fill and notebook/parent_folder integrity
         if 'notebook' in attrs:
             notebook = attrs['notebook']
@@ -47,17 +50,23 @@ class FolderSerializer(serializers.ModelSerializer):
             parent_folder = self.instance.parent_folder
 
         try:  # Check membership
-            membership = Member.objects.get(notebook=parent_folder.notebook, user=current_user, is_active=True)
+            membership = get_membership(self.context['request'], parent_folder.notebook_id)
         except Member.DoesNotExist:
             raise serializers.ValidationError(_('O usuário não é membro do caderno'))
 
         if membership.is_banned:  # Check ban
             raise serializers.ValidationError(_('O usuário está banido do caderno'))
 
+        if not self.instance:
+            try:
+                Folder(notebook=parent_folder.notebook, parent_folder=parent_folder).clean()  # Check max_depth
+            except DjangoValidationError as err:
+                raise serializers.ValidationError(err.message)
+
         if self.instance:
             if self.instance.parent_folder is None:  # Check root
                 raise serializers.ValidationError(_('Não é permitido modificar a pasta raiz'))
-            if self.instance.notebook != parent_folder.notebook:  # Check notebook change
+            if self.instance.notebook_id != parent_folder.notebook_id:  # Check notebook change
                 raise serializers.ValidationError(_('Não é permitido mover pastas entre cadernos'))
             if parent_folder.id == self.instance.id:  # Check self-reference
                 raise serializers.ValidationError(_('Não é permitido auto referência de pastas'))
@@ -68,3 +77,10 @@ class FolderSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(err.message)
 
         return attrs
+
+    @swagger_serializer_method(serializer_or_field=RelatedFolderSerializer(many=True))
+    def get_breadcrumbs(self, obj: Folder):
+        return RelatedFolderSerializer(obj.get_ancestors(), many=True).data
+
+    def get_note_count(self, obj: Folder) -> int:
+        return obj.get_subtree_notes().count()
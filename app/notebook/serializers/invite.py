@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 
 from core.models import Invite, User, Member, Notebook
+from notebook.membership import get_membership
 
 
 class ReceiverSerializer(serializers.ModelSerializer):
@@ -21,6 +22,7 @@ class SenderSerializer(serializers.ModelSerializer):
         model = Member
         fields = ('id', 'name', 'email', 'profile_picture', 'notebook_title')
         read_only_fields = fields
+        select_related = ('user', 'notebook')
 
 
 class InviteSerializer(serializers.ModelSerializer):
@@ -37,11 +39,10 @@ class InviteSerializer(serializers.ModelSerializer):
         fields = ('id', 'sender', 'receiver', 'invite_date', 'receiver_email', 'sender_notebook')
 
     def validate(self, attrs):
-        current_user: User = self.context['request'].user
         notebook: Notebook = attrs['sender']['notebook']
 
         try:
-            current_membership = notebook.members.get(user=current_user, is_active=True)
+            current_membership = get_membership(self.context['request'], notebook.pk)
         except Member.DoesNotExist:
             raise serializers.ValidationError(_('O usuário não é membro do caderno'))
 
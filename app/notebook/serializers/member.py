@@ -1,17 +1,41 @@
 from rest_framework import serializers, exceptions
 from django.utils.translation import gettext_lazy as _
 
-from core.models import Member
+from core.images import get_variant_name
+from core.models import Member, User
+from notebook.membership import get_membership
+
+AUTHOR_AVATAR_SIZE = 48
+MEMBER_AVATAR_SIZE = 128
+
+
+class AvatarField(serializers.ImageField):
+    """URL of the user's profile picture, resized to `size` once the variant is ready"""
+
+    def __init__(self, size, **kwargs):
+        self.size = size
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, user: User):
+        name = get_variant_name(user.profile_picture_variants, self.size)
+        if name is None:
+            return super().to_representation(user.profile_picture)
+
+        url = user.profile_picture.storage.url(name)
+        request = self.context.get('request', None)
+        return request.build_absolute_uri(url) if request is not None else url
 
 
 class AuthorSerializer(serializers.ModelSerializer):
     name = serializers.CharField(source='user.name')
-    profile_picture = serializers.ImageField(source='user.profile_picture')
+    profile_picture = AvatarField(AUTHOR_AVATAR_SIZE, source='user')
 
     class Meta:
         model = Member
         fields = ('id', 'name', 'profile_picture')
         read_only_fields = fields
+        select_related = ('user',)
 
 
 class MemberSerializer(serializers.ModelSerializer):
@@ -19,20 +43,20 @@ class MemberSerializer(serializers.ModelSerializer):
     email = serializers.CharField(source='user.email', read_only=True)
     name = serializers.CharField(source='user.name', read_only=True)
     bio = serializers.CharField(source='user.bio', read_only=True)
-    profile_picture = serializers.ImageField(source='user.profile_picture', read_only=True)
+    profile_picture = AvatarField(MEMBER_AVATAR_SIZE, source='user')
 
     class Meta:
         model = Member
         fields = ('id', 'email', 'name', 'bio', 'profile_picture', 'notebook',
                   'role', 'member_since', 'is_active', 'is_banned')
         read_only_fields = ('id', 'notebook')
+        select_related = ('user',)
 
     def validate(self, value):
         target_member = self.instance
         try:
             # Get who is the actor
-            actor_membership: Member = self.context['request'].user.memberships.get(
-                notebook=target_member.notebook, is_active=True)
+            actor_membership: Member = get_membership(self.context['request'], target_member.notebook_id)
         except Member.DoesNotExist:
             raise serializers.ValidationError(_('O usuário não é membro do caderno'))
 
@@ -1,14 +1,45 @@
-from datetime import datetime, timedelta
-
-from django.utils import timezone
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers, exceptions
 
-from core.models import Member, Note, Notebook
+from core.models import Member, Note
+from notebook.membership import get_membership
 from notebook.serializers.attachment import AttachmentSerializer
 from notebook.serializers.member import AuthorSerializer
+from notebook.text_patch import PatchError, apply_operations, apply_unified_diff, content_hash
+
+
+def validate_note_editor(note: Note, membership: Member):
+    """Check if a member can modify an existing note"""
+
+    # Check if the user is modifying another member's note and if it has the role for it
+    if note.author_id != membership.id and membership.role == Member.Roles.MEMBER:
+        raise serializers.ValidationError(_('Um membro não pode modificar a anotação de outro usuário'))
+
+
+def get_note_editor(request, note: Note) -> Member:
+    """Membership of the current user, if it can modify the note"""
+    try:
+        membership: Member = get_membership(request, note.notebook_id)
+    except Member.DoesNotExist:
+        raise serializers.ValidationError(_('O usuário não é membro do caderno'))
+
+    if membership.is_banned:
+        raise exceptions.PermissionDenied()
 
-EDIT_LOCK_DURATION = timedelta(seconds=10)
+    validate_note_editor(note, membership)
+    return membership
+
+
+class ContentConflict(exceptions.APIException):
+    status_code = 409
+    default_detail = _('A anotação foi modificada desde a versão base')
+    default_code = 'conflict'
+
+    def __init__(self, version=None):
+        super().__init__()
+        if version is not None:
+            self.detail = {'detail': self.detail, 'version': version}  # Keeps the version as a number
 
 
 class RelatedNoteSerializer(serializers.ModelSerializer):
@@ -25,36 +56,39 @@ class NoteSerializer(serializers.ModelSerializer):
     author = AuthorSerializer(read_only=True)
     last_edited_by = AuthorSerializer(read_only=True)
     attachments = AttachmentSerializer(read_only=True, many=True)
+    content_hash = serializers.SerializerMethodField()
 
     class Meta:
         model = Note
         fields = (
-            'id', 'author', 'note_group', 'title', 'creation_date', 'content', 'avg_rating', 'attachments',
-            'last_edited', 'last_edited_by')
-        read_only_fields = ('avg_rating', 'last_edited')
+            'id', 'author', 'note_group', 'title', 'creation_date', 'content', 'content_hash', 'avg_rating',
+            'attachments', 'last_edited', 'last_edited_by', 'version')
+        read_only_fields = ('avg_rating', 'last_edited', 'version')
+
+    def get_content_hash(self, obj: Note) -> str:
+        return content_hash(obj.content)
 
     def validate(self, attrs):
         """Retrieve author and validate user membership"""
 
-        notebook: Notebook = None
+        notebook_id = None
 
         if self.instance:
-            notebook = self.instance.notebook
+            notebook_id = self.instance.notebook_id
 
         if 'note_group' in attrs:
-            new_note_group = attrs['note_group']
-            new_notebook = new_note_group.notebook
+            new_notebook_id = attrs['note_group'].notebook_id
 
             # Check if the notebook is changing
-            if notebook is not None and new_notebook != notebook:
+            if notebook_id is not None and new_notebook_id != notebook_id:
                 raise exceptions.ValidationError(
                     {'note_group': [_('Não é permitido mover uma anotação entre cadernos')]})
 
-            notebook = new_notebook
+            notebook_id = new_notebook_id
 
         try:
             # Check if the user is a notebook member
-            membership: Member = self.context['request'].user.memberships.get(notebook=notebook, is_active=True)
+            membership: Member = get_membership(self.context['request'], notebook_id)
             attrs['last_edited_by'] = membership  # Register last edit
         except Member.DoesNotExist:
             raise serializers.ValidationError(_('O usuário não é membro do caderno'))
@@ -64,14 +98,76 @@ class NoteSerializer(serializers.ModelSerializer):
             raise exceptions.PermissionDenied()
 
         if self.instance:
-            # Check if the user is modifying another member's note and if it has the role for it
-            if self.instance.author != membership and membership.role == Member.Roles.MEMBER:
-                raise serializers.ValidationError(_('Um membro não pode modificar a anotação de outro usuário'))
-
-            edit_timedelta = timezone.make_aware(datetime.utcnow()) - self.instance.last_edited
-            if self.instance.last_edited_by not in (membership, None) and edit_timedelta < EDIT_LOCK_DURATION:
-                raise serializers.ValidationError(_('Essa anotação está sendo editada por outro usuário'))
+            validate_note_editor(self.instance, membership)
         else:
             attrs['author'] = membership
 
         return attrs
+
+
+class TextOperationSerializer(serializers.Serializer):
+    """A single text operation, exactly one of the fields must be set"""
+    retain = serializers.IntegerField(required=False, min_value=1)
+    insert = serializers.CharField(required=False, trim_whitespace=False)
+    delete = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        if len(attrs) != 1:
+            raise serializers.ValidationError(_('Cada operação deve ter exatamente um tipo'))
+        return attrs
+
+
+class NoteContentPatchSerializer(serializers.Serializer):
+    """Applies text operations or an unified diff to a note's content"""
+    base_hash = serializers.CharField(max_length=64, write_only=True)
+    operations = TextOperationSerializer(many=True, required=False, write_only=True)
+    diff = serializers.CharField(required=False, trim_whitespace=False, write_only=True)
+    content_hash = serializers.SerializerMethodField()
+    last_edited = serializers.DateTimeField(read_only=True)
+    version = serializers.IntegerField(read_only=True)
+
+    def get_content_hash(self, obj: Note) -> str:
+        return content_hash(obj.content)
+
+    def validate(self, attrs):
+        if ('operations' in attrs) == ('diff' in attrs):
+            raise serializers.ValidationError(_('Informe as operações ou o diff'))
+
+        attrs['last_edited_by'] = get_note_editor(self.context['request'], self.instance)
+        return attrs
+
+    def update(self, instance: Note, validated_data):
+        with transaction.atomic():
+            # Lock the row so concurrent patches are applied against the content they were computed for
+            note: Note = Note.objects.select_for_update().get(pk=instance.pk)
+            if content_hash(note.content) != validated_data['base_hash']:
+                raise ContentConflict()
+
+            try:
+                if 'operations' in validated_data:
+                    content = apply_operations(note.content, validated_data['operations'])
+                else:
+                    content = apply_unified_diff(note.content, validated_data['diff'])
+            except PatchError as e:
+                field = 'operations' if 'operations' in validated_data else 'diff'
+                raise serializers.ValidationError({field: [str(e)]})
+
+            note.content = content
+            note.last_edited_by = validated_data['last_edited_by']
+            note.save(update_fields=('content', 'last_edited', 'last_edited_by'))
+
+        return note
+
+
+class NoteDraftSerializer(serializers.Serializer):
+    """Autosaved content, buffered and written to the note later (see notebook.drafts)"""
+    content = serializers.CharField(allow_blank=True, write_only=True)
+    flush = serializers.BooleanField(default=False, write_only=True,
+                                     help_text=_('Salva o rascunho na anotação imediatamente'))
+    content_hash = serializers.CharField(read_only=True)
+    flushed = serializers.BooleanField(read_only=True)
+    version = serializers.IntegerField(read_only=True)
+
+    def validate(self, attrs):
+        attrs['member'] = get_note_editor(self.context['request'], self.instance)
+        return attrs
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 
 from core.models import NoteGroup, Member
+from notebook.membership import get_membership
 from .note import RelatedNoteSerializer
 
 
@@ -21,8 +22,6 @@ class NoteGroupSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
     def validate(self, attrs):
-        current_user = self.context['request'].user
-
         if 'parent_folder' in attrs:
             parent_folder = attrs['parent_folder']
         elif self.instance:
@@ -31,7 +30,7 @@ class NoteGroupSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(_('parent_folder é obrigatório'))
 
         try:  # Check membership
-            membership = Member.objects.get(notebook=parent_folder.notebook, user=current_user, is_active=True)
+            membership = get_membership(self.context['request'], parent_folder.notebook_id)
         except Member.DoesNotExist:
             raise serializers.ValidationError(_('O usuário não é membro do caderno'))
 
@@ -39,7 +38,7 @@ class NoteGroupSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(_('O usuário está banido do caderno'))
 
         if self.instance:
-            if self.instance.notebook != parent_folder.notebook:  # Check notebook change
+            if self.instance.notebook_id != parent_folder.notebook_id:  # Check notebook change
                 raise serializers.ValidationError(_('Não é permitido mover conjuntos de anotações entre cadernos'))
 
         return attrs
@@ -0,0 +1,31 @@
+from rest_framework import serializers
+
+from core.models import NoteRevision
+from notebook.serializers.member import AuthorSerializer
+
+
+class NoteRevisionSerializer(serializers.ModelSerializer):
+    author = AuthorSerializer(read_only=True)
+
+    class Meta:
+        model = NoteRevision
+        fields = ('id', 'number', 'author', 'creation_date', 'length', 'content_hash')
+        read_only_fields = fields
+
+
+class NoteRevisionContentSerializer(NoteRevisionSerializer):
+    content = serializers.CharField(read_only=True)
+
+    class Meta(NoteRevisionSerializer.Meta):
+        fields = NoteRevisionSerializer.Meta.fields + ('content',)
+        read_only_fields = fields
+
+
+class RevisionDiffParamsSerializer(serializers.Serializer):
+    against = serializers.IntegerField(required=False, min_value=1)
+
+
+class RevisionDiffSerializer(serializers.Serializer):
+    source = serializers.IntegerField(read_only=True, allow_null=True)
+    target = serializers.IntegerField(read_only=True)
+    diff = serializers.CharField(read_only=True)
@@ -3,6 +3,7 @@ from rest_framework import serializers, exceptions
 from drf_yasg.utils import swagger_serializer_method
 
 from core.models import Notebook, Member
+from notebook.membership import get_membership
 from notebook.serializers.member import MemberSerializer
 
 
@@ -11,12 +12,17 @@ class NotebookSerializer(serializers.ModelSerializer):
     member_count = serializers.SerializerMethodField()
     membership = serializers.SerializerMethodField()
 
-    def get_member_count(self, obj: Notebook):
+    def get_member_count(self, obj: Notebook) -> int:
+        if hasattr(obj, 'member_count'):  # Annotated by NotebookViewSet
+            return obj.member_count
         return obj.members.count()
 
     @swagger_serializer_method(serializer_or_field=MemberSerializer())
     def get_membership(self, obj: Notebook):
-        membership = obj.members.get(user=self.context['request'].user)
+        if hasattr(obj, 'user_memberships'):  # Prefetched by NotebookViewSet
+            membership = obj.user_memberships[0]
+        else:
+            membership = get_membership(self.context['request'], obj.pk, active=False)
         return MemberSerializer(membership).data
 
     class Meta:
@@ -24,18 +30,16 @@ class NotebookSerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'creation_date', 'root_folder', 'member_count', 'membership')
 
     def validate(self, attrs):
-        current_user = self.context['request'].user
-
         if self.instance:
             try:
-                current_membership: Member = self.instance.members.get(user=current_user, is_active=True)
+                current_membership: Member = get_membership(self.context['request'], self.instance.pk)
             except Member.DoesNotExist:
                 raise serializers.ValidationError(_('O usuário não é membro do caderno'))
 
             if current_membership.role != Member.Roles.ADMIN:
                 raise exceptions.PermissionDenied()
         else:
-            attrs['owner'] = current_user
+            attrs['owner'] = self.context['request'].user
 
         return attrs
 
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 
 from core.models import Member, Rating
+from notebook.membership import get_membership
 
 
 class RatingSerializer(serializers.ModelSerializer):
@@ -11,6 +12,7 @@ class RatingSerializer(serializers.ModelSerializer):
         model = Rating
         fields = ('note', 'rating', 'rated_date', 'avg_rating')
         read_only_fields = ('rated_date',)
+        select_related = ('note',)
 
     def validate_rating(self, value):
         if value < 1 or value > 5:
@@ -28,7 +30,7 @@ class RatingSerializer(serializers.ModelSerializer):
 
         if not self.instance:
             try:
-                rater = note.notebook.members.get(user=self.context['request'].user, is_active=True)
+                rater = get_membership(self.context['request'], note.notebook_id)
                 attrs['rater'] = rater
             except Member.DoesNotExist:
                 raise serializers.ValidationError(_('O usuário não é membro do caderno'))
@@ -1,22 +1,58 @@
 from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
 from core.models import Notebook, Folder, NoteGroup, Note
+from notebook.eager_loading import eager_load
+from notebook.search import search_notes
 from notebook.serializers.folder import RelatedFolderSerializer
 from notebook.serializers.note import RelatedNoteSerializer
 from notebook.serializers.note_group import RelatedNoteGroupSerializer
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    q = serializers.CharField(required=False, allow_blank=True, default='')
+    query = serializers.CharField(required=False, allow_blank=True, default='')
+    page = serializers.IntegerField(required=False, min_value=1, default=1)
+    page_size = serializers.IntegerField(required=False, min_value=1, max_value=MAX_PAGE_SIZE,
+                                         default=DEFAULT_PAGE_SIZE)
+
 
 class SearchResult:
-    def __init__(self, notebook: Notebook, query):
-        # Might require PostgreSQL to work properly
+    def __init__(self, notebook: Notebook, query, page=1, page_size=DEFAULT_PAGE_SIZE):
+        self.page = page
+        self.page_size = page_size
+
+        # Folders and note groups only have titles, those sets are small enough for a plain match
         self.folders = Folder.objects.filter(Q(notebook=notebook) & ~Q(parent_folder=None)).filter(
             title__icontains=query)
-        self.note_groups = NoteGroup.objects.filter(parent_folder__notebook=notebook).filter(title__icontains=query)
-        self.notes = Note.objects.filter(note_group__parent_folder__notebook=notebook).filter(title__icontains=query)
+        self.note_groups = NoteGroup.objects.filter(notebook=notebook).filter(title__icontains=query)
+
+        notes = eager_load(Note.objects.filter(notebook=notebook), SearchNoteSerializer)
+        self.note_count, self.notes = search_notes(notes, query, offset=(page - 1) * page_size, limit=page_size)
+
+
+class SearchNoteSerializer(RelatedNoteSerializer):
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.CharField(read_only=True, help_text=_('Trecho do conteúdo onde os termos aparecem'))
+    highlights = serializers.ListField(
+        child=serializers.ListField(child=serializers.IntegerField(), min_length=2, max_length=2), read_only=True,
+        help_text=_('Posições [início, fim] dos termos encontrados em `snippet`'))
+    snippet_html = serializers.CharField(read_only=True,
+                                         help_text=_('`snippet` em HTML escapado, com os termos em <b>'))
+
+    class Meta(RelatedNoteSerializer.Meta):
+        fields = RelatedNoteSerializer.Meta.fields + ('rank', 'snippet', 'highlights', 'snippet_html')
+        read_only_fields = fields
 
 
 class SearchResultSerializer(serializers.Serializer):
     folders = RelatedFolderSerializer(many=True, read_only=True)
     note_groups = RelatedNoteGroupSerializer(many=True, read_only=True)
-    notes = RelatedNoteSerializer(many=True, read_only=True)
+    notes = SearchNoteSerializer(many=True, read_only=True)
+    note_count = serializers.IntegerField(read_only=True)
+    page = serializers.IntegerField(read_only=True)
+    page_size = serializers.IntegerField(read_only=True)
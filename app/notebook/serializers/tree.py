@@ -0,0 +1,27 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+
+class TreeParamsSerializer(serializers.Serializer):
+    depth = serializers.IntegerField(required=False, min_value=0, default=None)
+    notes = serializers.BooleanField(required=False, default=True)
+
+
+class TreeNoteSerializer(serializers.Serializer):
+    id = serializers.UUIDField(read_only=True)
+    title = serializers.CharField(read_only=True)
+
+
+class TreeNoteGroupSerializer(serializers.Serializer):
+    id = serializers.UUIDField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    notes = TreeNoteSerializer(many=True, read_only=True, help_text=_('Ausente quando `notes=false`'))
+
+
+class TreeFolderSerializer(serializers.Serializer):
+    """Documents the outline, the response is built by `notebook.tree.build_tree`"""
+    id = serializers.UUIDField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    note_groups = TreeNoteGroupSerializer(many=True, read_only=True)
+    sub_folders = serializers.ListField(child=serializers.DictField(), read_only=True,
+                                        help_text=_('Pastas filhas, com a mesma estrutura desta pasta'))
@@ -0,0 +1,135 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.images import profile_picture_processed
+from core.models import Comment, Folder, Invite, Member, Note, NoteGroup, NoteRevision, Notebook, Rating, User
+from notebook import activities, notifications
+from notebook.access import invalidate_notebook_access
+from notebook.conditional import bump_notebook_generation
+from notebook.search import index_note
+
+SEARCHABLE_FIELDS = {'title', 'content'}
+TRACKED_MEMBER_FIELDS = ('role', 'is_active', 'is_banned')
+LISTED_NOTE_FIELDS = {'title', 'note_group', 'notebook'}  # Shown by the note groups, see RelatedNoteSerializer
+LISTED_USER_FIELDS = {'name', 'email', 'bio', 'profile_picture', 'profile_picture_variants'}
+
+
+@receiver(post_save, sender=Note)
+def update_note_search_index(sender, instance: Note, update_fields=None, **kwargs):
+    """Keep the search index current when a note's title or content changes"""
+    if update_fields is not None and not SEARCHABLE_FIELDS.intersection(update_fields):
+        return
+    index_note(instance)
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def invalidate_member_access(sender, instance: Member, **kwargs):
+    """Joining, leaving, being kicked, banned or invited changes which notebooks an user can access"""
+    invalidate_notebook_access(instance.user_id)
+
+
+def get_member_state(member: Member):
+    # Reads __dict__ so deferred fields aren't fetched
+    return {field: member.__dict__.get(field) for field in TRACKED_MEMBER_FIELDS}
+
+
+@receiver(post_init, sender=Member)
+def track_member_state(sender, instance: Member, **kwargs):
+    """Remember the loaded state, so changes can be told apart on save without querying"""
+    instance._tracked_state = get_member_state(instance)
+
+
+@receiver(post_save, sender=Member)
+def member_activity(sender, instance: Member, created, raw=False, **kwargs):
+    if raw:
+        return
+    activities.member_changed(instance, None if created else instance._tracked_state)
+    instance._tracked_state = get_member_state(instance)
+
+
+@receiver(post_save, sender=Note)
+def note_activity(sender, instance: Note, created, raw=False, **kwargs):
+    if created and not raw:
+        activities.note_created(instance)
+
+
+@receiver(post_init, sender=Note)
+def track_note_content(sender, instance: Note, **kwargs):
+    # Reads __dict__ so a deferred content isn't fetched
+    instance._tracked_content = instance.__dict__.get('content')
+
+
+@receiver(post_save, sender=Note)
+def record_note_revision(sender, instance: Note, created, raw=False, update_fields=None, **kwargs):
+    """Keep the history of the note's content, see core.models.NoteRevision"""
+    if raw or (update_fields is not None and 'content' not in update_fields):
+        return
+    if not created and instance._tracked_content == instance.content:
+        return
+    NoteRevision.objects.record(instance, previous_content=instance._tracked_content,
+                                author_id=instance.last_edited_by_id or instance.author_id)
+    instance._tracked_content = instance.content
+
+
+@receiver(post_save, sender=Comment)
+def comment_activity(sender, instance: Comment, created, raw=False, **kwargs):
+    if created and not raw:
+        activities.comment_created(instance)
+
+
+@receiver(post_save, sender=Rating)
+def rating_activity(sender, instance: Rating, created, raw=False, **kwargs):
+    if created and not raw:
+        activities.rating_created(instance)
+
+
+@receiver(post_save, sender=Invite)
+def invite_activity(sender, instance: Invite, created, raw=False, **kwargs):
+    if created and not raw:
+        activities.invite_created(instance)
+        notifications.invite_created(instance)
+
+
+@receiver(post_save, sender=Notebook)
+@receiver(post_delete, sender=Notebook)
+def notebook_changed(sender, instance: Notebook, **kwargs):
+    """Conditional requests to the notebook, its folders and note groups compare its change stamp"""
+    bump_notebook_generation(instance.pk)
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+@receiver(post_save, sender=Folder)
+@receiver(post_delete, sender=Folder)
+@receiver(post_save, sender=NoteGroup)
+@receiver(post_delete, sender=NoteGroup)
+@receiver(post_delete, sender=Note)
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def notebook_content_changed(sender, instance, **kwargs):
+    bump_notebook_generation(instance.notebook_id)
+
+
+@receiver(post_save, sender=Note)
+def listed_note_changed(sender, instance: Note, created, update_fields=None, **kwargs):
+    if created or update_fields is None or LISTED_NOTE_FIELDS.intersection(update_fields):
+        bump_notebook_generation(instance.notebook_id)
+
+
+@receiver(post_save, sender=User)
+def member_profile_changed(sender, instance: User, created, update_fields=None, **kwargs):
+    """Members and note authors are listed with their name and picture"""
+    if created or (update_fields is not None and not LISTED_USER_FIELDS.intersection(update_fields)):
+        return
+    bump_user_notebooks(instance.pk)
+
+
+@receiver(profile_picture_processed, sender=User)
+def member_avatar_processed(sender, user_id, **kwargs):
+    bump_user_notebooks(user_id)
+
+
+def bump_user_notebooks(user_id):
+    for notebook_id in Member.objects.filter(user_id=user_id).values_list('notebook_id', flat=True):
+        bump_notebook_generation(notebook_id)
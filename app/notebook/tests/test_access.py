@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Invite, Member, Notebook, User
+from notebook.access import access_cache_key, get_accessible_notebook_ids
+
+
+class NotebookAccessCacheTests(TestCase):
+
+    def setUp(self):
+        self.current_user = User.objects.create_user(email='access@test.io', name='Access', password='access_pw')
+        self.other_user = User.objects.create_user(email='owner@test.io', name='Owner', password='owner_pw')
+        self.notebook = Notebook.objects.create_notebook(owner=self.other_user, title='Shared')
+        self.client = APIClient()
+        self.client.force_authenticate(self.current_user)
+
+    def test_access_cached(self):
+        self.assertEqual(get_accessible_notebook_ids(self.current_user), [])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_accessible_notebook_ids(self.current_user), [])
+
+    def test_access_invalidation(self):
+        self.assertEqual(get_accessible_notebook_ids(self.current_user), [])
+
+        # Accepting an invite
+        invite = Invite.objects.create(sender=self.notebook.members.get(user=self.other_user),
+                                       receiver=self.current_user)
+        membership = invite.accept()
+        self.assertEqual(get_accessible_notebook_ids(self.current_user), [self.notebook.id])
+
+        # Leaving
+        membership.is_active = False
+        membership.save()
+        self.assertEqual(get_accessible_notebook_ids(self.current_user), [])
+
+        # Deleted notebooks
+        membership.is_active = True
+        membership.save()
+        self.assertEqual(get_accessible_notebook_ids(self.current_user), [self.notebook.id])
+        self.notebook.delete()
+        self.assertEqual(get_accessible_notebook_ids(self.current_user), [])
+
+    def test_access_invalidated_on_commit(self):
+        """IDs cached by a concurrent request before the membership commits are dropped"""
+        invite = Invite.objects.create(sender=self.notebook.members.get(user=self.other_user),
+                                       receiver=self.current_user)
+        callbacks = []
+        with mock.patch('notebook.access.transaction.on_commit', callbacks.append):
+            invite.accept()
+            cache.set(access_cache_key(self.current_user.pk), [])  # Read before the commit
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_accessible_notebook_ids(self.current_user), [self.notebook.id])
+
+    def test_kicked_member_loses_access(self):
+        membership = Member.objects.create(user=self.current_user, notebook=self.notebook)
+        detail_url = reverse('notebook:notebook-detail', args=[self.notebook.id])
+
+        res = self.client.get(detail_url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(self.other_user)
+        res = self.client.post(reverse('notebook:member-kick-member', args=[membership.id]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(self.current_user)
+        res = self.client.get(detail_url)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,77 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Activity, Invite, Member, Notebook, Note, NoteGroup, Rating, User
+
+
+class ActivityFanOutTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@activity.io', name='Owner', password='owner_pw')
+        self.notebook = Notebook.objects.create_notebook(owner=self.owner, title='Feed')
+        self.owner_membership = Member.objects.get(user=self.owner, notebook=self.notebook)
+        self.note_group = NoteGroup.objects.create(parent_folder=self.notebook.root_folder, title='Group')
+        self.members = [
+            Member.objects.create(notebook=self.notebook, user=User.objects.create_user(
+                email=f'member{i}@activity.io', name=f'Member {i}', password='member_pw'))
+            for i in range(5)
+        ]
+        Activity.objects.all().delete()
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_note_and_comment_fan_out(self):
+        note = Note.objects.create(note_group=self.note_group, author=self.owner_membership, title='Fresh')
+        for member in self.members:
+            self.assertEqual(member.user.activities.count(), 1)
+        self.assertFalse(self.owner.activities.exists())
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.post(reverse('notebook:comment-list'), {'note': note.id, 'message': 'Hi'})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        inserts = [query for query in context.captured_queries
+                   if query['sql'].startswith('INSERT INTO "core_activity"')]
+        self.assertEqual(len(inserts), 1)
+        for member in self.members:
+            self.assertEqual(member.user.activities.count(), 2)
+        self.assertFalse(self.owner.activities.exists())
+
+    def test_rating_notifies_author(self):
+        note = Note.objects.create(note_group=self.note_group, author=self.owner_membership, title='Rated')
+        rating = Rating.objects.create(note=note, rater=self.members[0], rating=5)
+
+        self.assertEqual(self.owner.activities.count(), 1)
+
+        rating.rating = 3
+        rating.save()
+        self.assertEqual(self.owner.activities.count(), 1)
+
+    def test_member_changes(self):
+        user = User.objects.create_user(email='invited@activity.io', name='Invited', password='invited_pw')
+        invite = Invite.objects.create(sender=self.owner_membership, receiver=user)
+        self.assertEqual(user.activities.count(), 1)
+
+        membership = invite.accept()
+        self.assertEqual(self.owner.activities.count(), 1)
+        for member in self.members:
+            self.assertEqual(member.user.activities.count(), 1)
+
+        membership = Member.objects.get(pk=membership.pk)
+        membership.role = Member.Roles.MODERATOR
+        membership.save()
+        self.assertEqual(user.activities.count(), 2)
+
+        membership.is_active = False
+        membership.save()
+        self.assertEqual(self.owner.activities.count(), 2)
+        self.assertEqual(user.activities.count(), 2)
+
+        # Saving without changes doesn't generate activities
+        membership.save()
+        self.assertEqual(Activity.objects.count(), 2 + 2 * (len(self.members) + 1))
@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -27,7 +30,7 @@ class PrivateActivityApiTests(TestCase):
 
         res = self.client.get(ACTIVITY_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertTrue(isinstance(res.data, list))
+        self.assertTrue(isinstance(res.data['results'], list))
         self.assertEqual(len(test_activities), 6)
 
         res = self.client.get(self.detail_url(test_activities[0].id))
@@ -46,3 +49,32 @@ class PrivateActivityApiTests(TestCase):
         self.client.force_authenticate(self.other_user)
         res = self.client.get(self.detail_url(test_activities[0].id))
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_see_all(self):
+        activities = [Activity.objects.create(user=self.current_user, title=f'Activity Title {i}',
+                                              description='boop') for i in range(6)]
+        Activity.objects.create(user=self.other_user, title='Other', description='boop')
+
+        res = self.client.get(reverse('notebook:activity-unread-count'))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 6)
+
+        res = self.client.post(reverse('notebook:activity-see-all'), {})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.assertNumQueries(1):
+            res = self.client.post(reverse('notebook:activity-see-all'),
+                                   {'ids': [str(activities[0].id), str(activities[1].id)]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 2)
+
+        Activity.objects.filter(id=activities[5].id).update(creation_date=timezone.now() + timedelta(hours=1))
+        res = self.client.post(reverse('notebook:activity-see-all'), {'before': timezone.now()}, format='json')
+        self.assertEqual(res.data['count'], 3)
+
+        res = self.client.post(reverse('notebook:activity-see-all'), {'all': True}, format='json')
+        self.assertEqual(res.data['count'], 1)
+
+        res = self.client.get(reverse('notebook:activity-unread-count'))
+        self.assertEqual(res.data['count'], 0)
+        self.assertFalse(Activity.objects.get(user=self.other_user).seen)
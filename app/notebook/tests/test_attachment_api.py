@@ -0,0 +1,132 @@
+import hashlib
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Attachment, Blob, Member, Note, NoteGroup, Notebook, User
+from notebook.uploads import PendingUpload, S3UploadBackend
+
+PDF = b'%PDF-1.4'
+PDF_SHA256 = hashlib.sha256(PDF).hexdigest()
+
+UPLOAD_URL = reverse('notebook:attachment-upload')
+COMPLETE_URL = reverse('notebook:attachment-complete')
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(DEFAULT_FILE_STORAGE='django.core.files.storage.FileSystemStorage', MEDIA_ROOT=MEDIA_ROOT,
+                   ATTACHMENT_MAX_UPLOAD_SIZE=1024)
+class DirectUploadApiTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.current_user = User.objects.create_user(email='upload@test.io', name='Upload', password='upload_pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.current_user)
+
+        self.notebook = Notebook.objects.create_notebook(owner=self.current_user, title='Files')
+        membership = Member.objects.get(user=self.current_user, notebook=self.notebook)
+        note_group = NoteGroup.objects.create(parent_folder=self.notebook.root_folder, title='Group')
+        self.note = Note.objects.create(note_group=note_group, author=membership, title='Note')
+
+    def start_upload(self, filename='report.pdf', sha256=PDF_SHA256):
+        res = self.client.post(UPLOAD_URL, {'note': self.note.id, 'filename': filename, 'sha256': sha256})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res.data
+
+    def send_file(self, target, content=PDF):
+        # The storage doesn't take the API token, only the signed target
+        return APIClient().post(target['url'], {**target['fields'], 'file': SimpleUploadedFile('x.pdf', content)},
+                                format='multipart')
+
+    def test_direct_upload(self):
+        target = self.start_upload()
+        self.assertFalse(Attachment.objects.exists())
+
+        # Completing before sending the file
+        res = self.client.post(COMPLETE_URL, {'token': target['token']})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.send_file(target)
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        # Completing doesn't read the file back
+        with mock.patch('core.models.blob.hash_file') as hash_file:
+            res = self.client.post(COMPLETE_URL, {'token': target['token']})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        hash_file.assert_not_called()
+        attachment = Attachment.objects.get(id=target['id'])
+        self.assertEqual(attachment.note, self.note)
+        self.assertEqual(attachment.uploaded_file.name, f'blobs/{PDF_SHA256[:2]}/{PDF_SHA256}.pdf')
+        self.assertEqual(attachment.uploaded_file.read(), PDF)
+        self.assertEqual((attachment.blob.sha256, attachment.blob.size), (PDF_SHA256, len(PDF)))
+
+        # Each upload is completed only once
+        res = self.client.post(COMPLETE_URL, {'token': target['token']})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # The same content is stored once, its file is kept
+        target = self.start_upload('copy.pdf')
+        self.assertEqual(self.send_file(target).status_code, status.HTTP_204_NO_CONTENT)
+        res = self.client.post(COMPLETE_URL, {'token': target['token']})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Blob.objects.get().ref_count, 2)
+        self.assertEqual(Attachment.objects.get(id=target['id']).uploaded_file.read(), PDF)
+
+    def test_invalid_uploads(self):
+        target = self.start_upload('../../evil.sh')
+        self.assertTrue(target['token'])
+
+        res = self.send_file(target, content=b'x' * 2048)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Content that doesn't match the declared hash
+        res = self.send_file(target, content=b'%PDF-1.5')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(UPLOAD_URL, {'note': self.note.id, 'filename': 'report.pdf', 'sha256': 'abc'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.send_file({**target, 'url': reverse('notebook:local-upload', args=[target['token'] + 'x'])})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        res = self.client.post(COMPLETE_URL, {'token': target['token'] + 'x'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_permissions(self):
+        outsider = User.objects.create_user(email='outsider@test.io', name='Outsider', password='outsider_pw')
+        self.client.force_authenticate(outsider)
+        res = self.client.post(UPLOAD_URL, {'note': self.note.id, 'filename': 'report.pdf'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.current_user)
+        target = self.start_upload()
+        self.send_file(target)
+
+        self.client.force_authenticate(outsider)
+        res = self.client.post(COMPLETE_URL, {'token': target['token']})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Attachment.objects.exists())
+
+    def test_s3_checksum(self):
+        """The presigned form makes S3 check the declared SHA-256"""
+        upload = PendingUpload.start(self.note.id, 'report.pdf', PDF_SHA256)
+        storage = mock.Mock(bucket_name='bucket', default_acl='private')
+        storage._normalize_name.side_effect = storage._clean_name.side_effect = lambda name: name
+        storage.connection.meta.client.generate_presigned_post.return_value = {'url': 'https://s3', 'fields': {}}
+
+        with mock.patch('notebook.uploads.default_storage', storage):
+            S3UploadBackend().get_target(upload, request=None)
+
+        kwargs = storage.connection.meta.client.generate_presigned_post.call_args.kwargs
+        self.assertEqual(kwargs['Fields']['x-amz-checksum-sha256'], '4W+l2bUZKHVduFuRfwKXurryLHpH6X2SEq2rVuYboE4=')
+        self.assertIn({'x-amz-checksum-sha256': upload.checksum}, kwargs['Conditions'])
@@ -0,0 +1,225 @@
+import json
+import random
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from core.models import Folder, Member, Note, Notebook, NoteGroup, User
+from notebook.collaboration import operations
+from notebook.collaboration.documents import document_cache_key, reload_document
+from notebook.collaboration.websocket import websocket_application
+from notebook.drafts import draft_cache, flush_draft
+
+
+class OperationTests(TestCase):
+
+    def random_operation(self, text):
+        components = []
+        position = 0
+        while position < len(text) or random.random() < 0.3:
+            choice = random.random()
+            if choice < 0.3:
+                components.append(random.choice(('x', 'yz', 'new line\n')))
+            elif position < len(text):
+                count = random.randint(1, len(text) - position)
+                components.append(count if choice < 0.65 else -count)
+                position += count
+            else:
+                break
+        return operations.normalize(components, len(text))
+
+    def test_normalize(self):
+        self.assertEqual(operations.normalize([2, 'ab', -1, 1], 6), [2, 'ab', -1, 3])
+        self.assertEqual(operations.normalize([-1, 'a'], 3), ['a', -1, 2])
+
+        with self.assertRaises(operations.OperationError):
+            operations.normalize([10], 3)
+        with self.assertRaises(operations.OperationError):
+            operations.normalize([0], 3)
+
+    def test_transform_converges(self):
+        random.seed(21)
+        for _i in range(500):
+            text = ''.join(random.choice('abcd\n') for _j in range(random.randint(0, 12)))
+            a, b = self.random_operation(text), self.random_operation(text)
+            a_prime, b_prime = operations.transform(a, b)
+            self.assertEqual(operations.apply(operations.apply(text, a), b_prime),
+                             operations.apply(operations.apply(text, b), a_prime))
+
+
+class CollaborationTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email='ada@love.lace', name='Ada', password='analytical-engine')
+        self.notebook = Notebook.objects.create_notebook(owner=self.owner, title='Engine Notes')
+        self.owner_membership = Member.objects.get(notebook=self.notebook, user=self.owner)
+        folder = Folder.objects.get(notebook=self.notebook, parent_folder=None)
+        note_group = NoteGroup.objects.create(parent_folder=folder, title='Group')
+        self.note = Note.objects.create(note_group=note_group, author=self.owner_membership, title='Note',
+                                        content='hello')
+
+        self.member = User.objects.create_user(email='charles@bab.bage', name='Charles', password='difference-eng')
+        Member.objects.create(notebook=self.notebook, user=self.member)
+        for user in (self.owner, self.member):
+            Token.objects.create(user=user)
+
+    def connect(self, user, note_id=None):
+        token = Token.objects.get(user=user)
+        scope = {'type': 'websocket', 'path': f'/ws/notes/{note_id or self.note.id}/', 'query_string': b'',
+                 'headers': [], 'subprotocols': ['token', token.key]}
+        return ApplicationCommunicator(websocket_application, scope)
+
+    async def receive(self, communicator):
+        event = await communicator.receive_output(timeout=1)
+        return json.loads(event['text'])
+
+    async def open(self, communicator):
+        await communicator.send_input({'type': 'websocket.connect'})
+        event = await communicator.receive_output(timeout=1)
+        self.assertEqual(event, {'type': 'websocket.accept', 'subprotocol': 'token'})
+        return await self.receive(communicator)
+
+    async def close(self, communicator):
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(timeout=1)
+
+    def test_session(self):
+        async_to_sync(self.session)(self.connect(self.owner), self.connect(self.member))
+
+        # The last client leaving saves the content
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.content, 'hi hello!')
+        self.assertIsNone(flush_draft(self.note.id))
+
+    async def session(self, owner, member):
+        init = await self.open(owner)
+        self.assertEqual((init['revision'], init['content']), (0, 'hello'))
+
+        init = await self.open(member)
+        self.assertEqual(len(init['participants']), 2)
+        self.assertFalse(init['participants'][1]['can_edit'])
+        join = await self.receive(owner)
+        self.assertEqual((join['type'], join['participant']['name']), ('join', 'Charles'))
+
+        # Members can't edit other members' notes, but see the edits and the cursors
+        await member.send_input({'type': 'websocket.receive',
+                                 'text': json.dumps({'type': 'operation', 'revision': 0, 'operation': ['x']})})
+        self.assertEqual((await self.receive(member))['type'], 'error')
+
+        # Concurrent operations sent against the same revision
+        for operation in (['hi '], [5, '!']):
+            await owner.send_input({'type': 'websocket.receive',
+                                    'text': json.dumps({'type': 'operation', 'revision': 0, 'operation': operation})})
+        self.assertEqual(await self.receive(owner), {'type': 'ack', 'revision': 1})
+        self.assertEqual(await self.receive(owner), {'type': 'ack', 'revision': 2})
+
+        first, second = await self.receive(member), await self.receive(member)
+        self.assertEqual(first['operation'], ['hi ', 5])
+        self.assertEqual(second['operation'], [8, '!'])
+
+        await owner.send_input({'type': 'websocket.receive',
+                                'text': json.dumps({'type': 'cursor', 'revision': 2, 'position': 3})})
+        cursor = await self.receive(member)
+        self.assertEqual((cursor['type'], cursor['position']), ('cursor', 3))
+
+        await self.close(member)
+        self.assertEqual((await self.receive(owner))['type'], 'leave')
+        await self.close(owner)
+
+    def test_saved_outside(self):
+        async_to_sync(self.saved_outside)(self.connect(self.owner))
+
+        # The session's draft was based on the version before, it doesn't overwrite the saved content
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.content, 'theirs')
+
+    async def saved_outside(self, owner):
+        await self.open(owner)
+        await owner.send_input({'type': 'websocket.receive',
+                                'text': json.dumps({'type': 'operation', 'revision': 0, 'operation': ['hi ']})})
+        self.assertEqual(await self.receive(owner), {'type': 'ack', 'revision': 1})
+
+        self.note.content = 'theirs'
+        await sync_to_async(self.note.save)()
+        await self.close(owner)
+
+    @override_settings(COLLABORATION_RELOAD_INTERVAL=0.01)
+    def test_reloaded(self):
+        async_to_sync(self.reloaded)(self.connect(self.owner))
+
+    async def reloaded(self, owner):
+        await self.open(owner)
+
+        # Written by another process, only the reload stamp in the cache is shared
+        self.note.content = 'saved elsewhere'
+        await sync_to_async(self.note.save)()
+        await sync_to_async(reload_document)(self.note)
+        reset = await self.receive(owner)
+        self.assertEqual((reset['type'], reset['revision'], reset['content']), ('reset', 1, 'saved elsewhere'))
+
+        # Operations are based on the reloaded version
+        await owner.send_input({'type': 'websocket.receive',
+                                'text': json.dumps({'type': 'operation', 'revision': 1, 'operation': [15, '!']})})
+        self.assertEqual(await self.receive(owner), {'type': 'ack', 'revision': 2})
+        await self.close(owner)
+
+        await sync_to_async(self.note.refresh_from_db)()
+        self.assertEqual(self.note.content, 'saved elsewhere!')
+
+    @patch('notebook.drafts.MAX_LINEAGE', 2)
+    def test_flushed_during_session(self):
+        async_to_sync(self.flushed_during_session)(self.connect(self.owner))
+
+    async def flushed_during_session(self, owner):
+        await self.open(owner)
+
+        # More flushes than the lineage keeps, the document's base follows them
+        for revision in range(4):
+            await owner.send_input({'type': 'websocket.receive', 'text': json.dumps(
+                {'type': 'operation', 'revision': revision, 'operation': [5 + revision, '!']})})
+            self.assertEqual(await self.receive(owner), {'type': 'ack', 'revision': revision + 1})
+            await sync_to_async(flush_draft)(self.note.id)
+
+        # The document is shared through the cache, not kept by the process
+        state = await sync_to_async(draft_cache().get)(document_cache_key(self.note.id))
+        self.assertEqual((state['revision'], state['content']), (4, 'hello!!!!'))
+        await self.close(owner)
+
+        await sync_to_async(self.note.refresh_from_db)()
+        self.assertEqual(self.note.content, 'hello!!!!')
+        self.assertIsNone(await sync_to_async(draft_cache().get)(document_cache_key(self.note.id)))
+
+    def test_access_checked_per_message(self):
+        self.note.author = Member.objects.get(notebook=self.notebook, user=self.member)
+        self.note.save()
+        async_to_sync(self.access_checked_per_message)(self.connect(self.member))
+
+    async def access_checked_per_message(self, member):
+        await self.open(member)
+        membership = await sync_to_async(Member.objects.get)(notebook=self.notebook, user=self.member)
+
+        # Banned while connected
+        membership.is_banned = True
+        await sync_to_async(membership.save)()
+        await member.send_input({'type': 'websocket.receive',
+                                 'text': json.dumps({'type': 'operation', 'revision': 0, 'operation': ['x']})})
+        event = await member.receive_output(timeout=1)
+        self.assertEqual(event, {'type': 'websocket.close', 'code': 4403})
+        await member.wait(timeout=1)
+
+        await sync_to_async(self.note.refresh_from_db)()
+        self.assertEqual(self.note.content, 'hello')
+
+    def test_rejected(self):
+        outsider = User.objects.create_user(email='out@sid.er', name='Outsider', password='not-a-member')
+        Token.objects.create(user=outsider)
+        async_to_sync(self.rejected)(self.connect(outsider))
+        async_to_sync(self.rejected)(self.connect(self.owner, note_id='00000000-0000-0000-0000-000000000000'))
+
+    async def rejected(self, communicator):
+        await communicator.send_input({'type': 'websocket.connect'})
+        event = await communicator.receive_output(timeout=1)
+        self.assertEqual(event['type'], 'websocket.close')
@@ -0,0 +1,146 @@
+import threading
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Member, Notebook, User
+from notebook.notifications import get_notification_backend, record_event
+
+EVENTS_URL = reverse('notebook:events')
+TICKET_URL = reverse('notebook:events-ticket')
+INVITE_URL = reverse('notebook:invite-list')
+
+
+def run_on_commit(function):
+    # TestCase never commits
+    function()
+
+
+class EventsApiTests(TestCase):
+
+    def setUp(self):
+        self.current_user = User.objects.create_user(email='sse@stream.io', name='Streamer', password='str34ming!')
+        self.client = APIClient()
+        self.client.force_authenticate(self.current_user)
+
+    def publish(self, event_type, data):
+        event = record_event(self.current_user.pk, event_type, data)
+        get_notification_backend().publish(self.current_user.pk, event)
+        return event
+
+    def publish_later(self, event_type, data, delay=0.1):
+        timer = threading.Timer(delay, self.publish, [event_type, data])
+        timer.start()
+        self.addCleanup(timer.join)
+
+    def test_long_poll(self):
+        self.publish_later('activity', {'id': '1', 'title': 'Hi'})
+
+        res = self.client.get(EVENTS_URL, {'timeout': 5})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['events'], [{'id': 1, 'type': 'activity', 'data': {'id': '1', 'title': 'Hi'}}])
+        self.assertEqual(res.data['cursor'], 1)
+
+        res = self.client.get(EVENTS_URL, {'timeout': 0, 'since': 1})
+        self.assertEqual(res.data, {'events': [], 'cursor': 1})
+
+        res = self.client.get(EVENTS_URL, {'timeout': 3600})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_long_poll_since(self):
+        """Events published between two polls are returned by the next one"""
+        first = self.publish('activity', {'id': '1'})
+        second = self.publish('invite', {'id': '2'})
+
+        res = self.client.get(EVENTS_URL, {'timeout': 5, 'since': 0})
+        self.assertEqual(res.data, {'events': [first, second], 'cursor': 2})
+
+        third = self.publish('activity', {'id': '3'})
+        res = self.client.get(EVENTS_URL, {'timeout': 5, 'since': 2})
+        self.assertEqual(res.data, {'events': [third], 'cursor': 3})
+
+        # Without a cursor only the new events are returned
+        res = self.client.get(EVENTS_URL, {'timeout': 0})
+        self.assertEqual(res.data, {'events': [], 'cursor': 3})
+
+    @override_settings(NOTIFICATION_STREAM_DURATION=0.5, NOTIFICATION_KEEPALIVE=0.2)
+    def test_stream(self):
+        self.publish_later('invite', {'id': '2'})
+
+        res = self.client.get(EVENTS_URL, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/event-stream')
+        body = b''.join(res.streaming_content).decode()
+        self.assertIn('id: 1\nevent: invite\ndata: {"id": "2"}\n\n', body)
+        self.assertIn(': keep-alive\n\n', body)
+
+        # Everything is cleaned up when the stream ends
+        self.assertNotIn(str(self.current_user.pk), get_notification_backend().subscriptions)
+
+    @override_settings(NOTIFICATION_STREAM_DURATION=0.2, NOTIFICATION_KEEPALIVE=0.2)
+    def test_stream_last_event_id(self):
+        """Reconnecting EventSources get the events they missed"""
+        for number in range(3):
+            self.publish('activity', {'id': str(number)})
+
+        res = self.client.get(EVENTS_URL, HTTP_ACCEPT='text/event-stream', HTTP_LAST_EVENT_ID='1')
+        body = b''.join(res.streaming_content).decode()
+        self.assertNotIn('id: 1\n', body)
+        self.assertIn('id: 2\nevent: activity\ndata: {"id": "1"}\n\nid: 3\n', body)
+
+    def test_missed_events(self):
+        """Events that didn't reach the subscription are taken from the kept ones"""
+        with get_notification_backend().subscribe(self.current_user.pk) as subscription:
+            first = record_event(self.current_user.pk, 'activity', {'id': '1'})  # Not delivered
+            second = self.publish('activity', {'id': '2'})
+            get_notification_backend().publish(self.current_user.pk, first)  # Late, already returned
+
+            self.assertEqual([subscription.get(timeout=1), subscription.get(timeout=1)], [first, second])
+            self.assertIsNone(subscription.get(timeout=0))
+
+    def test_ticket(self):
+        self.client.force_authenticate(None)
+        res = self.client.post(TICKET_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        token = Token.objects.create(user=self.current_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        res = self.client.post(TICKET_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ticket = res.data['ticket']
+
+        self.client.credentials()
+        res = self.client.get(EVENTS_URL, {'timeout': 0, 'ticket': ticket})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(EVENTS_URL, {'timeout': 0, 'ticket': ticket + 'x'})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with override_settings(TICKET_MAX_AGE=-1):
+            res = self.client.get(EVENTS_URL, {'timeout': 0, 'ticket': ticket})
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch('notebook.notifications.transaction.on_commit', run_on_commit)
+    def test_published_events(self):
+        other_user = User.objects.create_user(email='mod@stream.io', name='Moderator', password='m0der4ting!')
+        notebook = Notebook.objects.create_notebook(owner=other_user, title='Streams')
+
+        with get_notification_backend().subscribe(self.current_user.pk) as subscription:
+            self.client.force_authenticate(other_user)
+            res = self.client.post(INVITE_URL, {'receiver_email': self.current_user.email,
+                                                'sender_notebook': str(notebook.id)})
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+            events = [subscription.get(timeout=1), subscription.get(timeout=1)]
+            self.assertEqual({event['type'] for event in events}, {'activity', 'invite'})
+            invite = next(event for event in events if event['type'] == 'invite')
+            self.assertEqual(invite['data']['id'], res.data['id'])
+            self.assertIsNone(subscription.get(timeout=0))
+
+            # Users aren't notified of their own actions
+            Member.objects.create(notebook=notebook, user=self.current_user)
+            self.assertIsNone(subscription.get(timeout=0))
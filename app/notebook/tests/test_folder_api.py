@@ -1,3 +1,6 @@
+import time
+from unittest import mock
+
 from django.test import TestCase
 from django.urls import reverse
 
@@ -52,7 +55,37 @@ class PrivateFolderAPITests(TestCase):
         self.assertIn('sub_folders', res.data)
         self.assertTrue(isinstance(res.data['sub_folders'], list))
 
+        sub_folder = Folder.objects.create(notebook=self.notebook, parent_folder=self.root_folder, title='Sub')
+        res = self.client.get(self.detail_url(id=sub_folder.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([folder['id'] for folder in res.data['breadcrumbs']], [str(self.root_folder.id)])
+        self.assertEqual(res.data['note_count'], 0)
+
         res = self.client.get(NOTEBOOK_ROOT_FOLDER_URL + f"?notebook={self.notebook.id}")
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn('sub_folders', res.data)
         self.assertTrue(isinstance(res.data['sub_folders'], list))
+
+    def test_folder_conditional_retrieve(self):
+        """Test 304 Not Modified answers until something in the notebook changes"""
+        res = self.client.get(self.detail_url(self.root_folder.id))
+        etag = res['ETag']
+        # Not sent in the second of the last change, later changes in that second would be missed
+        self.assertNotIn('Last-Modified', res)
+
+        res = self.client.get(self.detail_url(self.root_folder.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with mock.patch('notebook.views.mixins.time') as time_mock:
+            time_mock.time.return_value = time.time() + 1
+            last_modified = self.client.get(self.detail_url(self.root_folder.id))['Last-Modified']
+            res = self.client.get(self.detail_url(self.root_folder.id), HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(FOLDER_URL, {'notebook': self.notebook.id, 'title': 'New Folder'})
+        res = self.client.get(self.detail_url(self.root_folder.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['sub_folders']), 1)
+        self.assertNotEqual(res['ETag'], etag)
+        res = self.client.get(self.detail_url(self.root_folder.id), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
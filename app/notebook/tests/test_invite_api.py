@@ -89,8 +89,8 @@ class PrivateInviteApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
-        self.assertTrue(isinstance(res.data, list))
-        self.assertEqual(len(res.data), 0)
+        self.assertTrue(isinstance(res.data['results'], list))
+        self.assertEqual(len(res.data['results']), 0)
 
         Invite.objects.create(sender=self.current_user_membership, receiver=self.target_user)
 
@@ -98,8 +98,8 @@ class PrivateInviteApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
-        self.assertTrue(isinstance(res.data, list))
-        self.assertEqual(len(res.data), 1)
+        self.assertTrue(isinstance(res.data['results'], list))
+        self.assertEqual(len(res.data['results']), 1)
 
     def test_invite_pending(self):
         """Test listing received invites"""
@@ -111,8 +111,8 @@ class PrivateInviteApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
-        self.assertTrue(isinstance(res.data, list))
-        self.assertEqual(len(res.data), 0)
+        self.assertTrue(isinstance(res.data['results'], list))
+        self.assertEqual(len(res.data['results']), 0)
 
         Invite.objects.create(sender=self.current_user_membership, receiver=self.target_user)
 
@@ -120,5 +120,5 @@ class PrivateInviteApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
-        self.assertTrue(isinstance(res.data, list))
-        self.assertEqual(len(res.data), 1)
+        self.assertTrue(isinstance(res.data['results'], list))
+        self.assertEqual(len(res.data['results']), 1)
@@ -0,0 +1,54 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Member, Note, NoteGroup, Notebook, User
+from notebook.access import get_accessible_notebook_ids
+from notebook.membership import MembershipResolver
+
+
+class MembershipResolverTests(TestCase):
+
+    def setUp(self):
+        self.current_user = User.objects.create_user(email='resolver@test.io', name='Resolver', password='resolve')
+        self.notebook = Notebook.objects.create_notebook(owner=self.current_user, title='Resolved')
+        self.membership = Member.objects.get(notebook=self.notebook, user=self.current_user)
+
+    def test_membership_cached(self):
+        resolver = MembershipResolver(self.current_user)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(resolver.get(self.notebook.id), self.membership)
+            self.assertEqual(resolver.get(self.notebook.id), self.membership)
+
+    def test_inactive_membership(self):
+        self.membership.is_active = False
+        self.membership.save()
+        resolver = MembershipResolver(self.current_user)
+
+        with self.assertRaises(Member.DoesNotExist):
+            resolver.get(self.notebook.id)
+        self.assertEqual(resolver.get(self.notebook.id, active=False), self.membership)
+
+    def test_missing_membership(self):
+        other_user = User.objects.create_user(email='outsider@test.io', name='Outsider', password='outside')
+
+        with self.assertRaises(Member.DoesNotExist):
+            MembershipResolver(other_user).get(self.notebook.id)
+
+    def test_single_membership_query_per_request(self):
+        note_group = NoteGroup.objects.create(parent_folder=self.notebook.root_folder, title='Group')
+        note = Note.objects.create(note_group=note_group, author=self.membership, title='Note')
+        client = APIClient()
+        client.force_authenticate(self.current_user)
+        get_accessible_notebook_ids(self.current_user)  # Warm up the access cache
+
+        with CaptureQueriesContext(connection) as context:
+            res = client.patch(reverse('notebook:note-detail', args=[note.id]), {'title': 'New title'})
+        self.assertEqual(res.status_code, 200)
+
+        member_queries = [query for query in context.captured_queries
+                          if query['sql'].startswith('SELECT') and 'FROM "core_member"' in query['sql']]
+        self.assertEqual(len(member_queries), 1)
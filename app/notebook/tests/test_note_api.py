@@ -1,11 +1,18 @@
-from django.test import TestCase
+import difflib
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Note, Notebook, NoteGroup, Member, Folder
+from core.models import Note, Notebook, NoteGroup, Member, Folder, Rating
+from core.models.note import VersionConflict
+from notebook.drafts import INDEX_KEY, draft_cache, get_draft
+from notebook.text_patch import apply_unified_diff
 
 # Constants
 
@@ -52,6 +59,9 @@ class PrivateNoteApiTests(TestCase):
     def rating_url(self, id):
         return reverse('notebook:note-rating', args=[id])
 
+    def patch_url(self, id):
+        return reverse('notebook:note-patch-content', args=[id])
+
     def test_note_creation_success(self):
         """Test note creation with valid data"""
         payload = {
@@ -197,3 +207,262 @@ class PrivateNoteApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['avg_rating'], 3)
         self.assertEqual(res.data['rating'], 1)
+
+    def test_note_content_patch(self):
+        """Test applying text operations and diffs to a note's content"""
+        test_note = Note.objects.create(note_group=self.note_group, author=self.current_user_membership,
+                                        content='hello world\nsecond line\n')
+
+        res = self.client.get(self.detail_url(test_note.id))
+        base_hash = res.data['content_hash']
+
+        payload = {
+            'base_hash': base_hash,
+            'operations': [{'retain': 6}, {'delete': 5}, {'insert': 'there'}],
+        }
+        res = self.client.post(self.patch_url(test_note.id), payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['content_hash'], base_hash)
+        current_hash = res.data['content_hash']
+        test_note.refresh_from_db()
+        self.assertEqual(test_note.content, 'hello there\nsecond line\n')
+        self.assertEqual(test_note.last_edited_by, self.current_user_membership)
+
+        # Stale base
+        res = self.client.post(self.patch_url(test_note.id), payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+        new_content = 'hello there\nchanged line\nthird line\n'
+        diff = ''.join(difflib.unified_diff(test_note.content.splitlines(True), new_content.splitlines(True)))
+        payload = {'base_hash': current_hash, 'diff': diff}
+        res = self.client.post(self.patch_url(test_note.id), payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        test_note.refresh_from_db()
+        self.assertEqual(test_note.content, new_content)
+
+        # Operations that don't fit the content
+        payload = {'base_hash': res.data['content_hash'], 'operations': [{'delete': 1000}]}
+        res = self.client.post(self.patch_url(test_note.id), payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Either operations or a diff
+        res = self.client.post(self.patch_url(test_note.id), {'base_hash': 'x'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Members can't patch other members' notes
+        other_user = create_user_util(email='kekw@kekw.kek')
+        Member.objects.create(notebook=self.notebook, user=other_user)
+        self.client.force_authenticate(other_user)
+        payload = {'base_hash': current_hash, 'operations': [{'insert': 'x'}]}
+        res = self.client.post(self.patch_url(test_note.id), payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_note_revisions(self):
+        """Test listing, rebuilding and diffing the revisions of a note"""
+        test_note = Note.objects.create(note_group=self.note_group, author=self.current_user_membership,
+                                        content='one\ntwo\n')
+        for content in ('one\ntwo\nthree', 'one\n2\nthree'):
+            res = self.client.patch(self.detail_url(test_note.id), {'content': content})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(reverse('notebook:note-revisions', args=[test_note.id]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([revision['number'] for revision in res.data['results']], [3, 2, 1])
+        self.assertNotIn('content', res.data['results'][0])
+
+        res = self.client.get(reverse('notebook:note-revision', args=[test_note.id, 2]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['content'], 'one\ntwo\nthree')
+
+        res = self.client.get(reverse('notebook:note-revision', args=[test_note.id, 4]))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = self.client.get(reverse('notebook:note-revision-diff', args=[test_note.id, 3]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['source'], 2)
+        self.assertIn('-two\n+2\n', res.data['diff'])
+
+        res = self.client.get(reverse('notebook:note-revision-diff', args=[test_note.id, 3]) + '?against=1')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(apply_unified_diff('one\ntwo\n', res.data['diff']), 'one\n2\nthree')
+
+    def test_note_version(self):
+        """Test optimistic concurrency with versions, ETag and If-Match"""
+        test_note = Note.objects.create(note_group=self.note_group, author=self.current_user_membership, title='v1')
+        self.assertEqual(test_note.version, 1)
+
+        res = self.client.get(self.detail_url(test_note.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['version'], 1)
+        self.assertEqual(res['ETag'], '"1.0"')
+
+        # Ratings change the representation, not the version edits are based on
+        self.client.post(self.rating_url(test_note.id), {'rating': 4})
+        res = self.client.patch(self.detail_url(test_note.id), {'title': 'v2'}, HTTP_IF_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['version'], 2)
+        self.assertEqual(res['ETag'], '"2.1"')
+
+        # Another member edits right after, without waiting for a lock to expire
+        other_user = create_user_util(email='kekw@kekw.kek')
+        Member.objects.create(notebook=self.notebook, user=other_user, role=Member.Roles.MODERATOR)
+        self.client.force_authenticate(other_user)
+        res = self.client.patch(self.detail_url(test_note.id), {'title': 'v3'}, HTTP_IF_MATCH='"2"')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        # Stale version
+        res = self.client.patch(self.detail_url(test_note.id), {'title': 'lost update'}, HTTP_IF_MATCH='"2"')
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(res.data['version'], 3)
+        test_note.refresh_from_db()
+        self.assertEqual(test_note.title, 'v3')
+
+        res = self.client.patch(self.detail_url(test_note.id), {'title': 'v4'}, HTTP_IF_MATCH='*')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        # Saving an instance that is behind the database
+        stale_note = Note.objects.get(pk=test_note.pk)
+        test_note.refresh_from_db()
+        test_note.title = 'v5'
+        test_note.save()
+        stale_note.title = 'lost update'
+        with self.assertRaises(VersionConflict):
+            stale_note.save()
+        self.assertEqual(stale_note.version, 4)
+
+    def test_note_autosave(self):
+        """Test autosaved drafts being buffered, merged into reads and flushed"""
+        test_note = Note.objects.create(note_group=self.note_group, author=self.current_user_membership,
+                                        content='saved')
+        autosave_url = reverse('notebook:note-autosave', args=[test_note.id])
+
+        for content in ('draft', 'draft 2'):
+            res = self.client.post(autosave_url, {'content': content})
+            self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+            self.assertFalse(res.data['flushed'])
+        test_note.refresh_from_db()
+        self.assertEqual(test_note.content, 'saved')
+        self.assertEqual(test_note.version, 1)
+
+        res = self.client.get(self.detail_url(test_note.id))
+        self.assertEqual(res.data['content'], 'draft 2')
+
+        # Explicit save
+        res = self.client.post(autosave_url, {'content': 'draft 3', 'flush': True})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['version'], 2)
+        test_note.refresh_from_db()
+        self.assertEqual(test_note.content, 'draft 3')
+
+        # Idle drafts
+        res = self.client.post(autosave_url, {'content': 'draft 4'})
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        with override_settings(NOTE_DRAFT_IDLE_TIMEOUT=0):
+            call_command('flush_note_drafts', stdout=StringIO())
+        test_note.refresh_from_db()
+        self.assertEqual(test_note.content, 'draft 4')
+
+        # Drafts are indexed again when the index was lost
+        self.client.post(autosave_url, {'content': 'draft 4b'})
+        draft_cache().delete(INDEX_KEY)
+        self.client.post(autosave_url, {'content': 'draft 4c'})
+        with override_settings(NOTE_DRAFT_IDLE_TIMEOUT=0):
+            call_command('flush_note_drafts', stdout=StringIO())
+        test_note.refresh_from_db()
+        self.assertEqual(test_note.content, 'draft 4c')
+
+        # Drafts pending for too long
+        with override_settings(NOTE_DRAFT_MAX_AGE=0):
+            res = self.client.post(autosave_url, {'content': 'draft 5'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        test_note.refresh_from_db()
+        self.assertEqual(test_note.content, 'draft 5')
+
+        # Saving the content replaces the draft
+        self.client.post(autosave_url, {'content': 'draft 6'})
+        res = self.client.patch(self.detail_url(test_note.id), {'content': 'edited'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(self.detail_url(test_note.id))
+        self.assertEqual(res.data['content'], 'edited')
+        self.assertIsNone(get_draft(test_note.id))
+
+    def test_note_autosave_conflict(self):
+        """Test drafts not overwriting content saved by someone else after their base version"""
+        test_note = Note.objects.create(note_group=self.note_group, author=self.current_user_membership,
+                                        content='saved')
+        autosave_url = reverse('notebook:note-autosave', args=[test_note.id])
+        moderator = create_user_util(email='moderator@rosie.tucker')
+        Member.objects.create(notebook=self.notebook, user=moderator, role=Member.Roles.MODERATOR)
+        other_client = APIClient()
+        other_client.force_authenticate(user=moderator)
+
+        # Other changes and idle flushes keep the draft's base current
+        self.client.post(autosave_url, {'content': 'draft'}, HTTP_IF_MATCH='"1"')
+        res = self.client.patch(self.detail_url(test_note.id), {'title': 'Title'})
+        self.assertEqual(res.data['content'], 'draft')
+        self.client.post(autosave_url, {'content': 'draft 2'})
+        with override_settings(NOTE_DRAFT_IDLE_TIMEOUT=0):
+            call_command('flush_note_drafts', stdout=StringIO())
+        res = self.client.post(autosave_url, {'content': 'draft 3'}, HTTP_IF_MATCH='"1"')
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+
+        # Someone else saves the content, the pending draft isn't written over it
+        res = other_client.patch(self.detail_url(test_note.id), {'content': 'theirs'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        version = res.data['version']
+        res = self.client.post(autosave_url, {'content': 'draft 4', 'flush': True})
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['version'], version)
+        res = self.client.get(self.detail_url(test_note.id))
+        self.assertEqual(res.data['content'], 'theirs')
+        with override_settings(NOTE_DRAFT_IDLE_TIMEOUT=0):
+            call_command('flush_note_drafts', stdout=StringIO())
+        test_note.refresh_from_db()
+        self.assertEqual(test_note.content, 'theirs')
+
+        # Drafts based on an old version are refused, the current one starts a new draft
+        res = self.client.post(autosave_url, {'content': 'draft 5'}, HTTP_IF_MATCH='"1"')
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        res = self.client.post(autosave_url, {'content': 'merged', 'flush': True}, HTTP_IF_MATCH=f'"{version}"')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        test_note.refresh_from_db()
+        self.assertEqual(test_note.content, 'merged')
+
+        res = self.client.post(autosave_url, {'content': 'draft'}, HTTP_IF_MATCH='"one"')
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_note_conditional_retrieve(self):
+        """Test 304 Not Modified answers to If-None-Match"""
+        test_note = Note.objects.create(note_group=self.note_group, author=self.current_user_membership)
+
+        res = self.client.get(self.detail_url(test_note.id))
+        etag = res['ETag']
+        res = self.client.get(self.detail_url(test_note.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+        # Ratings are shown with the note
+        Rating.objects.create(note=test_note, rater=self.current_user_membership, rating=4)
+        res = self.client.get(self.detail_url(test_note.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['avg_rating'], 4)
+        etag = res['ETag']
+
+        # Pending drafts are covered by the ETag
+        autosave_url = reverse('notebook:note-autosave', args=[test_note.id])
+        self.client.post(autosave_url, {'content': 'draft'})
+        res = self.client.get(self.detail_url(test_note.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['content'], 'draft')
+        draft_etag = res['ETag']
+        res = self.client.get(self.detail_url(test_note.id), HTTP_IF_NONE_MATCH=draft_etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.client.post(autosave_url, {'content': 'draft 2'})
+        res = self.client.get(self.detail_url(test_note.id), HTTP_IF_NONE_MATCH=draft_etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['content'], 'draft 2')
+
+        other_user = create_user_util(email='kekw@kekw.kek')
+        self.client.force_authenticate(other_user)
+        res = self.client.get(self.detail_url(test_note.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
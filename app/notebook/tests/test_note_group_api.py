@@ -3,7 +3,7 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from core.models import Notebook, NoteGroup, User
+from core.models import Note, Notebook, NoteGroup, User
 
 NOTE_GROUP_URL = reverse('notebook:note-group-list')
 
@@ -55,3 +55,30 @@ class PrivateNoteGroupAPITests(TestCase):
 
         self.assertIn('title', res.data)
         self.assertEqual(res.data['title'], self.note_groups[0].title)
+
+    def test_note_group_conditional_retrieve(self):
+        """Test 304 Not Modified answers until something in the notebook changes"""
+        note_group = self.note_groups[0]
+        res = self.client.get(self.detail_url(note_group.id))
+        etag = res['ETag']
+
+        res = self.client.get(self.detail_url(note_group.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        note = Note.objects.create(note_group=note_group, author=self.notebook.owner_as_member, title='New Note')
+        res = self.client.get(self.detail_url(note_group.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['notes']), 1)
+        etag = res['ETag']
+
+        # Saving only the content doesn't change the listed notes
+        note.content = 'Content'
+        note.save(update_fields=['content'])
+        res = self.client.get(self.detail_url(note_group.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user.name = 'Renamed User'
+        self.user.save()
+        res = self.client.get(self.detail_url(note_group.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['notes'][0]['author']['name'], 'Renamed User')
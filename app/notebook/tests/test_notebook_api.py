@@ -35,8 +35,8 @@ class PrivateNotebookApiTests(TestCase):
 
         res = self.client.get(NOTEBOOK_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertTrue(isinstance(res.data, list))
-        self.assertEqual(len(res.data), 1)
+        self.assertTrue(isinstance(res.data['results'], list))
+        self.assertEqual(len(res.data['results']), 1)
 
         res = self.client.get(self.detail_url(notebook.id))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -60,3 +60,22 @@ class PrivateNotebookApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         notebook.refresh_from_db()
         self.assertEqual(notebook.title, 'UwU')
+
+    def test_notebook_conditional_retrieve(self):
+        """Test 304 Not Modified answers until the notebook changes"""
+        notebook = Notebook.objects.create_notebook(owner=self.current_user, title='Conditional')
+
+        res = self.client.get(self.detail_url(notebook.id))
+        etag = res['ETag']
+        res = self.client.get(self.detail_url(notebook.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        other_user = User.objects.create_user(email='other@life.io', name='Other', password='test_rip')
+        Member.objects.create(notebook=notebook, user=other_user)
+        res = self.client.get(self.detail_url(notebook.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['member_count'], 2)
+
+        self.client.force_authenticate(User.objects.create_user(email='no@life.io', name='No', password='test_rip'))
+        res = self.client.get(self.detail_url(notebook.id), HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,59 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Activity, Comment, Member, Notebook, Note, NoteGroup, User
+
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        self.current_user = User.objects.create_user(email='pages@test.io', name='Pages', password='pages_pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.current_user)
+
+    def walk(self, url):
+        """Follow the `next` links, returning the ids of every page"""
+        pages = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append([item['id'] for item in res.data['results']])
+            url = res.data['next']
+        return pages
+
+    def test_activity_pages(self):
+        activities = [Activity.objects.create(user=self.current_user, title=f'Activity {i}', description='Pages')
+                      for i in range(25)]
+
+        pages = self.walk(reverse('notebook:activity-list') + '?page_size=10')
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        ids = [activity_id for page in pages for activity_id in page]
+        expected = sorted(activities, key=lambda activity: (activity.creation_date, activity.id), reverse=True)
+        self.assertEqual(ids, [str(activity.id) for activity in expected])
+
+    def test_comment_pages(self):
+        notebook = Notebook.objects.create_notebook(owner=self.current_user, title='Comments')
+        membership = Member.objects.get(user=self.current_user, notebook=notebook)
+        note_group = NoteGroup.objects.create(parent_folder=notebook.root_folder, title='Group')
+        note = Note.objects.create(note_group=note_group, author=membership, title='Note')
+        comments = [Comment.objects.create(note=note, commenter=membership, message=f'Comment {i}')
+                    for i in range(7)]
+
+        pages = self.walk(reverse('notebook:note-comments', args=[note.id]) + '?page_size=3')
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        ids = [comment_id for page in pages for comment_id in page]
+        expected = sorted(comments, key=lambda comment: (comment.creation_date, comment.id))
+        self.assertEqual(ids, [str(comment.id) for comment in expected])
+
+    def test_max_page_size(self):
+        for i in range(3):
+            Activity.objects.create(user=self.current_user, title=f'Activity {i}', description='Pages')
+
+        res = self.client.get(reverse('notebook:activity-list') + '?page_size=1000')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 3)
+        self.assertIsNone(res.data['next'])
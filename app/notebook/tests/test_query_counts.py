@@ -0,0 +1,103 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Activity, Comment, Folder, Invite, Member, Note, NoteGroup, Notebook, Rating, User
+from notebook.tests.utils import QueryCountTestMixin
+
+
+class QueryCountTests(QueryCountTestMixin, TestCase):
+    """Listing endpoints must cost a fixed amount of queries"""
+
+    def setUp(self):
+        self.current_user = User.objects.create_user(email='count@queries.io', name='Counter', password='count_pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.current_user)
+        self.notebook = Notebook.objects.create_notebook(owner=self.current_user, title='Counting')
+        self.root_folder = Folder.objects.get(notebook=self.notebook, parent_folder=None)
+        self.note_group = NoteGroup.objects.create(parent_folder=self.root_folder, title='Group')
+        self.note = Note.objects.create(note_group=self.note_group, title='Note',
+                                        author=self.notebook.members.get(user=self.current_user))
+        self.user_count = 0
+
+    def create_member(self):
+        self.user_count += 1
+        user = User.objects.create_user(email=f'member{self.user_count}@queries.io', name=f'Member {self.user_count}',
+                                        password='member_pw')
+        return Member.objects.create(user=user, notebook=self.notebook)
+
+    def populate(self):
+        for i in range(3):
+            member = self.create_member()
+            note = Note.objects.create(note_group=self.note_group, author=member, title=f'Note {i}')
+            Rating.objects.create(note=note, rater=member, rating=4)
+            Comment.objects.create(note=self.note, commenter=member, message=f'Comment {i}')
+            Folder.objects.create(notebook=self.notebook, parent_folder=self.root_folder, title=f'Folder {i}')
+            NoteGroup.objects.create(parent_folder=self.root_folder, title=f'Group {i}')
+
+            other_notebook = Notebook.objects.create_notebook(owner=member.user, title=f'Notebook {i}')
+            Invite.objects.create(sender=other_notebook.members.get(user=member.user), receiver=self.current_user)
+
+    @override_settings(NOTEBOOK_RESPONSE_CACHE_TIMEOUT=0)  # Counts the serializer's queries, not the cache's
+    def test_note_group_detail(self):
+        self.assertConstantQueries(reverse('notebook:note-group-detail', args=[self.note_group.id]), self.populate)
+
+    @override_settings(NOTEBOOK_RESPONSE_CACHE_TIMEOUT=0)
+    def test_folder_detail(self):
+        self.assertConstantQueries(reverse('notebook:folder-detail', args=[self.root_folder.id]), self.populate)
+
+    def test_cached_folder_and_note_group(self):
+        folder_url = reverse('notebook:folder-detail', args=[self.root_folder.id])
+        note_group_url = reverse('notebook:note-group-detail', args=[self.note_group.id])
+        for url in (folder_url, note_group_url):
+            self.assertEqual(self.count_queries(url), 1)  # Notebook of the object, for its change stamp
+
+        self.populate()
+        self.assertEqual(len(self.client.get(folder_url).data['sub_folders']), 3)
+        self.assertEqual(len(self.client.get(note_group_url).data['notes']), 4)
+
+    def test_notebook_root_and_members(self):
+        self.assertConstantQueries(reverse('notebook:notebook-root', args=[self.notebook.id]), self.populate)
+        self.assertConstantQueries(reverse('notebook:notebook-members', args=[self.notebook.id]), self.populate)
+
+    def test_notebook_tree(self):
+        self.assertConstantQueries(reverse('notebook:notebook-tree', args=[self.notebook.id]), self.populate)
+
+    def test_notebook_list(self):
+        def populate():
+            for i in range(3):
+                notebook = Notebook.objects.create_notebook(owner=self.current_user, title=f'Mine {i}')
+                Member.objects.create(notebook=notebook, user=self.create_member().user)
+
+        url = reverse('notebook:notebook-list')
+        self.assertEqual(self.count_queries(url), 2)  # Notebooks with member counts and the user's memberships
+        self.assertConstantQueries(url, populate)
+
+        res = self.client.get(url)
+        # create_member also joins self.notebook
+        self.assertEqual(sorted(notebook['member_count'] for notebook in res.data['results']), [2, 2, 2, 4])
+        for notebook in res.data['results']:
+            self.assertEqual(notebook['membership']['email'], self.current_user.email)
+            self.assertEqual(notebook['root_folder'], Notebook.objects.get(id=notebook['id']).root_folder_id)
+
+    def test_member_list(self):
+        self.assertConstantQueries(reverse('notebook:member-list') + f'?notebook={self.notebook.id}', self.populate)
+
+    def test_note_detail_and_comments(self):
+        self.assertConstantQueries(reverse('notebook:note-detail', args=[self.note.id]), self.populate)
+        self.assertConstantQueries(reverse('notebook:note-comments', args=[self.note.id]), self.populate)
+
+    def test_invites(self):
+        self.assertConstantQueries(reverse('notebook:invite-list'), self.populate)
+        self.assertConstantQueries(reverse('notebook:invite-received'), self.populate)
+
+    def test_activities(self):
+        def populate():
+            for i in range(3):
+                Activity.objects.create(user=self.current_user, title=f'Activity {i}', description='Counting')
+
+        self.assertConstantQueries(reverse('notebook:activity-list'), populate)
+
+    def test_search(self):
+        url = reverse('notebook:notebook-search', args=[self.notebook.id]) + '?q=note'
+        self.assertConstantQueries(url, self.populate)
@@ -0,0 +1,102 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Notebook, NoteGroup, Note, User, SearchTerm
+from notebook.search import highlight_html, make_snippet, parse_headline, tokenize
+
+
+class SearchEngineTests(TestCase):
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('Fotossíntese: a LUZ e a clorofila!'),
+                         ['fotossíntese', 'a', 'luz', 'e', 'a', 'clorofila'])
+        self.assertEqual(tokenize(''), [])
+        self.assertEqual(tokenize(None), [])
+
+    def test_snippet(self):
+        text, highlights = make_snippet('As plantas usam a luz do sol para produzir energia', {'luz'})
+        self.assertEqual(text, 'As plantas usam a luz do sol para produzir energia')
+        self.assertEqual(highlights, [(18, 21)])
+        self.assertEqual(make_snippet('', {'luz'}), ('', []))
+
+    def test_headline(self):
+        self.assertEqual(parse_headline('a \x02luz\x03 do \x02sol\x03'), ('a luz do sol', [(2, 5), (9, 12)]))
+        self.assertEqual(parse_headline('sem \x03marcas'), ('sem marcas', []))
+
+    def test_snippet_html_escaped(self):
+        text, highlights = make_snippet('<script>luz()</script> & <b>luz</b>', {'luz'})
+        self.assertEqual(highlight_html(text, highlights),
+                         '<b>&lt;script&gt;luz()&lt;/script&gt;</b> &amp; <b>&lt;b&gt;luz&lt;/b&gt;</b>')
+
+
+class PrivateSearchApiTests(TestCase):
+
+    def setUp(self):
+        self.current_user = User.objects.create_user(email='search@test.io', name='Searcher', password='search_pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.current_user)
+        self.notebook = Notebook.objects.create_notebook(owner=self.current_user, title='Biologia')
+        self.membership = self.notebook.members.get(user=self.current_user)
+        self.note_group = NoteGroup.objects.create(parent_folder=self.notebook.root_folder, title='Botânica')
+
+    def search_url(self, query, **params):
+        url = reverse('notebook:notebook-search', args=[self.notebook.id]) + f'?q={query}'
+        return url + ''.join(f'&{key}={value}' for key, value in params.items())
+
+    def create_note(self, title, content=''):
+        return Note.objects.create(note_group=self.note_group, author=self.membership, title=title, content=content)
+
+    def test_index_kept_current(self):
+        note = self.create_note('Fotossíntese', 'A clorofila absorve luz')
+        self.assertTrue(SearchTerm.objects.filter(note=note, term='clorofila').exists())
+
+        note.content = 'Respiração celular'
+        note.save()
+        self.assertFalse(SearchTerm.objects.filter(note=note, term='clorofila').exists())
+        self.assertTrue(SearchTerm.objects.filter(note=note, term='respiração').exists())
+
+    def test_search_content_and_rank(self):
+        title_match = self.create_note('Clorofila', 'Pigmento verde')
+        content_match = self.create_note('Fotossíntese', 'A clorofila absorve luz')
+        self.create_note('Mitose', 'Divisão celular')
+
+        res = self.client.get(self.search_url('clorofila'))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['note_count'], 2)
+        self.assertEqual([note['id'] for note in res.data['notes']], [str(title_match.id), str(content_match.id)])
+        snippet = res.data['notes'][1]
+        self.assertEqual(snippet['snippet'], 'A clorofila absorve luz')
+        self.assertEqual(snippet['highlights'], [[2, 11]])
+        self.assertEqual(snippet['snippet_html'], 'A <b>clorofila</b> absorve luz')
+
+        # Every term must match
+        res = self.client.get(self.search_url('clorofila luz'))
+        self.assertEqual(res.data['note_count'], 1)
+        self.assertEqual(res.data['notes'][0]['id'], str(content_match.id))
+
+        res = self.client.get(self.search_url(''))
+        self.assertEqual(res.data['note_count'], 0)
+
+    def test_search_paging(self):
+        for i in range(5):
+            self.create_note(f'Célula {i}')
+
+        res = self.client.get(self.search_url('célula', page=2, page_size=2))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['note_count'], 5)
+        self.assertEqual([note['title'] for note in res.data['notes']], ['Célula 2', 'Célula 3'])
+
+        res = self.client.get(self.search_url('célula', page=0))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_notebook_scope(self):
+        other_user = User.objects.create_user(email='other@test.io', name='Other', password='other_pw')
+        other_notebook = Notebook.objects.create_notebook(owner=other_user, title='Química')
+        other_group = NoteGroup.objects.create(parent_folder=other_notebook.root_folder, title='Orgânica')
+        Note.objects.create(note_group=other_group, author=other_notebook.members.get(user=other_user),
+                            title='Clorofila')
+
+        res = self.client.get(self.search_url('clorofila'))
+        self.assertEqual(res.data['note_count'], 0)
@@ -0,0 +1,55 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Folder, Member, Note, NoteGroup, Notebook, User
+
+
+class NotebookTreeApiTests(TestCase):
+
+    def setUp(self):
+        self.current_user = User.objects.create_user(email='tree@test.io', name='Tree', password='tree_pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.current_user)
+
+        self.notebook = Notebook.objects.create_notebook(owner=self.current_user, title='Forest')
+        self.membership = Member.objects.get(user=self.current_user, notebook=self.notebook)
+        self.root = self.notebook.root_folder
+        self.branch = Folder.objects.create(notebook=self.notebook, parent_folder=self.root, title='Branch')
+        self.twig = Folder.objects.create(notebook=self.notebook, parent_folder=self.branch, title='Twig')
+        self.group = NoteGroup.objects.create(parent_folder=self.twig, title='Leaves')
+        self.note = Note.objects.create(note_group=self.group, author=self.membership, title='Leaf',
+                                        content='Not on the outline')
+        self.url = reverse('notebook:notebook-tree', args=[self.notebook.id])
+
+    def test_tree(self):
+        self.client.get(self.url)  # Warm up the access cache
+        with self.assertNumQueries(4):  # Notebook, folders, note groups and notes
+            res = self.client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(res.data['id'], self.root.id)
+        branch = res.data['sub_folders'][0]
+        self.assertEqual(branch['title'], 'Branch')
+        twig = branch['sub_folders'][0]
+        self.assertEqual(twig['note_groups'], [{'id': self.group.id, 'title': 'Leaves',
+                                                'notes': [{'id': self.note.id, 'title': 'Leaf'}]}])
+
+    def test_tree_params(self):
+        res = self.client.get(self.url + '?depth=1&notes=false')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        branch = res.data['sub_folders'][0]
+        self.assertEqual(branch['sub_folders'], [])
+
+        res = self.client.get(self.url + '?depth=2&notes=false')
+        twig = res.data['sub_folders'][0]['sub_folders'][0]
+        self.assertNotIn('notes', twig['note_groups'][0])
+
+        res = self.client.get(self.url + '?depth=-1')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tree_access(self):
+        self.client.force_authenticate(User.objects.create_user(email='out@test.io', name='Out', password='out_pw'))
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
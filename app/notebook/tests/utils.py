@@ -0,0 +1,23 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountTestMixin:
+    """Assertions about the amount of queries issued by the API endpoints"""
+
+    def count_queries(self, url):
+        self.client.get(url)  # Warm up the caches, only steady state queries are counted
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200, res.data)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url, populate, max_queries=None):
+        """Assert that the queries of a GET request don't grow after `populate` adds more rows to the response"""
+        before = self.count_queries(url)
+        populate()
+        after = self.count_queries(url)
+
+        self.assertEqual(before, after, f'{url} went from {before} to {after} queries')
+        if max_queries is not None:
+            self.assertLessEqual(after, max_queries, f'{url} issued {after} queries')
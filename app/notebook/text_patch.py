@@ -0,0 +1,102 @@
+import difflib
+import hashlib
+import re
+
+HUNK_HEADER_RE = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+class PatchError(ValueError):
+    pass
+
+
+def content_hash(content):
+    """Version of a note's content, the base that patches are computed against"""
+    return hashlib.sha256((content or '').encode()).hexdigest()
+
+
+def unified_diff(source, target, fromfile='', tofile=''):
+    """Unified diff between two texts, marking a missing final newline the way `diff -u` does"""
+    lines = difflib.unified_diff(source.splitlines(keepends=True), target.splitlines(keepends=True),
+                                 fromfile=fromfile, tofile=tofile)
+    return ''.join(line if line.endswith('\n') else line + '\n\\ No newline at end of file\n' for line in lines)
+
+
+def apply_operations(text, operations):
+    """
+    Apply text operations, a sequence of `{"retain": n}`, `{"insert": "..."}` and `{"delete": n}`
+
+    Lengths count characters, the text after the last operation is kept.
+    """
+    result = []
+    position = 0
+    for operation in operations:
+        if 'retain' in operation:
+            count = operation['retain']
+            if position + count > len(text):
+                raise PatchError('retain past the end of the content')
+            result.append(text[position:position + count])
+            position += count
+        elif 'insert' in operation:
+            result.append(operation['insert'])
+        elif 'delete' in operation:
+            count = operation['delete']
+            if position + count > len(text):
+                raise PatchError('delete past the end of the content')
+            position += count
+        else:
+            raise PatchError('unknown operation')
+
+    result.append(text[position:])
+    return ''.join(result)
+
+
+def apply_unified_diff(text, diff):
+    """Apply a unified diff (as produced by `diff -u` or difflib.unified_diff), checking every context line"""
+    source = text.splitlines(keepends=True)
+    result = []
+    position = 0  # Next source line to copy
+    lines = diff.splitlines(keepends=True)
+    index = 0
+
+    # File headers are optional
+    while index < len(lines) and not lines[index].startswith('@@'):
+        if not lines[index].startswith(('---', '+++')):
+            raise PatchError('invalid diff header')
+        index += 1
+
+    while index < len(lines):
+        match = HUNK_HEADER_RE.match(lines[index])
+        if match is None:
+            raise PatchError('invalid hunk header')
+        start = int(match.group(1))
+        length = 1 if match.group(2) is None else int(match.group(2))
+        start = start - 1 if length else start  # Empty ranges point to the line before
+        if start < position or start > len(source):
+            raise PatchError('hunks out of order')
+        result.extend(source[position:start])
+        position = start
+        index += 1
+
+        appended = False  # Whether the last diff line was written to the result
+        while index < len(lines) and not lines[index].startswith('@@'):
+            marker, content = lines[index][:1], lines[index][1:]
+            index += 1
+            if marker == '\\':  # "\ No newline at end of file" refers to the previous line
+                if appended:
+                    result[-1] = result[-1].rstrip('\n')
+                continue
+
+            if marker in (' ', '-'):
+                if position >= len(source) or source[position].rstrip('\n') != content.rstrip('\n'):
+                    raise PatchError('context does not match the content')
+                if marker == ' ':
+                    result.append(source[position])
+                position += 1
+            elif marker == '+':
+                result.append(content if content.endswith('\n') else content + '\n')
+            else:
+                raise PatchError('invalid diff line')
+            appended = marker != '-'
+
+    result.extend(source[position:])
+    return ''.join(result)
@@ -0,0 +1,44 @@
+from collections import defaultdict
+
+from core.models import Folder, Note, NoteGroup
+
+
+def build_tree(notebook_id, max_depth=None, include_notes=True):
+    """
+    Build the nested folder -> note group -> note outline of a notebook
+
+    Each level is fetched once with a flat, content-free query and assembled in Python, so the cost doesn't depend
+    on the shape of the tree. The root folder has depth 0, folders deeper than `max_depth` are left out.
+    """
+    folders = list(Folder.objects.filter(notebook_id=notebook_id).order_by('title', 'id')
+                   .values('id', 'title', 'parent_folder_id'))
+    note_groups = NoteGroup.objects.filter(notebook_id=notebook_id).order_by('title', 'id') \
+        .values('id', 'title', 'parent_folder_id')
+
+    notes_by_group = defaultdict(list)
+    if include_notes:
+        for note in Note.objects.filter(notebook_id=notebook_id).order_by('title', 'id') \
+                .values('id', 'title', 'note_group_id'):
+            notes_by_group[note.pop('note_group_id')].append(note)
+
+    children = defaultdict(list)
+    for folder in folders:
+        children[folder['parent_folder_id']].append(folder)
+
+    groups_by_folder = defaultdict(list)
+    for note_group in note_groups:
+        if include_notes:
+            note_group['notes'] = notes_by_group[note_group['id']]
+        groups_by_folder[note_group.pop('parent_folder_id')].append(note_group)
+
+    def assemble(folder, depth):
+        folder.pop('parent_folder_id')
+        folder['note_groups'] = groups_by_folder[folder['id']]
+        if max_depth is not None and depth >= max_depth:
+            folder['sub_folders'] = []
+        else:
+            folder['sub_folders'] = [assemble(sub_folder, depth + 1) for sub_folder in children[folder['id']]]
+        return folder
+
+    roots = children[None]
+    return assemble(roots[0], 0) if roots else None
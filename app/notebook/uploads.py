@@ -0,0 +1,86 @@
+import base64
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from core.models.blob import blob_file_path
+
+UPLOAD_SALT = 'notebook.attachment-upload'
+
+
+class PendingUpload:
+    """
+    An attachment whose file is being sent straight to the storage
+
+    The file goes where its blob keeps it, the storage rejects it unless it hashes to the SHA-256 declared upfront.
+    """
+
+    def __init__(self, attachment_id, note_id, sha256, name=''):
+        self.id = attachment_id
+        self.note_id = note_id
+        self.sha256 = sha256
+        self.name = name
+
+    @classmethod
+    def start(cls, note_id, filename, sha256):
+        upload = cls(uuid.uuid4(), note_id, sha256)
+        upload.name = blob_file_path(upload, filename)
+        return upload
+
+    @property
+    def checksum(self):
+        """The SHA-256 as S3 expects it, base64 of the digest"""
+        return base64.b64encode(bytes.fromhex(self.sha256)).decode()
+
+    @property
+    def token(self):
+        return signing.dumps({'id': str(self.id), 'note': str(self.note_id), 'sha256': self.sha256, 'name': self.name},
+                             salt=UPLOAD_SALT)
+
+    @classmethod
+    def from_token(cls, token):
+        """Raises signing.BadSignature (or SignatureExpired) for tampered or expired tokens"""
+        data = signing.loads(token, salt=UPLOAD_SALT, max_age=settings.ATTACHMENT_UPLOAD_EXPIRATION)
+        return cls(uuid.UUID(data['id']), uuid.UUID(data['note']), data['sha256'], data['name'])
+
+
+class S3UploadBackend:
+    """The client POSTs the file straight to the bucket with a presigned form"""
+
+    def get_target(self, upload: PendingUpload, request):
+        storage = default_storage
+        key = storage._normalize_name(storage._clean_name(upload.name))
+        target = storage.connection.meta.client.generate_presigned_post(
+            storage.bucket_name, key,
+            Fields={'acl': storage.default_acl, 'x-amz-checksum-algorithm': 'SHA256',
+                    'x-amz-checksum-sha256': upload.checksum},
+            Conditions=[{'acl': storage.default_acl}, {'x-amz-checksum-algorithm': 'SHA256'},
+                        {'x-amz-checksum-sha256': upload.checksum},
+                        ['content-length-range', 1, settings.ATTACHMENT_MAX_UPLOAD_SIZE]],
+            ExpiresIn=settings.ATTACHMENT_UPLOAD_EXPIRATION,
+        )
+        return target['url'], target['fields']
+
+
+class LocalUploadBackend:
+    """Stand-in for development and tests, the file is POSTed to `LocalUploadView` which checks it like S3 does"""
+
+    def get_target(self, upload: PendingUpload, request):
+        url = request.build_absolute_uri(reverse('notebook:local-upload', args=[upload.token]))
+        return url, {}
+
+
+def get_upload_backend():
+    if hasattr(default_storage, 'bucket_name'):  # S3Boto3Storage
+        return S3UploadBackend()
+    return LocalUploadBackend()
+
+
+def get_uploaded_size(upload: PendingUpload):
+    """Size of the uploaded object, None when it wasn't uploaded"""
+    if not default_storage.exists(upload.name):
+        return None
+    return default_storage.size(upload.name)
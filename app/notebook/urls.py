@@ -9,7 +9,8 @@ from notebook.views.comment import CommentViewSet
 from notebook.views.invite import InviteViewSet
 from notebook.views.activity import ActivityViewSet
 from notebook.views.notebook import NotebookViewSet
-from notebook.views.attachment import AttachmentViewSet, OpenAttachmentViewSet
+from notebook.views.attachment import AttachmentViewSet, OpenAttachmentViewSet, LocalUploadView
+from notebook.views.events import EventsView, EventTicketView
 
 app_name = 'notebook'
 
@@ -28,5 +29,8 @@ main_router.register('open/attachment', OpenAttachmentViewSet, 'open-attachment'
 
 
 urlpatterns = [
+    path('attachment/local_upload/<str:token>/', LocalUploadView.as_view(), name='local-upload'),
+    path('events/', EventsView.as_view(), name='events'),
+    path('events/ticket/', EventTicketView.as_view(), name='events-ticket'),
     path('', include(main_router.urls)),
 ]
@@ -1,25 +1,30 @@
-from rest_framework import viewsets, mixins, permissions, authentication, status
+from rest_framework import viewsets, mixins, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from drf_yasg.utils import swagger_auto_schema, no_body
 
-from notebook.serializers.activity import ActivitySerializer
+from notebook.pagination import ActivityPagination
+from notebook.serializers.activity import ActivitySerializer, SeeActivitiesSerializer, ActivityCountSerializer
+from notebook.views.mixins import EagerLoadingMixin
 from core.models import Activity
+from user.authentication import CachedTokenAuthentication
 
 
-class ActivityViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
+class ActivityViewSet(EagerLoadingMixin, viewsets.GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
 
     serializer_class = ActivitySerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
     queryset = Activity.objects.all()
+    pagination_class = ActivityPagination
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         current_user = self.request.user
         if current_user.is_anonymous:
-            return self.queryset
-        return self.queryset.filter(user=current_user)
+            return queryset
+        return queryset.filter(user=current_user)
 
     @swagger_auto_schema(
         request_body=no_body,
@@ -29,7 +34,7 @@ class ActivityViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.Ret
     def see(self, request, pk=None):
         instance: Activity = self.get_object()
         instance.seen = True
-        instance.save()
+        instance.save(update_fields=('seen',))
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @swagger_auto_schema(
@@ -40,5 +45,26 @@ class ActivityViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.Ret
     def unsee(self, request, pk=None):
         instance: Activity = self.get_object()
         instance.seen = False
-        instance.save()
+        instance.save(update_fields=('seen',))
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @swagger_auto_schema(
+        request_body=SeeActivitiesSerializer,
+        responses={200: ActivityCountSerializer()}
+    )
+    @action(detail=False, methods=['post'])
+    def see_all(self, request):
+        """Mark every activity, a list of them or the ones up to a moment as seen, with a single UPDATE"""
+        serializer = SeeActivitiesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        count = serializer.filter_queryset(Activity.objects.filter(user=request.user, seen=False)).update(seen=True)
+        return Response(ActivityCountSerializer({'count': count}).data)
+
+    @swagger_auto_schema(
+        responses={200: ActivityCountSerializer()}
+    )
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        """Amount of activities not seen yet"""
+        count = Activity.objects.filter(user=request.user, seen=False).count()
+        return Response(ActivityCountSerializer({'count': count}).data)
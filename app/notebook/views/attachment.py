@@ -1,8 +1,22 @@
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
 from django.shortcuts import redirect
-from rest_framework import authentication, permissions, viewsets, mixins
+from django.utils.translation import gettext_lazy as _
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, viewsets, mixins, parsers, status, exceptions, views
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
-from core.models import Notebook, Attachment, Member
-from notebook.serializers.attachment import AttachmentSerializer
+from core.models import Attachment, Member
+from core.models.blob import hash_file
+from notebook.access import get_accessible_notebook_ids
+from notebook.membership import get_membership
+from notebook.serializers.attachment import AttachmentSerializer, AttachmentUploadSerializer, \
+    AttachmentCompleteSerializer
+from notebook.uploads import LocalUploadBackend, PendingUpload, get_upload_backend
+from notebook.views.mixins import EagerLoadingMixin
+from user.authentication import CachedTokenAuthentication
 
 
 class DestroyAttachmentPermission(permissions.BasePermission):
@@ -11,7 +25,7 @@ class DestroyAttachmentPermission(permissions.BasePermission):
             return True
 
         try:
-            current_user_membership = obj.note.notebook.members.get(user=request.user, is_active=True)
+            current_user_membership = get_membership(request, obj.notebook_id)
         except Member.DoesNotExist:
             return False
 
@@ -22,21 +36,74 @@ class DestroyAttachmentPermission(permissions.BasePermission):
         return True
 
 
-class AttachmentViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin,
+class AttachmentViewSet(EagerLoadingMixin, viewsets.GenericViewSet, mixins.RetrieveModelMixin,
                         mixins.CreateModelMixin, mixins.DestroyModelMixin):
     serializer_class = AttachmentSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated, DestroyAttachmentPermission)
     queryset = Attachment.objects.all()
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         if self.request.user.is_anonymous:
-            return self.queryset
-        user_notebooks = Notebook.objects.filter(member__user=self.request.user,
-                                                 member__is_active=True)
-        queryset = self.queryset.filter(note__note_group__parent_folder__notebook__in=user_notebooks)
+            return queryset
+        queryset = queryset.filter(notebook_id__in=get_accessible_notebook_ids(self.request.user))
         return queryset
 
+    def get_serializer_class(self):
+        if self.action == 'upload':
+            return AttachmentUploadSerializer
+        if self.action == 'complete':
+            return AttachmentCompleteSerializer
+        return super().get_serializer_class()
+
+    @swagger_auto_schema(responses={201: AttachmentUploadSerializer()})
+    @action(detail=False, methods=['post'])
+    def upload(self, request):
+        """Start a direct upload, the file is sent straight to the storage and then confirmed with `complete`"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(responses={201: AttachmentSerializer()})
+    @action(detail=False, methods=['post'])
+    def complete(self, request):
+        """Confirm a direct upload, creating the attachment"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class LocalUploadView(views.APIView):
+    """Receives the direct uploads when the files are stored locally, authorized by the signed token"""
+    authentication_classes = ()
+    permission_classes = ()
+    parser_classes = (parsers.MultiPartParser, parsers.FormParser)
+    swagger_schema = None
+
+    def post(self, request, token):
+        if not isinstance(get_upload_backend(), LocalUploadBackend):
+            raise exceptions.NotFound()
+
+        try:
+            upload = PendingUpload.from_token(token)
+        except signing.BadSignature:
+            raise exceptions.PermissionDenied(_('Token inválido ou expirado'))
+
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is None:
+            raise exceptions.ValidationError({'file': _('Nenhum arquivo enviado')})
+        if uploaded_file.size > settings.ATTACHMENT_MAX_UPLOAD_SIZE:
+            raise exceptions.ValidationError({'file': _('O arquivo excede o tamanho máximo')})
+        if hash_file(uploaded_file) != upload.sha256:
+            raise exceptions.ValidationError({'file': _('O conteúdo não corresponde ao hash SHA-256 informado')})
+
+        if not default_storage.exists(upload.name):  # Files are stored by content, the same one may already be there
+            default_storage.save(upload.name, uploaded_file)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class OpenAttachmentViewSet(viewsets.GenericViewSet):
     serializer_class = AttachmentSerializer
@@ -1,9 +1,13 @@
-from rest_framework import viewsets, permissions, authentication, mixins
+from rest_framework import viewsets, permissions, mixins
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from notebook.access import get_accessible_notebook_ids
+from notebook.membership import get_membership
 from notebook.serializers.comment import CommentSerializer
-from core.models import Comment, Notebook, Member
+from notebook.views.mixins import EagerLoadingMixin
+from core.models import Comment, Member
+from user.authentication import CachedTokenAuthentication
 
 
 class ModifyCommentPermission(permissions.BasePermission):
@@ -11,7 +15,7 @@ class ModifyCommentPermission(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        membership = obj.note.notebook.members.get(user=request.user)
+        membership = get_membership(request, obj.notebook_id, active=False)
 
         if obj.commenter != membership and membership.role == Member.Roles.MEMBER:
             return False
@@ -19,20 +23,19 @@ class ModifyCommentPermission(permissions.BasePermission):
         return True
 
 
-class CommentViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin, mixins.CreateModelMixin,
+class CommentViewSet(EagerLoadingMixin, viewsets.GenericViewSet, mixins.RetrieveModelMixin, mixins.CreateModelMixin,
                      mixins.UpdateModelMixin, mixins.DestroyModelMixin):
     serializer_class = CommentSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated, ModifyCommentPermission)
     queryset = Comment.objects.all()
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         if self.request.user.is_anonymous:
-            return self.queryset
+            return queryset
 
-        user_notebooks = Notebook.objects.filter(member__user=self.request.user,
-                                                 member__is_active=True)
-        return self.queryset.filter(commenter__notebook__in=user_notebooks)
+        return queryset.filter(notebook_id__in=get_accessible_notebook_ids(self.request.user))
 
     @action(detail=True, methods=['post'])
     def solve(self, request, pk=None, solved=True):
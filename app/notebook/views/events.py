@@ -0,0 +1,108 @@
+import json
+import time
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from drf_yasg.openapi import Parameter
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, renderers, serializers, views
+from rest_framework.response import Response
+
+from notebook.notifications import Subscription, get_notification_backend
+from user.authentication import CachedTokenAuthentication, TicketAuthentication, make_ticket
+
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    """Server-sent events, only errors are rendered here, the stream itself is written by `EventsView`"""
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return f'event: error\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+class EventParamsSerializer(serializers.Serializer):
+    timeout = serializers.FloatField(required=False, min_value=0, max_value=settings.NOTIFICATION_POLL_TIMEOUT,
+                                     default=settings.NOTIFICATION_POLL_TIMEOUT)
+    since = serializers.IntegerField(required=False, min_value=0)
+
+
+def format_event(event):
+    return f'id: {event["id"]}\nevent: {event["type"]}\ndata: {json.dumps(event["data"])}\n\n'
+
+
+def stream_events(subscription: Subscription):
+    """Write the events as they come, the stream is closed after a while and the client reconnects"""
+    with subscription:
+        yield 'retry: 3000\n\n'
+        deadline = time.monotonic() + settings.NOTIFICATION_STREAM_DURATION
+        while time.monotonic() < deadline:
+            event = subscription.get(timeout=min(settings.NOTIFICATION_KEEPALIVE, deadline - time.monotonic()))
+            yield ': keep-alive\n\n' if event is None else format_event(event)
+
+
+def wait_events(subscription: Subscription, timeout):
+    """Wait for the first event (the missed ones are returned right away), then take the ones already queued"""
+    with subscription:
+        event = subscription.get(timeout=timeout)
+        events = []
+        while event is not None:
+            events.append(event)
+            event = subscription.get(timeout=0)
+        return events
+
+
+class EventsView(views.APIView):
+    """
+    New activities and invites of the current user, pushed as they are created
+
+    With `Accept: text/event-stream` the events are streamed (SSE), otherwise the request waits up to `timeout`
+    seconds for events (long-polling). Neither queries the database while waiting.
+
+    Event IDs grow with each event of the user. The events after `since` (or the `Last-Event-ID` header sent by
+    EventSource when it reconnects) are sent first, long-polling clients pass the returned `cursor` to the next
+    request. Besides the token, the `ticket` from `EventTicketView` is accepted, EventSource can't send headers.
+    """
+    authentication_classes = (CachedTokenAuthentication, TicketAuthentication)
+    permission_classes = (permissions.IsAuthenticated,)
+    renderer_classes = (renderers.JSONRenderer, EventStreamRenderer)
+
+    @swagger_auto_schema(
+        manual_parameters=[Parameter('timeout', 'query', required=False, type='number',
+                                     description='Segundos de espera por eventos no long-polling (padrão e máximo: '
+                                                 f'{settings.NOTIFICATION_POLL_TIMEOUT})'),
+                           Parameter('since', 'query', required=False, type='integer',
+                                     description='ID do último evento recebido, os eventos seguintes são enviados '
+                                                 'primeiro (`cursor` da resposta anterior)'),
+                           Parameter('ticket', 'query', required=False, type='string',
+                                     description='Ticket de `events/ticket/`, no lugar do token (EventSource)')],
+        responses={200: 'Eventos `activity` e `invite`, com `id`, `type` e `data`, e o `cursor` da próxima requisição'}
+    )
+    def get(self, request):
+        params = EventParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        since = params.validated_data.get('since')
+        last_event_id = request.META.get('HTTP_LAST_EVENT_ID', '')
+        if last_event_id.isdigit():
+            since = int(last_event_id)
+
+        subscription = get_notification_backend().subscribe(request.user.pk, since)
+        if request.accepted_renderer.format == EventStreamRenderer.format:
+            response = StreamingHttpResponse(stream_events(subscription), content_type=EventStreamRenderer.media_type)
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+            return response
+
+        events = wait_events(subscription, params.validated_data['timeout'])
+        return Response({'events': events, 'cursor': subscription.cursor})
+
+
+class EventTicketView(views.APIView):
+    """Ticket authenticating the event streams of the current user, for clients that can't send the token"""
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @swagger_auto_schema(responses={200: f'`ticket`, válido por `expires_in` ({settings.TICKET_MAX_AGE}) segundos'})
+    def post(self, request):
+        return Response({'ticket': make_ticket(request.user), 'expires_in': settings.TICKET_MAX_AGE})
@@ -2,12 +2,16 @@ from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
 from drf_yasg.openapi import Parameter
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import exceptions, mixins, viewsets, permissions, authentication
+from rest_framework import exceptions, mixins, viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from core.models import Folder, Member, User
+from core.models import Folder, Member
+from notebook.access import get_accessible_notebook_ids
+from notebook.membership import get_membership
 from notebook.serializers.folder import FolderSerializer
+from notebook.views.mixins import CachedRetrieveMixin, ConditionalRetrieveMixin, EagerLoadingMixin
+from user.authentication import CachedTokenAuthentication
 
 
 class FolderRolePermission(permissions.BasePermission):
@@ -15,7 +19,7 @@ class FolderRolePermission(permissions.BasePermission):
         if view.action != 'destroy':
             return True
 
-        membership = obj.notebook.members.get(user=request.user)
+        membership = get_membership(request, obj.notebook_id, active=False)
 
         if membership.is_banned:
             return False
@@ -28,18 +32,19 @@ class FolderRolePermission(permissions.BasePermission):
 
 @method_decorator(name='create', decorator=swagger_auto_schema(
     operation_description="Ou `notebook`, ou `parent_folder` são necessários. `parent_folder` sobrescreve `notebook`"))
-class FolderViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin, mixins.CreateModelMixin,
-                    mixins.UpdateModelMixin, mixins.DestroyModelMixin):
+class FolderViewSet(ConditionalRetrieveMixin, CachedRetrieveMixin, EagerLoadingMixin, viewsets.GenericViewSet,
+                    mixins.RetrieveModelMixin, mixins.CreateModelMixin, mixins.UpdateModelMixin,
+                    mixins.DestroyModelMixin):
     serializer_class = FolderSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated, FolderRolePermission)
     queryset = Folder.objects.all()
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         if self.request.user.is_anonymous:
-            return self.queryset
-        current_user: User = self.request.user
-        return self.queryset.filter(notebook__member__user=current_user, notebook__member__is_active=True)
+            return queryset
+        return queryset.filter(notebook_id__in=get_accessible_notebook_ids(self.request.user))
 
     @swagger_auto_schema(
         methods=['get'],
@@ -3,20 +3,25 @@ from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from drf_yasg.openapi import Parameter
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import viewsets, permissions, authentication, mixins, status, exceptions
+from rest_framework import viewsets, permissions, mixins, status, exceptions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from core.models import Invite, Notebook, Member
+from notebook.access import get_accessible_notebook_ids
+from notebook.eager_loading import eager_load
+from notebook.membership import get_membership
+from notebook.pagination import InvitePagination
 from notebook.serializers.invite import InviteSerializer
+from notebook.views.mixins import EagerLoadingMixin
+from user.authentication import CachedTokenAuthentication
 
 
 class ModifyInvitePermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj: Invite):
         if view.action == 'destroy':
-            user = request.user
             try:
-                notebook_membership = obj.sender.notebook.members.get(user=user)
+                notebook_membership = get_membership(request, obj.sender.notebook_id, active=False)
                 if notebook_membership.role == Member.Roles.MEMBER:
                     return False
             except Member.DoesNotExist:
@@ -29,25 +34,26 @@ class ModifyInvitePermission(permissions.BasePermission):
         return True
 
 
-class InviteViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.DestroyModelMixin,
+class InviteViewSet(EagerLoadingMixin, viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.DestroyModelMixin,
                     mixins.RetrieveModelMixin):
     serializer_class = InviteSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated, ModifyInvitePermission)
     queryset = Invite.objects.all()
+    pagination_class = InvitePagination
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         if self.request.user.is_anonymous:
-            return self.queryset
+            return queryset
 
-        user_notebooks = Notebook.objects.filter(member__user=self.request.user,
-                                                 member__is_active=True)
-        return self.queryset.filter(Q(receiver=self.request.user) | Q(sender__notebook__in=user_notebooks))
+        user_notebook_ids = get_accessible_notebook_ids(self.request.user)
+        return queryset.filter(Q(receiver=self.request.user) | Q(sender__notebook_id__in=user_notebook_ids))
 
     def list(self, request):
-        invites = request.user.invites.all()
-        serializer = self.get_serializer(invites, many=True)
-        return Response(serializer.data)
+        invites = eager_load(request.user.invites.all(), self.get_serializer_class())
+        serializer = self.get_serializer(self.paginate_queryset(invites), many=True)
+        return self.get_paginated_response(serializer.data)
 
     @swagger_auto_schema(
         methods=['get'],
@@ -64,16 +70,15 @@ class InviteViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.Des
     def pending(self, request):
         notebook_id = request.query_params.get('notebook', None)
         try:
-            notebook = Notebook.objects.filter(member__user=self.request.user,
-                                               member__is_active=True).get(id=notebook_id)
+            notebook = Notebook.objects.filter(id__in=get_accessible_notebook_ids(request.user)).get(id=notebook_id)
         except Notebook.DoesNotExist:
             raise exceptions.NotFound(_('Caderno não encontrado'))
         except DjangoValidationError as ex:
             raise exceptions.ValidationError({'detail': ex.messages})
 
-        invites = self.queryset.filter(sender__notebook=notebook)
-        invite_serializer = self.get_serializer(invites, many=True)
-        return Response(invite_serializer.data)
+        invites = eager_load(self.queryset.filter(sender__notebook=notebook), self.get_serializer_class())
+        invite_serializer = self.get_serializer(self.paginate_queryset(invites), many=True)
+        return self.get_paginated_response(invite_serializer.data)
 
     @action(detail=True, methods=['post'])
     def accept(self, request, pk=None):
@@ -89,6 +94,6 @@ class InviteViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.Des
 
     @action(detail=False, methods=['get'])
     def received(self, request):
-        received_queryset = self.queryset.filter(receiver=self.request.user)
-        serializer = self.get_serializer(received_queryset, many=True)
-        return Response(serializer.data)
+        received_queryset = eager_load(self.queryset.filter(receiver=self.request.user), self.get_serializer_class())
+        serializer = self.get_serializer(self.paginate_queryset(received_queryset), many=True)
+        return self.get_paginated_response(serializer.data)
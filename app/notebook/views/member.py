@@ -1,33 +1,39 @@
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework import authentication, permissions, viewsets
+from rest_framework import permissions, viewsets
 
+from notebook.access import get_accessible_notebook_ids
+from notebook.pagination import MemberPagination
 from notebook.serializers.member import MemberSerializer
+from notebook.views.mixins import EagerLoadingMixin
 from core.models import Member
+from user.authentication import CachedTokenAuthentication
 
 
-class MemberViewSet(viewsets.GenericViewSet):
+class MemberViewSet(EagerLoadingMixin, viewsets.GenericViewSet):
     """ViewSet to list all members from a notebook"""
 
     queryset = Member.objects.all()
     serializer_class = MemberSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    pagination_class = MemberPagination
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         if self.request.user.is_anonymous:
-            return self.queryset
+            return queryset
 
-        current_user = self.request.user
-        return self.queryset.filter(notebook__member__user=current_user, notebook__member__is_active=True)
+        return queryset.filter(notebook_id__in=get_accessible_notebook_ids(self.request.user))
 
     def list(self, request):
         notebook_id = request.GET.get("notebook")
 
         queryset = self.get_queryset().filter(notebook_id=notebook_id)
-        serializer = MemberSerializer(queryset, many=True)
+        page = self.paginate_queryset(queryset)
+        serializer = MemberSerializer(page, many=True)
 
-        return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['post'])
     def change_role(self, request, pk=None):
@@ -0,0 +1,102 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from notebook.access import get_accessible_notebook_ids
+from notebook.conditional import format_etag, get_notebook_generation
+from notebook.eager_loading import eager_load
+
+RESPONSE_CACHE_PREFIX = 'notebook-response'
+
+
+class EagerLoadingMixin:
+    """Loads the relations declared by the serializer class along with the viewset's queryset"""
+
+    def get_queryset(self):
+        return eager_load(super().get_queryset(), self.get_serializer_class())
+
+
+class NotebookGenerationMixin:
+    """Looks up the change stamp of the requested object's notebook, see notebook.conditional"""
+
+    def get_validator_notebook_id(self):
+        """Notebook of the requested object, None when the user can't access it"""
+        return self.queryset.filter(pk=self.kwargs['pk'], notebook_id__in=get_accessible_notebook_ids(
+            self.request.user)).values_list('notebook_id', flat=True).first()
+
+    def get_notebook_generation(self):
+        """Memoized for the request, None when the object doesn't exist or the user can't access it"""
+        if not hasattr(self, '_notebook_generation'):
+            try:
+                notebook_id = self.get_validator_notebook_id()
+            except (ValueError, ValidationError):  # Malformed ID, left for the regular lookup
+                notebook_id = None
+            self._notebook_generation = None if notebook_id is None else get_notebook_generation(notebook_id)
+        return self._notebook_generation
+
+
+class ConditionalRetrieveMixin(NotebookGenerationMixin):
+    """
+    Answers `retrieve` with 304 Not Modified to If-None-Match/If-Modified-Since before the object is loaded
+
+    The validators come from cheap lookups, by default the change stamp of the object's notebook. Last-Modified only
+    has a precision of seconds, it isn't sent during the second of the last change: If-Modified-Since wouldn't tell
+    later changes in that second apart, the ETag still validates those responses.
+    """
+
+    def get_validators(self):
+        """ETag and last modification timestamp, None when there are no cheap validators for the object"""
+        generation = self.get_notebook_generation()
+        if generation is None:
+            return None, None
+        last_modified = generation // 1_000_000_000
+        return format_etag(generation), last_modified if last_modified < int(time.time()) else None
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            etag, last_modified = self.get_validators()
+        except (ValueError, ValidationError):  # Malformed ID, left for the regular lookup
+            etag, last_modified = None, None
+
+        response = None
+        if etag is not None or last_modified is not None:
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+
+        if etag is not None:
+            response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class CachedRetrieveMixin(NotebookGenerationMixin):
+    """
+    Serves `retrieve` from the cache of the serialized object
+
+    Entries are keyed by the notebook's change stamp, so every change in the notebook leaves them behind at once.
+    The payload must be the same for every member, absolute URLs are told apart by the host.
+    """
+
+    def get_response_cache_key(self, generation):
+        return f'{RESPONSE_CACHE_PREFIX}:{self.basename}:{self.kwargs["pk"]}:{generation}:' \
+               f'{self.request.scheme}://{self.request.get_host()}'
+
+    def retrieve(self, request, *args, **kwargs):
+        generation = self.get_notebook_generation()
+        if generation is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(generation)
+        data = cache.get(key)
+        if data is None:
+            data = super().retrieve(request, *args, **kwargs).data
+            cache.set(key, data, settings.NOTEBOOK_RESPONSE_CACHE_TIMEOUT)
+        return Response(data)
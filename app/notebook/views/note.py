@@ -1,20 +1,39 @@
-from rest_framework import authentication, permissions, viewsets, mixins, status
+import uuid
+
+from django.http import Http404
+from rest_framework import permissions, viewsets, mixins, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from drf_yasg.openapi import Parameter
 from drf_yasg.utils import swagger_auto_schema
 
-from notebook.serializers.note import NoteSerializer
+from notebook.access import get_accessible_notebook_ids
+from notebook.collaboration.documents import reload_document
+from notebook.drafts import (DraftConflict, apply_draft, autosave, discard_draft, extend_lineage, flush_draft,
+                             get_current_draft, get_draft)
+from notebook.conditional import PreconditionFailed, check_if_match, format_etag, if_match_version
+from notebook.eager_loading import eager_load
+from notebook.membership import get_membership
+from notebook.pagination import CommentPagination, RevisionPagination
+from notebook.serializers.note import (NoteSerializer, NoteContentPatchSerializer, NoteDraftSerializer,
+                                       ContentConflict)
 from notebook.serializers.rating import RatingSerializer
 from notebook.serializers.comment import CommentSerializer
-from core.models import Note, Notebook, Member, Rating
+from notebook.serializers.note_revision import (NoteRevisionSerializer, NoteRevisionContentSerializer,
+                                                RevisionDiffParamsSerializer, RevisionDiffSerializer)
+from notebook.text_patch import content_hash, unified_diff
+from core.models import Note, NoteRevision, Member, Rating
+from core.models.note import VersionConflict
+from notebook.views.mixins import ConditionalRetrieveMixin, EagerLoadingMixin
+from user.authentication import CachedTokenAuthentication
 
 
 class ModifyNotePermission(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj: Note):
         safe_actions = ('rating',)
-        membership = request.user.memberships.get(notebook=obj.notebook)
+        membership = get_membership(request, obj.notebook_id, active=False)
 
         if request.method in permissions.SAFE_METHODS:
             return True
@@ -31,22 +50,69 @@ class ModifyNotePermission(permissions.BasePermission):
         return True
 
 
-class NoteViewSet(viewsets.GenericViewSet, mixins.DestroyModelMixin, mixins.UpdateModelMixin, mixins.CreateModelMixin,
-                  mixins.RetrieveModelMixin):
+class NoteViewSet(ConditionalRetrieveMixin, EagerLoadingMixin, viewsets.GenericViewSet, mixins.DestroyModelMixin,
+                  mixins.UpdateModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin):
     serializer_class = NoteSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated, ModifyNotePermission)
     queryset = Note.objects.all()
 
     def get_queryset(self):
         # Limit user access to only their notebooks
+        queryset = super().get_queryset()
         if self.request.user.is_anonymous:
-            return self.queryset
-        user_notebooks = Notebook.objects.filter(member__user=self.request.user,
-                                                 member__is_active=True)
-        queryset = self.queryset.filter(note_group__parent_folder__notebook__in=user_notebooks)
+            return queryset
+        queryset = queryset.filter(notebook_id__in=get_accessible_notebook_ids(self.request.user))
         return queryset
 
+    def get_object(self):
+        instance: Note = super().get_object()
+        if self.action == 'retrieve':
+            apply_draft(instance)  # Pending autosave
+        return instance
+
+    def get_validators(self):
+        note_id = str(uuid.UUID(self.kwargs['pk']))
+        note = self.queryset.filter(pk=note_id, notebook_id__in=get_accessible_notebook_ids(self.request.user)) \
+            .only('version', 'related_version').first()
+        if note is None:
+            return None, None
+        draft = get_current_draft(note)
+        if draft is not None:  # The pending draft is shown instead of the saved content
+            return format_etag(note.version, note.related_version, int(draft['updated'] * 1_000_000)), None
+        return format_etag(note.version, note.related_version), None
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        response['ETag'] = self.etag
+        return response
+
+    def perform_update(self, serializer):
+        # Updates are conditional on the version sent in If-Match, or at least on the version that was just read
+        check_if_match(self.request, serializer.instance.version)
+        previous_version = serializer.instance.version
+        try:
+            serializer.save()
+        except VersionConflict:
+            raise PreconditionFailed(Note.objects.values_list('version', flat=True).get(pk=serializer.instance.pk))
+
+        # Saved content replaces the editor's own pending autosave, someone else's is now in conflict. Other changes
+        # keep the draft.
+        note_id = serializer.instance.pk
+        if 'content' in serializer.validated_data:
+            draft = get_draft(note_id)
+            membership = get_membership(self.request, serializer.instance.notebook_id, active=False)
+            if draft is not None and draft['member_id'] == membership.id:
+                discard_draft(note_id)
+            reload_document(serializer.instance)
+        else:
+            extend_lineage(note_id, previous_version, serializer.instance.version)
+            try:
+                serializer.instance = flush_draft(note_id) or serializer.instance
+            except DraftConflict:
+                pass
+        self.etag = format_etag(serializer.instance.version, serializer.instance.related_version)
+
     @action(detail=True, methods=['get', 'post'])
     def rating(self, request, pk=None):
         if request.method == 'GET':
@@ -83,8 +149,111 @@ class NoteViewSet(viewsets.GenericViewSet, mixins.DestroyModelMixin, mixins.Upda
     @swagger_auto_schema(
         responses={200: CommentSerializer(many=True)}
     )
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], pagination_class=CommentPagination)
     def comments(self, request, pk=None):
         instance: Note = self.get_object()
-        serializer = CommentSerializer(instance.comments.all(), many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(eager_load(instance.comments.all(), CommentSerializer))
+        serializer = CommentSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @swagger_auto_schema(
+        request_body=NoteContentPatchSerializer,
+        responses={200: NoteContentPatchSerializer, 409: 'Base hash does not match the current content'}
+    )
+    @action(detail=True, methods=['post'], url_path='patch')
+    def patch_content(self, request, pk=None):
+        """Apply a patch computed against the content with hash `base_hash`"""
+        instance: Note = self.get_object()
+        check_if_match(request, instance.version)
+        try:
+            instance = flush_draft(instance.pk) or instance  # Patches are computed against the content with the draft
+        except DraftConflict:
+            pass
+        serializer = NoteContentPatchSerializer(instance, data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        reload_document(serializer.instance)
+        note = serializer.instance
+        return Response(serializer.data, headers={'ETag': format_etag(note.version, note.related_version)})
+
+    @swagger_auto_schema(
+        request_body=NoteDraftSerializer,
+        responses={200: NoteDraftSerializer, 202: NoteDraftSerializer,
+                   409: 'The note was saved by someone else since the base version'}
+    )
+    @action(detail=True, methods=['post'])
+    def autosave(self, request, pk=None):
+        """
+        Buffer the content while the user types, answering 202 until it's written to the note
+
+        Idle drafts are written by the `flush_note_drafts` worker after `NOTE_DRAFT_IDLE_TIMEOUT` seconds without
+        autosaves. The request itself only writes after `NOTE_DRAFT_MAX_AGE` seconds or when `flush` is set. Reading
+        the note shows the pending draft.
+
+        The content is based on the version sent in If-Match, by default the one the pending draft is based on (or
+        the note's). When the note's content was saved by someone else since, the draft is refused with 409.
+        """
+        instance: Note = self.get_object()
+        version = if_match_version(request, instance.version)
+        serializer = NoteDraftSerializer(instance, data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+
+        content = serializer.validated_data['content']
+        try:
+            instance, flushed = autosave(instance, content, serializer.validated_data['member'].id, version,
+                                         flush=serializer.validated_data['flush'])
+        except DraftConflict as e:
+            raise ContentConflict(e.version)
+        data = NoteDraftSerializer({'content_hash': content_hash(content), 'flushed': flushed,
+                                    'version': instance.version}).data
+        return Response(data, status=status.HTTP_200_OK if flushed else status.HTTP_202_ACCEPTED)
+
+    @swagger_auto_schema(
+        responses={200: NoteRevisionSerializer(many=True)}
+    )
+    @action(detail=True, methods=['get'], pagination_class=RevisionPagination)
+    def revisions(self, request, pk=None):
+        """Revision history of the note's content, newest first"""
+        instance: Note = self.get_object()
+        revisions = eager_load(instance.revisions.defer('data'), NoteRevisionSerializer)
+        page = self.paginate_queryset(revisions)
+        serializer = NoteRevisionSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @swagger_auto_schema(
+        responses={200: NoteRevisionContentSerializer()}
+    )
+    @action(detail=True, methods=['get'], url_path=r'revisions/(?P<number>\d+)')
+    def revision(self, request, pk=None, number=None):
+        """Content of the note at a revision"""
+        instance: Note = self.get_object()
+        number = int(number)
+        try:
+            revision = eager_load(instance.revisions.defer('data'), NoteRevisionContentSerializer).get(number=number)
+            revision.content = NoteRevision.objects.rebuild(instance.id, number)[number]
+        except NoteRevision.DoesNotExist:
+            raise Http404()
+        return Response(NoteRevisionContentSerializer(revision).data)
+
+    @swagger_auto_schema(
+        manual_parameters=[Parameter('against', 'query', required=False, type='integer',
+                                     description='Revisão comparada (padrão: a revisão anterior)')],
+        responses={200: RevisionDiffSerializer()}
+    )
+    @action(detail=True, methods=['get'], url_path=r'revisions/(?P<number>\d+)/diff')
+    def revision_diff(self, request, pk=None, number=None):
+        """Unified diff from another revision (the previous one by default) to this one"""
+        instance: Note = self.get_object()
+        params = RevisionDiffParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        number = int(number)
+        source = params.validated_data.get('against', number - 1) or None
+        try:
+            contents = NoteRevision.objects.rebuild(instance.id, *filter(None, (source, number)))
+        except NoteRevision.DoesNotExist:
+            raise Http404()
+
+        diff = unified_diff(contents.get(source, ''), contents[number],
+                            fromfile=f'#{source or 0}', tofile=f'#{number}')
+        return Response({'source': source, 'target': number, 'diff': diff})
@@ -1,7 +1,11 @@
-from rest_framework import authentication, permissions, viewsets, mixins
+from rest_framework import permissions, viewsets, mixins
 
 from core.models import NoteGroup, Member
+from notebook.access import get_accessible_notebook_ids
+from notebook.membership import get_membership
 from notebook.serializers.note_group import NoteGroupSerializer
+from notebook.views.mixins import CachedRetrieveMixin, ConditionalRetrieveMixin, EagerLoadingMixin
+from user.authentication import CachedTokenAuthentication
 
 
 class NoteGroupRolePermission(permissions.BasePermission):
@@ -9,7 +13,7 @@ class NoteGroupRolePermission(permissions.BasePermission):
         if view.action != 'destroy':
             return True
 
-        membership = obj.notebook.members.get(user=request.user)
+        membership = get_membership(request, obj.notebook_id, active=False)
 
         if membership.is_banned:
             return False
@@ -20,16 +24,16 @@ class NoteGroupRolePermission(permissions.BasePermission):
         return True
 
 
-class NoteGroupViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin, mixins.CreateModelMixin,
-                       mixins.UpdateModelMixin, mixins.DestroyModelMixin):
+class NoteGroupViewSet(ConditionalRetrieveMixin, CachedRetrieveMixin, EagerLoadingMixin, viewsets.GenericViewSet,
+                       mixins.RetrieveModelMixin, mixins.CreateModelMixin, mixins.UpdateModelMixin,
+                       mixins.DestroyModelMixin):
     serializer_class = NoteGroupSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated, NoteGroupRolePermission,)
     queryset = NoteGroup.objects.all()
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         if self.request.user.is_anonymous:
-            return self.queryset
-        current_user = self.request.user
-        return self.queryset.filter(parent_folder__notebook__member__user=current_user,
-                                    parent_folder__notebook__member__is_active=True)
+            return queryset
+        return queryset.filter(notebook_id__in=get_accessible_notebook_ids(self.request.user))
@@ -1,14 +1,27 @@
+import uuid
+
+from django.db.models import Count, Prefetch
 from drf_yasg.openapi import Parameter
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import authentication, permissions, viewsets, mixins
+from rest_framework import permissions, viewsets, mixins
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from core.models import Notebook, Member
+from core.models import Folder, Notebook, Member
+from notebook.access import get_accessible_notebook_ids
+from notebook.eager_loading import eager_load
+from notebook.membership import get_membership
+from notebook.pagination import NotebookPagination
 from notebook.serializers.folder import FolderSerializer
 from notebook.serializers.member import MemberSerializer
 from notebook.serializers.notebook import NotebookSerializer
-from notebook.serializers.search import SearchResult, SearchResultSerializer
+from notebook.serializers.search import SearchParamsSerializer, SearchResult, SearchResultSerializer
+from notebook.serializers.tree import TreeFolderSerializer, TreeParamsSerializer
+from notebook.tree import build_tree
+from notebook.views.mixins import ConditionalRetrieveMixin, EagerLoadingMixin
+from user.authentication import CachedTokenAuthentication
+
+SERIALIZED_ACTIONS = ('list', 'retrieve', 'update', 'partial_update')
 
 
 class NotebookRolePermission(permissions.BasePermission):
@@ -21,25 +34,39 @@ class NotebookRolePermission(permissions.BasePermission):
             if request.user != obj.owner:
                 return False
         else:
-            membership = obj.members.get(user=request.user)
+            membership = get_membership(request, obj.pk, active=False)
             if membership.role != Member.Roles.ADMIN:
                 return False
 
         return True
 
 
-class NotebookViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.ListModelMixin,
-                      mixins.RetrieveModelMixin, mixins.DestroyModelMixin, mixins.UpdateModelMixin):
+class NotebookViewSet(ConditionalRetrieveMixin, EagerLoadingMixin, viewsets.GenericViewSet, mixins.CreateModelMixin,
+                      mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+                      mixins.UpdateModelMixin):
     serializer_class = NotebookSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated, NotebookRolePermission)
     queryset = Notebook.objects.all()
+    pagination_class = NotebookPagination
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         if self.request.user.is_anonymous:
-            return self.queryset
-        return Notebook.objects.filter(member__user=self.request.user,
-                                       member__is_active=True)
+            return queryset
+
+        queryset = queryset.filter(id__in=get_accessible_notebook_ids(self.request.user))
+        if self.action not in SERIALIZED_ACTIONS:
+            return queryset
+
+        # Everything NotebookSerializer needs, in bulk for the whole page
+        user_memberships = eager_load(Member.objects.filter(user=self.request.user), MemberSerializer)
+        return queryset.annotate(member_count=Count('member')) \
+            .prefetch_related(Prefetch('members', queryset=user_memberships, to_attr='user_memberships'))
+
+    def get_validator_notebook_id(self):
+        notebook_id = uuid.UUID(self.kwargs['pk'])
+        return notebook_id if notebook_id in get_accessible_notebook_ids(self.request.user) else None
 
     @swagger_auto_schema(
         responses={200: MemberSerializer(many=True)}
@@ -47,7 +74,7 @@ class NotebookViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.L
     @action(detail=True, methods=['get'])
     def members(self, request, pk=None):
         instance: Notebook = self.get_object()
-        serializer = MemberSerializer(instance.members.filter(is_active=True), many=True)
+        serializer = MemberSerializer(eager_load(instance.members.filter(is_active=True), MemberSerializer), many=True)
         return Response(serializer.data)
 
     @swagger_auto_schema(
@@ -56,17 +83,41 @@ class NotebookViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.L
     @action(detail=True, methods=['get'])
     def root(self, request, pk=None):
         instance: Notebook = self.get_object()
-        serializer = FolderSerializer(instance.root_folder)
+        root_folder = eager_load(Folder.objects.filter(pk=instance.root_folder_id), FolderSerializer).get()
+        serializer = FolderSerializer(root_folder)
         return Response(serializer.data)
 
+    @swagger_auto_schema(
+        manual_parameters=[Parameter('depth', 'query', required=False, type='integer',
+                                     description='Profundidade máxima das pastas, a raiz tem profundidade 0'),
+                           Parameter('notes', 'query', required=False, type='boolean',
+                                     description='Inclui os títulos das anotações (padrão: true)')],
+        responses={200: TreeFolderSerializer()}
+    )
+    @action(detail=True, methods=['get'])
+    def tree(self, request, pk=None):
+        """Whole outline of the notebook, from the root folder to the note titles"""
+        instance: Notebook = self.get_object()
+        params = TreeParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(build_tree(instance.id, max_depth=params.validated_data['depth'],
+                                   include_notes=params.validated_data['notes']))
+
     @swagger_auto_schema(
         manual_parameters=[Parameter('q', 'query', required=True, type='string',
-                                     description='_query_ de pesquisa (pode ser substituído pelo parâmetro `query`)')],
+                                     description='_query_ de pesquisa (pode ser substituído pelo parâmetro `query`)'),
+                           Parameter('page', 'query', required=False, type='integer',
+                                     description='Página das anotações encontradas (padrão: 1)'),
+                           Parameter('page_size', 'query', required=False, type='integer',
+                                     description='Quantidade de anotações por página (padrão: 20, máximo: 100)')],
         responses={200: SearchResultSerializer()}
     )
     @action(detail=True, methods=['get'])
     def search(self, request, pk=None):
         instance: Notebook = self.get_object()
-        query = request.query_params.get('q', None) or request.query_params.get('query', '')
-        serializer = SearchResultSerializer(SearchResult(instance, query))
+        params = SearchParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data['q'] or params.validated_data['query']
+        serializer = SearchResultSerializer(SearchResult(instance, query, page=params.validated_data['page'],
+                                                         page_size=params.validated_data['page_size']))
         return Response(serializer.data)
@@ -0,0 +1,71 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication
+
+TOKEN_CACHE_PREFIX = 'auth-token'
+TICKET_SALT = 'user.authentication.ticket'
+
+
+def token_cache_key(key):
+    # Hashed, and the entries only hold the user's ID, so the cache never holds usable credentials
+    return f'{TOKEN_CACHE_PREFIX}:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def evict_token(key):
+    cache.delete(token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication keeping the ID of the token's user in the cache for TOKEN_AUTH_CACHE_TIMEOUT seconds
+
+    The user is still loaded by its primary key on every request. Entries are evicted when the token is deleted or
+    the user is saved (see user.signals), only tokens deleted with queryset deletes wait for the timeout.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        user_id = cache.get(cache_key)
+        if user_id is None:
+            user, token = super().authenticate_credentials(key)  # Inactive users and unknown keys are rejected
+            cache.set(cache_key, user.pk, settings.TOKEN_AUTH_CACHE_TIMEOUT)
+            return user, token
+
+        user = get_user_model().objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            evict_token(key)
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return user, self.get_model()(key=key, user=user)  # Not loaded, the key was matched when it was cached
+
+
+def make_ticket(user):
+    return signing.dumps(str(user.pk), salt=TICKET_SALT)
+
+
+class TicketAuthentication(BaseAuthentication):
+    """
+    Signed `ticket` query parameter (see make_ticket), valid for TICKET_MAX_AGE seconds
+
+    For clients that can't send the Authorization header, such as EventSource. Only views that can't be served
+    otherwise should accept it: URLs end up in logs, so tickets are short-lived and carry no token.
+    """
+
+    def authenticate(self, request):
+        ticket = request.query_params.get('ticket')
+        if ticket is None:
+            return None
+        try:
+            user_id = signing.loads(ticket, salt=TICKET_SALT, max_age=settings.TICKET_MAX_AGE)
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed(_('Ticket inválido ou expirado'))
+
+        user = get_user_model().objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return user, None
@@ -1,16 +1,20 @@
+from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
 from django.contrib.auth import authenticate, password_validation, tokens
 from django.utils.translation import gettext_lazy as _
 
+from core.images import get_variant_urls
 from core.models import User
 
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializes the User model"""
+    profile_picture_variants = serializers.SerializerMethodField(
+        help_text=_('URLs da foto de perfil redimensionada, por tamanho'))
 
     class Meta:
         model = User
-        fields = ('id', 'email', 'name', 'password', 'bio', 'profile_picture')
+        fields = ('id', 'email', 'name', 'password', 'bio', 'profile_picture', 'profile_picture_variants')
         extra_kwargs = {
             'password': {
                 'write_only': True,
@@ -18,6 +22,11 @@ class UserSerializer(serializers.ModelSerializer):
                 'validators': [
                     password_validation.validate_password]}}
 
+    @swagger_serializer_method(serializer_or_field=serializers.DictField(child=serializers.URLField()))
+    def get_profile_picture_variants(self, obj: User):
+        return get_variant_urls(obj.profile_picture_variants, self.context.get('request', None),
+                                storage=obj.profile_picture.storage)
+
     # def validate_password(self, password):
     #     """Validate the password according to the password validators on settings"""
     #     password_validation.validate_password(password)
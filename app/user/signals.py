@@ -1,11 +1,14 @@
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import Signal, receiver
 from django.template.loader import render_to_string
 from django.core.mail import EmailMultiAlternatives
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
+from rest_framework.authtoken.models import Token
 
-from core.models import User
+from core.models import OutgoingEmail, User
+from user.authentication import evict_token
 
 password_reset_request_signal = Signal(providing_args=["user"])
 
@@ -35,4 +38,18 @@ def send_reset_token_email(sender, user: User, *args, **kwargs):
     )
 
     msg.attach_alternative(html_content, 'text/html')
-    msg.send()
+    OutgoingEmail.objects.enqueue(msg)  # Delivered by the `send_queued_email` worker
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def evict_cached_token(sender, instance: Token, **kwargs):
+    evict_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def evict_cached_user_token(sender, instance: User, created, **kwargs):
+    """Deactivated users lose access right away, and requests never see an outdated copy of the user"""
+    if not created:
+        for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+            evict_token(key)
@@ -1,11 +1,18 @@
+from io import StringIO
+
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model, tokens
 from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
 
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
+from user.authentication import token_cache_key
+
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
 ME_URL = reverse('user:me')
@@ -125,6 +132,42 @@ class PublicUserAPITests(TestCase):
         res = self.client.get(ME_URL)
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_cached_token_authentication(self):
+        """Test that tokens are resolved from the cache until the token or the user changes"""
+        user = create_user_util()
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):  # The user, by primary key
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data['email'], DEFAULT_PAYLOAD['email'])
+        self.assertEqual(cache.get(token_cache_key(token.key)), user.pk)  # Neither the key nor the password hash
+
+        # Deactivations made with queryset updates apply right away
+        get_user_model().objects.filter(pk=user.pk).update(is_active=False)
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        get_user_model().objects.filter(pk=user.pk).update(is_active=True)
+
+        user.name = 'Renamed'
+        user.save()
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data['name'], 'Renamed')
+
+        user.is_active = False
+        user.save()
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        user.is_active = True
+        user.save()
+        self.client.get(ME_URL)
+        token.delete()
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_password_reset_request(self):
         """Test the password reset token request"""
         user = create_user_util()
@@ -144,6 +187,9 @@ class PublicUserAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+        self.assertEqual(len(mail.outbox), 0)  # Queued, not sent on the request
+        call_command('send_queued_email', stdout=StringIO())
+
         self.assertEqual(len(mail.outbox), 1)
         email = mail.outbox.pop()
         self.assertIn(str(user.id), str(email.message()))  # Check if UID is on the message
@@ -200,7 +246,8 @@ class PrivateUserAPITests(TestCase):
             'email': DEFAULT_PAYLOAD['email'],
             'name': DEFAULT_PAYLOAD['name'],
             'bio': DEFAULT_PAYLOAD['bio'],
-            'profile_picture': None
+            'profile_picture': None,
+            'profile_picture_variants': {}
         })
 
     def test_me_personal_data_update(self):
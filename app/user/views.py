@@ -1,6 +1,6 @@
 from django.utils.translation import gettext_lazy as _
 
-from rest_framework import authentication, permissions, viewsets
+from rest_framework import permissions, viewsets
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.decorators import action
 from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView
@@ -9,6 +9,7 @@ from rest_framework.settings import api_settings
 
 from drf_yasg.utils import swagger_auto_schema
 
+from user.authentication import CachedTokenAuthentication
 from user.serializers import UserSerializer, AuthTokenSerializer, CreatePasswordResetTokenSerializer, \
     ConfirmPasswordResetTokenSerializer
 from user.signals import password_reset_request_signal
@@ -34,7 +35,7 @@ class ManageUserView(RetrieveUpdateAPIView):
     View for accessing and modifying authenticated User info
     """
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):